@@ -2,5 +2,9 @@ from django.apps import AppConfig
 
 
 class AddressBookConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'address_book'
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "address_book"
+
+    def ready(self):
+        from address_book import checks, signals  # noqa: F401
+        from address_service import db  # noqa: F401
@@ -0,0 +1,54 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView that lets handlers be coroutines.
+
+    DRF dispatches synchronously, so under ASGI every request would hold a
+    thread for its whole lifetime. Here dispatch is a coroutine: authentication,
+    permission checks and any handlers that are still sync run in Django's sync
+    thread, async handlers run on the event loop and only hop to a thread for
+    the queries they make.
+
+    Under WSGI Django runs the view in an event loop of its own, so the view
+    works the same on both, it is only faster under ASGI.
+    """
+
+    # Django checks that all handlers are either sync or async, sync ones are
+    # fine here since dispatch wraps them
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(
+                    request, *args, **kwargs
+                )
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
@@ -0,0 +1,311 @@
+import uuid
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from address_book.cache import address_book_cache
+from address_book.matching import address_match_key
+from address_book.models import MATCH_KEY_FIELDS, AddressBook
+from address_book.serializer import (
+    AddressBookReadSerializer,
+    AddressBookSerializer,
+)
+
+# Columns of an imported address, in the order insert_addresses binds them
+IMPORT_FIELDS = (
+    "id",
+    "user",
+    "country",
+    "address_line_one",
+    "address_line_two",
+    "city",
+    "zip_code",
+    "updated_at",
+    "match_key",
+)
+
+
+def batch_count(items, batch_size) -> int:
+    """Number of batches of batch_size needed for items, at least one"""
+    if not isinstance(items, (list, tuple)):
+        return 1
+    return max(1, -(-len(items) // batch_size))
+
+
+def import_addresses(user, addresses, batch_size) -> list:
+    """
+    Insert already validated addresses for a user in a single transaction.
+
+    Each batch costs one query to find the addresses that already exist and one
+    INSERT. Duplicates, whether against the address book or earlier rows of the
+    same import, are skipped. Returns one result per row, in input order.
+    """
+    results = []
+    seen = set()
+    now = timezone.now()
+    with transaction.atomic():
+        for start in range(0, len(addresses), batch_size):
+            batch = addresses[start : start + batch_size]
+            keys = [
+                address_match_key(
+                    address["country"],
+                    address["address_line_one"],
+                    address["zip_code"],
+                )
+                for address in batch
+            ]
+            # An index lookup on the unique (user, match_key) index
+            existing = set(
+                AddressBook.objects.filter(
+                    user=user, match_key__in=set(keys)
+                ).values_list("match_key", flat=True)
+            )
+            to_create = []
+            for index, (address, key) in enumerate(
+                zip(batch, keys), start=start
+            ):
+                if key in existing or key in seen:
+                    results.append({"index": index, "status": "duplicate"})
+                    continue
+                seen.add(key)
+                # Inserted without save(), so the id and match key are set here
+                row = {"id": uuid.uuid4(), **address, "match_key": key}
+                to_create.append(row)
+                results.append(
+                    {"index": index, "status": "created", "id": row["id"]}
+                )
+            if to_create:
+                insert_addresses(user, to_create, now)
+    return results
+
+
+def insert_addresses(user, rows, updated_at):
+    """
+    INSERT new addresses for a user, given as dicts of their fields with an id
+    and a match key.
+
+    On SQLite a single executemany. bulk_create prepares every value through
+    its field and, as Django limits SQLite to 999 parameters, splits a batch
+    into several INSERTs, which took a third of a large import. The values are
+    strings here, only the id and the timestamp need preparing. Elsewhere
+    bulk_create's multi row INSERT is the faster.
+    """
+    if connection.vendor != "sqlite":
+        AddressBook.objects.bulk_create(
+            AddressBook(user=user, updated_at=updated_at, **row)
+            for row in rows
+        )
+        return
+    meta = AddressBook._meta
+    fields = [meta.get_field(name) for name in IMPORT_FIELDS]
+    columns = ", ".join(
+        connection.ops.quote_name(field.column) for field in fields
+    )
+    placeholders = ", ".join(["%s"] * len(fields))
+    updated_at = meta.get_field("updated_at").get_db_prep_save(
+        updated_at, connection
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {connection.ops.quote_name(meta.db_table)} ({columns}) "
+            f"VALUES ({placeholders})",
+            [
+                (
+                    # How UUIDField stores ids on SQLite
+                    row["id"].hex,
+                    user.pk,
+                    row["country"],
+                    row["address_line_one"],
+                    row.get("address_line_two"),
+                    row["city"],
+                    row["zip_code"],
+                    updated_at,
+                    row["match_key"],
+                )
+                for row in rows
+            ],
+        )
+
+
+def update_addresses(user, updates, batch_size) -> list:
+    """
+    Apply already validated partial updates, ``{"id": ..., "fields": {...}}``,
+    to a user's addresses in a single transaction.
+
+    Each batch costs one query to lock the addresses, one to find the addresses
+    already holding the match keys that changed, if any did, and one
+    ``bulk_update``. Updates that would duplicate another address are skipped,
+    including one that another update in the same batch is moving away from.
+    Returns one result per update, in input order, with a status of updated,
+    unchanged, not_found or duplicate.
+    """
+    results = []
+    claimed = set()
+    with transaction.atomic():
+        for start in range(0, len(updates), batch_size):
+            batch = updates[start : start + batch_size]
+            addresses = user.addresses.select_for_update().in_bulk(
+                {update["id"] for update in batch}
+            )
+            changes = []
+            for index, update in enumerate(batch, start=start):
+                address = addresses.get(update["id"])
+                if address is None:
+                    results.append(
+                        {
+                            "index": index,
+                            "id": update["id"],
+                            "status": "not_found",
+                        }
+                    )
+                    continue
+                changed = AddressBookSerializer.changed_fields(
+                    address, update["fields"]
+                )
+                key = None
+                if MATCH_KEY_FIELDS.intersection(changed):
+                    values = {
+                        field: getattr(address, field)
+                        for field in MATCH_KEY_FIELDS
+                    }
+                    values.update(
+                        (field, update["fields"][field]) for field in changed
+                    )
+                    key = address_match_key(
+                        values["country"],
+                        values["address_line_one"],
+                        values["zip_code"],
+                    )
+                changes.append((index, address, update, changed, key))
+
+            new_keys = {key for *_, key in changes if key is not None}
+            # An index lookup on the unique (user, match_key) index
+            key_owners = (
+                dict(
+                    AddressBook.objects.filter(
+                        user=user, match_key__in=new_keys
+                    ).values_list("match_key", "id")
+                )
+                if new_keys
+                else {}
+            )
+
+            to_update = []
+            fields = set()
+            now = timezone.now()
+            for index, address, update, changed, key in changes:
+                result = {"index": index, "id": address.id}
+                if key is not None and (
+                    key in claimed
+                    or key_owners.get(key, address.id) != address.id
+                ):
+                    results.append({**result, "status": "duplicate"})
+                    continue
+                if not changed:
+                    results.append({**result, "status": "unchanged"})
+                    continue
+                if key is not None:
+                    claimed.add(key)
+                    address.match_key = key
+                    fields.add("match_key")
+                for field in changed:
+                    setattr(address, field, update["fields"][field])
+                address.updated_at = now
+                fields.update(changed)
+                to_update.append(address)
+                results.append({**result, "status": "updated"})
+            if to_update:
+                # bulk_update skips save(), so the match key and updated_at are set above
+                AddressBook.objects.bulk_update(
+                    to_update, [*fields, "updated_at"], batch_size=batch_size
+                )
+    # Missing addresses were reported before the rest of their batch
+    results.sort(key=lambda result: result["index"])
+    return results
+
+
+def can_delete_returning(connection) -> bool:
+    """
+    Whether the database runs ``DELETE ... RETURNING``, Postgres and SQLite
+    3.35+, and AddressBook has no relations that Django would cascade to
+    """
+    if AddressBook._meta.related_objects:
+        return False
+    if connection.vendor == "postgresql":
+        return True
+    return (
+        connection.vendor == "sqlite"
+        and connection.Database.sqlite_version_info >= (3, 35)
+    )
+
+
+def delete_addresses(user, address_ids, batch_size) -> list:
+    """
+    Delete a user's addresses by id and return the ids that were deleted.
+
+    Where the database supports ``DELETE ... RETURNING`` each batch is a single
+    statement, otherwise the matching ids are selected before deleting them.
+    Batches keep the number of bound parameters below SQLite's limit.
+
+    The raw DELETE bypasses Django's collector, so no delete signals are sent
+    for it. The user's address book cache, which the post_delete receiver would
+    invalidate, is invalidated here instead.
+    """
+    pk = AddressBook._meta.pk
+    table = connection.ops.quote_name(AddressBook._meta.db_table)
+    id_column = connection.ops.quote_name(pk.column)
+    user_column = connection.ops.quote_name(
+        AddressBook._meta.get_field("user").column
+    )
+    returning = can_delete_returning(connection)
+
+    deleted = []
+    with transaction.atomic():
+        for start in range(0, len(address_ids), batch_size):
+            batch = address_ids[start : start + batch_size]
+            if not returning:
+                addresses = AddressBook.objects.filter(user=user, id__in=batch)
+                batch_deleted = list(addresses.values_list("id", flat=True))
+                addresses.delete()
+                deleted.extend(batch_deleted)
+                continue
+            placeholders = ", ".join(["%s"] * len(batch))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE {user_column} = %s "
+                    f"AND {id_column} IN ({placeholders}) RETURNING {id_column}",
+                    [
+                        user.pk,
+                        *(
+                            pk.get_db_prep_value(id, connection)
+                            for id in batch
+                        ),
+                    ],
+                )
+                deleted.extend(
+                    pk.to_python(row[0]) for row in cursor.fetchall()
+                )
+    if deleted:
+        address_book_cache.bump_version(user.pk)
+    return deleted
+
+
+async def alookup_addresses(user, address_ids, batch_size) -> dict:
+    """
+    A user's addresses by id, rendered by AddressBookReadSerializer and keyed
+    by id in the order asked for. Ids not in the user's address book are left
+    out. One ``id__in`` query per batch.
+    """
+    found = {}
+    for start in range(0, len(address_ids), batch_size):
+        batch = address_ids[start : start + batch_size]
+        rows = AddressBookReadSerializer.queryset(
+            user.addresses.filter(id__in=batch)
+        )
+        async for row in rows:
+            found[row["id"]] = row
+    rows = [found[id] for id in address_ids if id in found]
+    return {
+        address["id"]: address
+        for address in AddressBookReadSerializer.to_representation(rows)
+    }
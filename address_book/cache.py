@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import time
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+
+class AddressBookCache:
+    """
+    Per user cache of address book GET responses.
+
+    Every user has a version number that is part of each cached response's key.
+    Any write to the user's address book bumps the version, which invalidates
+    all of their cached pages at once without having to find and delete them.
+
+    Entries live in CACHES[ADDRESS_CACHE_ALIAS]. With the default locmem cache
+    that is per process and a write only invalidates the pages cached by the
+    process that made it, so run a shared backend when serving from more than
+    one worker process or running background jobs. The address_book.W001
+    check warns about a locmem cache outside DEBUG.
+    """
+
+    key_prefix = "address_book"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def _cache(self):
+        return caches[settings.ADDRESS_CACHE_ALIAS]
+
+    def _version_key(self, user_id):
+        return f"{self.key_prefix}:version:{user_id}"
+
+    def get_version(self, user_id) -> int:
+        key = self._version_key(user_id)
+        version = self._cache.get(key)
+        if version is None:
+            # Start from the clock so an evicted version never restarts at a
+            # number that older cached entries (or ETags) were built with
+            self._cache.add(key, time.time_ns(), timeout=None)
+            version = self._cache.get(key, time.time_ns())
+        return version
+
+    def bump_version(self, user_id):
+        """
+        Invalidate the user's cached responses. Inside a transaction the version
+        is bumped again once it commits, a request reading between the two
+        bumps sees the rows from before the commit and may cache them under the
+        first new version.
+        """
+        self._bump_version(user_id)
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(partial(self._bump_version, user_id))
+
+    def _bump_version(self, user_id):
+        key = self._version_key(user_id)
+        try:
+            self._cache.incr(key)
+        except ValueError:
+            self._cache.set(key, time.time_ns(), timeout=None)
+
+    def response_key(self, request, validator="") -> str:
+        """
+        Cache key of a GET response. A ``validator`` read from the database,
+        like an ETag, keeps the key from matching a response cached before a
+        write whose invalidation this process missed.
+        """
+        url = hashlib.sha1(
+            f"{request.build_absolute_uri()}{validator}".encode()
+        ).hexdigest()
+        return f"{self.key_prefix}:response:{request.user.pk}:{self.get_version(request.user.pk)}:{url}"
+
+    def get(self, key):
+        data = self._cache.get(key)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def set(self, key, data):
+        self._cache.set(key, data, timeout=settings.ADDRESS_CACHE_TIMEOUT)
+
+    # Async views use these. Django's cache API is sync, so each runs in a thread
+    # pool, not the thread shared with the ORM, so cache lookups never queue
+    # behind queries.
+
+    async def abump_version(self, user_id):
+        await sync_to_async(self.bump_version, thread_sensitive=False)(user_id)
+
+    async def aresponse_key(self, request, validator="") -> str:
+        return await sync_to_async(self.response_key, thread_sensitive=False)(
+            request, validator
+        )
+
+    async def aget(self, key):
+        return await sync_to_async(self.get, thread_sensitive=False)(key)
+
+    async def aset(self, key, data):
+        await sync_to_async(self.set, thread_sensitive=False)(key, data)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+address_book_cache = AddressBookCache()
+
+
+def cache_address_response(view_method):
+    """
+    Serve a GET handler's 200 responses from the user's address book cache.
+
+    A cached response keeps its ETag, so a matching If-None-Match is answered
+    with a 304 straight from the cache. Works on sync and async handlers.
+    """
+
+    if asyncio.iscoroutinefunction(view_method):
+
+        @wraps(view_method)
+        async def async_wrapper(view, request, *args, **kwargs):
+            key = await address_book_cache.aresponse_key(request)
+            cached = await address_book_cache.aget(key)
+            if cached is not None:
+                return cached_response(request, cached)
+            response = await view_method(view, request, *args, **kwargs)
+            if response is not None and response.status_code == 200:
+                await address_book_cache.aset(
+                    key, (response.data, response.get("ETag"))
+                )
+            return response
+
+        return async_wrapper
+
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        key = address_book_cache.response_key(request)
+        cached = address_book_cache.get(key)
+        if cached is not None:
+            return cached_response(request, cached)
+        response = view_method(view, request, *args, **kwargs)
+        if response is not None and response.status_code == 200:
+            address_book_cache.set(key, (response.data, response.get("ETag")))
+        return response
+
+    return wrapper
+
+
+def cached_response(request, cached) -> Response:
+    """Response for a cached (data, etag) pair, a 304 if If-None-Match has the ETag"""
+    data, etag = cached
+    if etag and etag in parse_etags(
+        request.META.get("HTTP_IF_NONE_MATCH", "")
+    ):
+        response = Response(status=304)
+    else:
+        response = Response(data, status=200)
+    if etag:
+        response["ETag"] = etag
+    return response
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches)
+def check_address_cache_is_shared(app_configs, **kwargs):
+    """
+    Writes only invalidate the address book cache of the process that made them,
+    so with a per process cache other workers serve stale pages
+    """
+    if settings.DEBUG or not isinstance(
+        caches[settings.ADDRESS_CACHE_ALIAS], LocMemCache
+    ):
+        return []
+    return [
+        Warning(
+            f"CACHES[{settings.ADDRESS_CACHE_ALIAS!r}], the address book cache, is a "
+            "per process locmem cache.",
+            hint="Point ADDRESS_CACHE_ALIAS at a shared cache such as Redis or Memcached "
+            "when running more than one worker process or background jobs, otherwise "
+            "workers serve cached pages for up to ADDRESS_CACHE_TIMEOUT seconds after "
+            "another process changed them.",
+            id="address_book.W001",
+        )
+    ]
@@ -0,0 +1,43 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+
+def _strong_etag(value) -> str:
+    return f'"{hashlib.sha1(value.encode()).hexdigest()}"'
+
+
+def address_etag(address) -> str:
+    """ETag of a single address, changes whenever the row is saved"""
+    return _strong_etag(f"{address.id}:{address.updated_at.isoformat()}")
+
+
+async def aaddress_book_etag(request) -> str:
+    """
+    ETag of a page of the user's address book, built from the newest updated_at
+    and the number of addresses, one aggregate query on the (user, updated_at)
+    index. Inserts and updates move the newest updated_at and deletes the
+    count, so it changes with every write whichever process made it.
+    """
+    state = await request.user.addresses.aaggregate(
+        newest=Max("updated_at"), count=Count("id")
+    )
+    newest = state["newest"].isoformat() if state["newest"] else ""
+    return _strong_etag(
+        f"{newest}:{state['count']}:{request.build_absolute_uri()}"
+    )
+
+
+def etag_matches(header, etag) -> bool:
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return "*" in etags or etag in etags
+
+
+def not_modified(etag) -> Response:
+    response = Response(status=304)
+    response["ETag"] = etag
+    return response
@@ -0,0 +1,91 @@
+import csv
+import zlib
+
+import orjson
+
+from address_book.serializer import AddressBookReadSerializer
+
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class _Echo:
+    """File-like object that hands back whatever the csv writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def _iter_batches(queryset, chunk_size):
+    rows = AddressBookReadSerializer.queryset(queryset).iterator(
+        chunk_size=chunk_size
+    )
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            yield AddressBookReadSerializer.to_representation(batch)
+            batch = []
+    if batch:
+        yield AddressBookReadSerializer.to_representation(batch)
+
+
+def iter_pages(queryset, chunk_size):
+    """
+    Like _iter_batches, but each chunk is fetched by a query of its own, keyset
+    paginated on id. That costs a query per chunk, in exchange no read is left
+    open between chunks, for callers that write to the database as they go:
+    SQLite can't write from a connection whose read started before another
+    connection's write.
+    """
+    queryset = AddressBookReadSerializer.queryset(queryset).order_by("id")
+    page = queryset
+    while True:
+        rows = list(page[:chunk_size])
+        if not rows:
+            return
+        yield AddressBookReadSerializer.to_representation(rows)
+        page = queryset.filter(id__gt=rows[-1]["id"])
+
+
+def iter_ndjson(batches):
+    for batch in batches:
+        yield b"".join(orjson.dumps(address) + b"\n" for address in batch)
+
+
+def iter_csv(batches):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(AddressBookReadSerializer.fields).encode()
+    for batch in batches:
+        yield "".join(
+            writer.writerow(
+                [address[field] for field in AddressBookReadSerializer.fields]
+            )
+            for address in batch
+        ).encode()
+
+
+def encode_export(batches, export_format):
+    """Encode batches of addresses as NDJSON or CSV, a chunk per batch"""
+    if export_format == "csv":
+        return iter_csv(batches)
+    return iter_ndjson(batches)
+
+
+def iter_export(queryset, export_format, chunk_size):
+    """
+    Yield a user's addresses encoded as NDJSON or CSV, one chunk of rows at a
+    time, so memory stays flat however large the address book is
+    """
+    return encode_export(_iter_batches(queryset, chunk_size), export_format)
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
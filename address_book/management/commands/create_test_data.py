@@ -1,43 +1,172 @@
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from faker import Faker
 from rest_framework.authtoken.models import Token
 
+from address_book.matching import address_match_key
 from address_book.models import AddressBook
 
+_fake = None
+
+
+def generate_addresses(start, count) -> list:
+    """
+    Generate fake address fields for rows start..start + count.
+
+    Faker is slow per call, so each batch draws from a small pool of fake
+    streets, cities and postcodes. The row number leads address line one so
+    addresses never collide with the unique (user, zip_code, address_line_one,
+    country) constraint. Runs in worker processes, so it returns plain tuples.
+    """
+    global _fake
+    if _fake is None:
+        _fake = Faker()
+    pool_size = min(count, 500)
+    streets = [_fake.street_name() for _ in range(pool_size)]
+    cities = [_fake.city()[:50] for _ in range(pool_size)]
+    zip_codes = [_fake.postcode()[:10] for _ in range(pool_size)]
+    return [
+        (
+            f"{number} {random.choice(streets)}"[:50],
+            random.choice(cities),
+            random.choice(zip_codes),
+        )
+        for number in range(start, start + count)
+    ]
+
 
 class Command(BaseCommand):
-    help = "Generate a test user as well as a token for that user"
+    help = "Generate test users, each with a token and an address book"
 
     def add_arguments(self, parser):
-        parser.add_argument("count", nargs="+", type=int)
+        parser.add_argument(
+            "count",
+            nargs="?",
+            type=int,
+            help="Addresses per user, same as --per-user",
+        )
+        parser.add_argument(
+            "--users", type=int, default=1, help="Number of users to create"
+        )
+        parser.add_argument(
+            "--per-user", type=int, default=0, help="Addresses per user"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Addresses inserted per transaction",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Generate fake addresses in this many processes, 0 generates them inline",
+        )
+        parser.add_argument(
+            "--no-wipe",
+            action="store_true",
+            help="Append to the existing data instead of deleting all users and addresses",
+        )
 
     def handle(self, *args, **options):
-        User.objects.all().delete()
-        AddressBook.objects.all().delete()
+        per_user = (
+            options["count"]
+            if options["count"] is not None
+            else options["per_user"]
+        )
+        batch_size = options["batch_size"]
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1")
+
+        if not options["no_wipe"]:
+            User.objects.all().delete()
+            AddressBook.objects.all().delete()
 
         fake = Faker()
-        count = options["count"][0]
-
-        # Create a user
-        user = User.objects.create_user(
-            username=fake.name(), email=fake.email(), password="password"
-        )
-
-        # generate a token for the user
-        token = Token.objects.create(user=user)
-        if count:
-            for _ in range(0, count):
-                AddressBook.objects.create(
-                    user=user,
-                    country="GB",
-                    address_line_one=fake.address(),
-                    city=fake.city(),
-                    zip_code=fake.postcode(),
+        started = time.perf_counter()
+
+        # Every user gets the password "password", hash it once rather than per user
+        password = make_password("password")
+        users = []
+        for _ in range(options["users"]):
+            suffix = uuid.uuid4().hex[:8]
+            users.append(
+                User(
+                    username=f"{fake.name()} {suffix}",
+                    email=f"{fake.user_name()}.{suffix}@{fake.free_email_domain()}",
+                    password=password,
                 )
+            )
+        with transaction.atomic():
+            users = User.objects.bulk_create(users)
+            if not all(user.pk for user in users):
+                # Backends that cannot return ids from a bulk insert
+                users = list(
+                    User.objects.filter(
+                        username__in=[user.username for user in users]
+                    )
+                )
+            tokens = Token.objects.bulk_create(
+                Token(key=Token.generate_key(), user=user) for user in users
+            )
 
+        starts = list(range(0, per_user, batch_size))
+        counts = [min(batch_size, per_user - start) for start in starts]
+        created = 0
+        executor = (
+            ProcessPoolExecutor(options["workers"])
+            if options["workers"]
+            else None
+        )
+        try:
+            for user in users:
+                if executor is not None:
+                    generated = executor.map(
+                        generate_addresses, starts, counts
+                    )
+                else:
+                    generated = map(generate_addresses, starts, counts)
+                for rows in generated:
+                    with transaction.atomic():
+                        AddressBook.objects.bulk_create(
+                            AddressBook(
+                                user=user,
+                                country="GB",
+                                address_line_one=address_line_one,
+                                city=city,
+                                zip_code=zip_code,
+                                match_key=address_match_key(
+                                    "GB", address_line_one, zip_code
+                                ),
+                            )
+                            for address_line_one, city, zip_code in rows
+                        )
+                    created += len(rows)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        elapsed = time.perf_counter() - started
+        user, token = users[0], tokens[0]
         self.stdout.write(
             self.style.SUCCESS(
-                f"Successfully created {count} addresses for user {user} with email {user.email} and token {token.key}"
+                f"Successfully created {per_user} addresses for user {user} with email {user.email} and token {token.key}"
+            )
+        )
+        if len(users) > 1:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Created {len(users)} users with {per_user} addresses each"
+                )
             )
+        self.stdout.write(
+            f"Inserted {created} addresses in {elapsed:.2f}s ({created / elapsed:.0f} rows/s)"
         )
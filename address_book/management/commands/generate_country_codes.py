@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+import address_book
+
+COUNTRY_CODES_PATH = (
+    Path(address_book.__file__).resolve().parent / "countries.py"
+)
+
+TEMPLATE = """# Generated by `python manage.py generate_country_codes` from pycountry {version}.
+# Do not edit by hand, regenerate it when pycountry is upgraded.
+
+COUNTRY_CODES = frozenset(
+    [
+{codes}
+    ]
+)
+"""
+
+
+def render_country_codes() -> str:
+    """Render the country code module from the pycountry database"""
+    from importlib.metadata import version
+
+    import pycountry
+
+    codes = sorted(country.alpha_2 for country in pycountry.countries)
+    return TEMPLATE.format(
+        version=version("pycountry"),
+        codes="\n".join(f'        "{code}",' for code in codes),
+    )
+
+
+class Command(BaseCommand):
+    help = "Regenerate address_book/countries.py, the table of valid ISO 3166-1 alpha-2 codes"
+
+    def handle(self, *args, **options):
+        COUNTRY_CODES_PATH.write_text(render_country_codes())
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully wrote {COUNTRY_CODES_PATH}")
+        )
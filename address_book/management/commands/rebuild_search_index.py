@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from address_book.cache import address_book_cache
+from address_book.models import AddressBook
+from address_book.search import SQLITE_FTS_TABLE
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SQLite full text search index of addresses, e.g. after a VACUUM"
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            # Other backends index the address table itself
+            self.stdout.write(
+                "Only SQLite keeps a separate search index, nothing to rebuild"
+            )
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"
+            )
+        # Searches cached from the old index may have returned the wrong addresses
+        user_ids = AddressBook.objects.values_list(
+            "user_id", flat=True
+        ).distinct()
+        for user_id in user_ids.order_by():
+            address_book_cache.bump_version(user_id)
+        self.stdout.write(
+            self.style.SUCCESS("Rebuilt the address search index")
+        )
@@ -0,0 +1,60 @@
+"""
+Match keys, the normalized form of an address used to tell whether two
+addresses are the same.
+
+"10 Downing St." / "10 downing st" and "SW1A 2AA" / "sw1a2aa" have the same
+match key. Address line one is case folded with punctuation and whitespace
+collapsed, the zip code is reduced to its letters and digits and then
+canonicalized for the country. The key starts with the country, the same line
+and zip code in two countries are two addresses.
+"""
+import re
+import unicodedata
+
+MATCH_KEY_MAX_LENGTH = 255
+
+# Countries with numeric postcodes that are often written with a country
+# prefix, "D-10115" or "F-75007"
+ZIP_CODE_PREFIXES = {
+    "AT": ("AT", "A"),
+    "BE": ("BE", "B"),
+    "CH": ("CH",),
+    "DE": ("DE", "D"),
+    "DK": ("DK",),
+    "FI": ("FI",),
+    "FR": ("FR", "F"),
+    "LU": ("LU", "L"),
+    "NO": ("NO", "N"),
+    "SE": ("SE", "S"),
+}
+
+_NON_WORD = re.compile(r"[\W_]+")
+_US_ZIP_PLUS_FOUR = re.compile(r"^(\d{5})\d{4}$")
+
+
+def normalize_text(value) -> str:
+    """Case fold and replace runs of punctuation and whitespace with a single space"""
+    value = unicodedata.normalize("NFC", value or "").casefold()
+    return _NON_WORD.sub(" ", value).strip()
+
+
+def normalize_zip_code(country, zip_code) -> str:
+    zip_code = _NON_WORD.sub(
+        "", unicodedata.normalize("NFC", zip_code or "")
+    ).upper()
+    country = (country or "").upper()
+    for prefix in ZIP_CODE_PREFIXES.get(country, ()):
+        if zip_code.startswith(prefix) and zip_code[len(prefix) :].isdigit():
+            return zip_code[len(prefix) :]
+    if country == "US":
+        # ZIP+4 only narrows down a delivery route within the ZIP code
+        match = _US_ZIP_PLUS_FOUR.match(zip_code)
+        if match:
+            return match.group(1)
+    return zip_code
+
+
+def address_match_key(country, address_line_one, zip_code) -> str:
+    zip_code = normalize_zip_code(country, zip_code)
+    key = f"{(country or '').upper()}|{zip_code}|{normalize_text(address_line_one)}"
+    return key[:MATCH_KEY_MAX_LENGTH]
@@ -1,9 +1,10 @@
 # Generated by Django 4.1 on 2022-08-09 17:34
 
+import uuid
+
+import django.db.models.deletion
 from django.conf import settings
 from django.db import migrations, models
-import django.db.models.deletion
-import uuid
 
 
 class Migration(migrations.Migration):
@@ -16,15 +17,33 @@ class Migration(migrations.Migration):
 
     operations = [
         migrations.CreateModel(
-            name='AddressBook',
+            name="AddressBook",
             fields=[
-                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
-                ('country', models.CharField(max_length=2)),
-                ('address_line_one', models.CharField(max_length=50)),
-                ('address_line_two', models.CharField(blank=True, max_length=50, null=True)),
-                ('city', models.CharField(max_length=50)),
-                ('zip_code', models.CharField(max_length=10)),
-                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='addresses', to=settings.AUTH_USER_MODEL)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("country", models.CharField(max_length=2)),
+                ("address_line_one", models.CharField(max_length=50)),
+                (
+                    "address_line_two",
+                    models.CharField(blank=True, max_length=50, null=True),
+                ),
+                ("city", models.CharField(max_length=50)),
+                ("zip_code", models.CharField(max_length=10)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="addresses",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
             ],
         ),
     ]
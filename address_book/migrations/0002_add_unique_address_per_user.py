@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import IntegrityError, migrations, models
+
+UNIQUE_ADDRESS_FIELDS = ("user_id", "zip_code", "address_line_one", "country")
+
+
+def check_for_duplicate_addresses(apps, schema_editor):
+    """
+    Refuse to add the unique constraint while a user has two addresses with the
+    same zip code, address line one and country. Which one to keep is the
+    user's call, so nothing is deleted here, the duplicates are listed instead.
+    """
+    AddressBook = apps.get_model("address_book", "AddressBook")
+    addresses = AddressBook.objects.using(schema_editor.connection.alias)
+    duplicated = list(
+        addresses.values(*UNIQUE_ADDRESS_FIELDS)
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+        .order_by(*UNIQUE_ADDRESS_FIELDS)[:20]
+    )
+    if duplicated:
+        groups = "\n".join(
+            "  "
+            + ", ".join(
+                f"{field}={group[field]!r}" for field in UNIQUE_ADDRESS_FIELDS
+            )
+            + f" ({group['count']} addresses)"
+            for group in duplicated
+        )
+        raise IntegrityError(
+            "Cannot add unique_address_per_user, these addresses are duplicated "
+            f"(first {len(duplicated)} shown). Merge or delete them, then migrate "
+            f"again.\n{groups}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("address_book", "0001_add_addressbook_model"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            check_for_duplicate_addresses, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="addressbook",
+            constraint=models.UniqueConstraint(
+                fields=("user", "zip_code", "address_line_one", "country"),
+                name="unique_address_per_user",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.1 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("address_book", "0002_add_unique_address_per_user"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="addressbook",
+            index=models.Index(
+                fields=["user", "id"], name="address_user_id_idx"
+            ),
+        ),
+    ]
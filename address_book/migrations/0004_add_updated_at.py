@@ -0,0 +1,27 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("address_book", "0003_add_user_id_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="addressbook",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="addressbook",
+            index=models.Index(
+                fields=["user", "updated_at"],
+                name="address_user_updated_at_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,105 @@
+from django.db import migrations, models
+
+# The search SQL as of this migration, frozen so that later changes to
+# address_book.search do not change what this migration does
+
+SQLITE_FTS_TABLE = "address_book_addressbook_fts"
+
+SQLITE_INSTALL_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        user_id, address_line_one, address_line_two, city, zip_code,
+        content='address_book_addressbook', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_insert
+    AFTER INSERT ON address_book_addressbook BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, user_id, address_line_one, address_line_two, city, zip_code)
+        VALUES (new.rowid, new.user_id, new.address_line_one, new.address_line_two, new.city, new.zip_code);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_delete
+    AFTER DELETE ON address_book_addressbook BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(
+            {SQLITE_FTS_TABLE}, rowid, user_id, address_line_one, address_line_two, city, zip_code
+        )
+        VALUES ('delete', old.rowid, old.user_id, old.address_line_one, old.address_line_two, old.city, old.zip_code);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_update
+    AFTER UPDATE ON address_book_addressbook BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(
+            {SQLITE_FTS_TABLE}, rowid, user_id, address_line_one, address_line_two, city, zip_code
+        )
+        VALUES ('delete', old.rowid, old.user_id, old.address_line_one, old.address_line_two, old.city, old.zip_code);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, user_id, address_line_one, address_line_two, city, zip_code)
+        VALUES (new.rowid, new.user_id, new.address_line_one, new.address_line_two, new.city, new.zip_code);
+    END
+    """,
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL_SQL = [
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_update",
+    f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}",
+]
+
+POSTGRES_INSTALL_SQL = [
+    "CREATE INDEX IF NOT EXISTS address_book_search_idx ON address_book_addressbook "
+    "USING GIN (to_tsvector('simple', coalesce(address_line_one, '') || ' ' || "
+    "coalesce(address_line_two, '') || ' ' || city || ' ' || zip_code))",
+]
+
+POSTGRES_UNINSTALL_SQL = ["DROP INDEX IF EXISTS address_book_search_idx"]
+
+
+def _execute(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def install_search(apps, schema_editor):
+    """Create the full text search index for the database in use, if it has one"""
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        _execute(schema_editor, SQLITE_INSTALL_SQL)
+    elif vendor == "postgresql":
+        _execute(schema_editor, POSTGRES_INSTALL_SQL)
+
+
+def uninstall_search(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        _execute(schema_editor, SQLITE_UNINSTALL_SQL)
+    elif vendor == "postgresql":
+        _execute(schema_editor, POSTGRES_UNINSTALL_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("address_book", "0004_add_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="addressbook",
+            index=models.Index(
+                fields=["user", "city"], name="address_user_city_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="addressbook",
+            index=models.Index(
+                fields=["user", "country"], name="address_user_country_idx"
+            ),
+        ),
+        # SQLite FTS5 table and triggers, or a GIN index on Postgres
+        migrations.RunPython(install_search, uninstall_search),
+    ]
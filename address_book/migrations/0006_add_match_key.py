@@ -0,0 +1,126 @@
+import re
+import unicodedata
+
+from django.db import migrations, models, transaction
+
+BACKFILL_BATCH_SIZE = 2000
+
+# A frozen copy of address_book.matching as of this migration, the keys it
+# writes must not change when the runtime code does
+ZIP_CODE_PREFIXES = {
+    "AT": ("AT", "A"),
+    "BE": ("BE", "B"),
+    "CH": ("CH",),
+    "DE": ("DE", "D"),
+    "DK": ("DK",),
+    "FI": ("FI",),
+    "FR": ("FR", "F"),
+    "LU": ("LU", "L"),
+    "NO": ("NO", "N"),
+    "SE": ("SE", "S"),
+}
+
+_NON_WORD = re.compile(r"[\W_]+")
+_US_ZIP_PLUS_FOUR = re.compile(r"^(\d{5})\d{4}$")
+
+
+def normalize_text(value):
+    value = unicodedata.normalize("NFC", value or "").casefold()
+    return _NON_WORD.sub(" ", value).strip()
+
+
+def normalize_zip_code(country, zip_code):
+    zip_code = _NON_WORD.sub(
+        "", unicodedata.normalize("NFC", zip_code or "")
+    ).upper()
+    country = (country or "").upper()
+    for prefix in ZIP_CODE_PREFIXES.get(country, ()):
+        if zip_code.startswith(prefix) and zip_code[len(prefix) :].isdigit():
+            return zip_code[len(prefix) :]
+    if country == "US":
+        match = _US_ZIP_PLUS_FOUR.match(zip_code)
+        if match:
+            return match.group(1)
+    return zip_code
+
+
+def address_match_key(country, address_line_one, zip_code):
+    zip_code = normalize_zip_code(country, zip_code)
+    key = f"{(country or '').upper()}|{zip_code}|{normalize_text(address_line_one)}"
+    return key[:255]
+
+
+def backfill_match_keys(apps, schema_editor):
+    """
+    Set the match key of existing addresses, a batch per transaction so the
+    table is never locked for long. Walks the table in primary key order.
+
+    An address whose key is already taken by another of the user's addresses is
+    a near duplicate, it is left with a null key so the unique constraint can be
+    added, find them with AddressBook.objects.filter(match_key__isnull=True).
+    """
+    AddressBook = apps.get_model("address_book", "AddressBook")
+    db_alias = schema_editor.connection.alias
+    addresses = AddressBook.objects.using(db_alias).only(
+        "id", "user_id", "country", "address_line_one", "zip_code"
+    )
+    last_id = None
+    while True:
+        batch = addresses.order_by("id")
+        if last_id is not None:
+            batch = batch.filter(id__gt=last_id)
+        batch = list(batch[:BACKFILL_BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        with transaction.atomic(using=db_alias):
+            for address in batch:
+                address.match_key = address_match_key(
+                    address.country, address.address_line_one, address.zip_code
+                )
+            owners = {
+                (user_id, match_key): address_id
+                for user_id, match_key, address_id in AddressBook.objects.using(
+                    db_alias
+                )
+                .filter(
+                    user_id__in={address.user_id for address in batch},
+                    match_key__in={address.match_key for address in batch},
+                )
+                .values_list("user_id", "match_key", "id")
+            }
+            for address in batch:
+                key = (address.user_id, address.match_key)
+                if owners.setdefault(key, address.id) != address.id:
+                    address.match_key = None
+            AddressBook.objects.using(db_alias).bulk_update(
+                batch, ["match_key"]
+            )
+
+
+class Migration(migrations.Migration):
+    # Each backfill batch commits on its own
+    atomic = False
+
+    dependencies = [
+        ("address_book", "0005_add_address_search"),
+    ]
+
+    operations = [
+        # Nullable without a default, so the column is added in place rather than
+        # by rebuilding the table
+        migrations.AddField(
+            model_name="addressbook",
+            name="match_key",
+            field=models.CharField(editable=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(backfill_match_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="addressbook",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(match_key__isnull=False),
+                fields=("user", "match_key"),
+                name="unique_address_match_key_per_user",
+            ),
+        ),
+    ]
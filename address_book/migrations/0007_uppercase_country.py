@@ -0,0 +1,26 @@
+from django.db import migrations
+from django.db.models.functions import Now, Upper
+
+
+def uppercase_countries(apps, schema_editor):
+    """
+    Country codes were stored as given, the serializer now upper cases them. An
+    address saved in both cases fails the unique constraint here, and is left
+    for its owner to remove, as 0002 does.
+    """
+    AddressBook = apps.get_model("address_book", "AddressBook")
+    db_alias = schema_editor.connection.alias
+    AddressBook.objects.using(db_alias).exclude(
+        country=Upper("country")
+    ).update(country=Upper("country"), updated_at=Now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("address_book", "0006_add_match_key"),
+    ]
+
+    operations = [
+        migrations.RunPython(uppercase_countries, migrations.RunPython.noop),
+    ]
@@ -1,17 +1,115 @@
 import uuid
+from contextlib import nullcontext
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from address_book.matching import MATCH_KEY_MAX_LENGTH, address_match_key
+
+MATCH_KEY_FIELDS = {"country", "address_line_one", "zip_code"}
 
 
 class AddressBook(models.Model):
     id = models.UUIDField(editable=False, default=uuid.uuid4, primary_key=True)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="addresses")
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="addresses"
+    )
     country = models.CharField(max_length=2)
     address_line_one = models.CharField(max_length=50)
-    address_line_two = models.CharField(max_length=50, null=True, blank=True)  # optional
+    address_line_two = models.CharField(
+        max_length=50, null=True, blank=True
+    )  # optional
     city = models.CharField(max_length=50)
     zip_code = models.CharField(max_length=10)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Country, normalized zip code and address line one, see address_book.matching. Null
+    # only for rows the backfill found to duplicate an earlier address.
+    match_key = models.CharField(
+        max_length=MATCH_KEY_MAX_LENGTH, null=True, editable=False
+    )
+
+    class Meta:
+        constraints = [
+            # Address line one, zip code and country uniquely identify an address for
+            # a user. The unique index doubles as the composite lookup index for
+            # duplicate checks, country is last so zip code prefix searches use it.
+            models.UniqueConstraint(
+                fields=["user", "zip_code", "address_line_one", "country"],
+                name="unique_address_per_user",
+            ),
+            # The same check on normalized addresses, "10 Downing St." matches
+            # "10 downing st". The condition only lets SQLite add the index without
+            # rebuilding the table, null keys never conflict anyway.
+            models.UniqueConstraint(
+                fields=["user", "match_key"],
+                condition=models.Q(match_key__isnull=False),
+                name="unique_address_match_key_per_user",
+            ),
+        ]
+        indexes = [
+            # Keyset pagination walks a user's addresses in id order
+            models.Index(fields=["user", "id"], name="address_user_id_idx"),
+            # Exports only send addresses changed since a cut-off
+            models.Index(
+                fields=["user", "updated_at"],
+                name="address_user_updated_at_idx",
+            ),
+            # Listing filters, zip code prefix searches use the unique index
+            models.Index(
+                fields=["user", "city"], name="address_user_city_idx"
+            ),
+            models.Index(
+                fields=["user", "country"], name="address_user_country_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.match_key = address_match_key(
+            self.country, self.address_line_one, self.zip_code
+        )
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and MATCH_KEY_FIELDS.intersection(
+            update_fields
+        ):
+            kwargs["update_fields"] = {*update_fields, "match_key"}
+        super().save(*args, **kwargs)
+
+    def save_fields(self, update_fields, if_unchanged=True) -> bool:
+        """
+        Write update_fields in one UPDATE, with if_unchanged only if the row still
+        has the updated_at this instance was read with. Returns False, writing
+        nothing, when the address is gone or another write got there first.
+
+        Outside a transaction the UPDATE runs on its own in autocommit. SQLite
+        waits out busy_timeout for a lone write statement, while a transaction
+        that has read, or a BEGIN followed by the UPDATE in WAL mode, can fail at
+        once with "database is locked" when another connection writes first.
+        """
+        self.match_key = address_match_key(
+            self.country, self.address_line_one, self.zip_code
+        )
+        fields = set(update_fields)
+        if MATCH_KEY_FIELDS.intersection(fields):
+            fields.add("match_key")
+        rows = AddressBook.objects.filter(pk=self.pk)
+        if if_unchanged:
+            rows = rows.filter(updated_at=self.updated_at)
+        updated_at = timezone.now()
+        # Inside a transaction, a savepoint so a duplicate doesn't break it
+        savepoint = (
+            transaction.atomic()
+            if connection.in_atomic_block
+            else nullcontext()
+        )
+        with savepoint:
+            written = rows.update(
+                updated_at=updated_at,
+                **{field: getattr(self, field) for field in fields},
+            )
+        if written:
+            self.updated_at = updated_at
+        return bool(written)
 
     def __str__(self):
         return f"{self.address_line_one}, {self.city} {self.zip_code}"
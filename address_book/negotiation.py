@@ -0,0 +1,13 @@
+from rest_framework.negotiation import DefaultContentNegotiation
+
+
+class IgnoreFormatContentNegotiation(DefaultContentNegotiation):
+    """
+    Always select the view's first renderer.
+
+    For views that stream their own output format and read ``?format=``
+    themselves, where DRF would otherwise 404 on a format it has no renderer for.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
@@ -0,0 +1,50 @@
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """
+    PageNumberPagination for async views, the count and the page are fetched
+    with the async ORM rather than by Django's Paginator.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached property, setting it skips the sync COUNT(*)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+        self.page.object_list = [row async for row in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.request = request
+        return self.page.object_list
+
+
+class AddressCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a user's addresses.
+
+    Pages are fetched with ``WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?``
+    on the (user, id) index, so there is no OFFSET scan and no COUNT(*).
+    The cursor is opaque to clients; start with ``?cursor=`` and follow ``next``.
+    """
+
+    ordering = "id"
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
@@ -0,0 +1,31 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from address_service.parsers import loads
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline delimited JSON, one object per line, into a list
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        rows = []
+        if stream is None:
+            return rows
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(loads(line, encoding, strict=False))
+            except ValueError as exc:
+                raise ParseError(
+                    f"NDJSON parse error on line {line_number} - {exc}"
+                )
+        return rows
@@ -0,0 +1,99 @@
+"""
+Filtering and free text search over a user's addresses.
+
+``city`` and ``zip_code`` are prefix searches written as range conditions,
+``city >= 'Lon' AND city < 'Lon\\U0010ffff'``, so they are answered from the
+(user, city) and (user, zip_code, ...) indexes on every backend. They are case
+sensitive.
+
+``q`` is a free text prefix search over every address field. On SQLite it uses
+an FTS5 table kept in sync with AddressBook by triggers, on Postgres a GIN
+index over a tsvector of the same fields, elsewhere it falls back to icontains.
+
+The FTS5 table and its triggers are created by migration 0005. The index is
+keyed on the address table's implicit rowid, as the primary key is a UUID, and
+VACUUM may renumber the rowids of such a table, leaving the index pointing at
+the wrong addresses. Run ``python manage.py rebuild_search_index`` after a
+VACUUM. Django also rebuilds the whole table for some schema changes, which
+drops the triggers, so a migration that does has to recreate them from a frozen
+copy of 0005's SQL and rebuild the index.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+PREFIX_UPPER_BOUND = "\U0010ffff"
+SEARCH_FIELDS = ("address_line_one", "address_line_two", "city", "zip_code")
+
+SQLITE_FTS_TABLE = "address_book_addressbook_fts"
+
+POSTGRES_SEARCH_VECTOR = (
+    "to_tsvector('simple', coalesce(address_line_one, '') || ' ' || "
+    "coalesce(address_line_two, '') || ' ' || city || ' ' || zip_code)"
+)
+
+
+def prefix_filter(field, prefix) -> Q:
+    return Q(
+        **{
+            f"{field}__gte": prefix,
+            f"{field}__lt": prefix + PREFIX_UPPER_BOUND,
+        }
+    )
+
+
+def search_filter(text, user_id):
+    """
+    Condition matching the user's addresses that contain a word starting with
+    every word of ``text``, or None when ``text`` has no words
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    if connection.vendor == "sqlite":
+        # The owner is indexed too, so FTS5 only walks the user's matches
+        words_match = " ".join(f'"{word}"*' for word in words)
+        columns = " ".join(SEARCH_FIELDS)
+        match = (
+            f'user_id : "{int(user_id)}" AND {{{columns}}} : ({words_match})'
+        )
+        return Q(
+            id__in=RawSQL(
+                f"SELECT id FROM address_book_addressbook WHERE rowid IN "
+                f"(SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s)",
+                [match],
+            )
+        )
+    if connection.vendor == "postgresql":
+        query = " & ".join(f"{word}:*" for word in words)
+        return RawSQL(
+            f"{POSTGRES_SEARCH_VECTOR} @@ to_tsquery('simple', %s)",
+            [query],
+            output_field=BooleanField(),
+        )
+    condition = Q()
+    for word in words:
+        condition &= Q(
+            *(Q(**{f"{field}__icontains": word}) for field in SEARCH_FIELDS),
+            _connector=Q.OR,
+        )
+    return condition
+
+
+def filter_addresses(addresses, params, user):
+    """Apply the city, zip_code, country and q query parameters to a queryset"""
+    if params.get("country"):
+        addresses = addresses.filter(country=params["country"].upper())
+    if params.get("city"):
+        addresses = addresses.filter(prefix_filter("city", params["city"]))
+    if params.get("zip_code"):
+        addresses = addresses.filter(
+            prefix_filter("zip_code", params["zip_code"])
+        )
+    if params.get("q"):
+        condition = search_filter(params["q"], user.pk)
+        if condition is not None:
+            addresses = addresses.filter(condition)
+    return addresses
@@ -1,9 +1,18 @@
-import pycountry
 from django.contrib.auth.models import User
 from rest_framework import serializers
 
+from address_book.countries import COUNTRY_CODES
+from address_book.matching import address_match_key
 from address_book.models import AddressBook
 
+UPDATABLE_FIELDS = (
+    "country",
+    "address_line_one",
+    "address_line_two",
+    "city",
+    "zip_code",
+)
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -15,7 +24,9 @@ class AddressBookSerializer(serializers.Serializer):
     id = serializers.UUIDField(required=False)
     country = serializers.CharField(max_length=2, min_length=2)
     address_line_one = serializers.CharField(max_length=50)
-    address_line_two = serializers.CharField(allow_blank=True, max_length=50, allow_null=True)
+    address_line_two = serializers.CharField(
+        allow_blank=True, max_length=50, allow_null=True
+    )
     city = serializers.CharField(max_length=50)
     zip_code = serializers.CharField(max_length=10)
 
@@ -23,41 +34,109 @@ class AddressBookSerializer(serializers.Serializer):
         return AddressBook.objects.create(**validated_data)
 
     def update(self, instance, validated_data):
-        instance.country = validated_data.get("country", instance.country)
-        instance.address_line_one = validated_data.get(
-            "address_line_one", instance.address_line_one
-        )
-        instance.address_line_two = validated_data.get(
-            "address_line_two", instance.address_line_two
-        )
-        instance.city = validated_data.get("city", instance.city)
-        instance.zip_code = validated_data.get("zip_code", instance.zip_code)
-        instance.save()
+        """Set the fields that changed and write only those columns"""
+        changed = self.changed_fields(instance, validated_data)
+        if changed:
+            for field in changed:
+                setattr(instance, field, validated_data[field])
+            instance.save(update_fields=[*changed, "updated_at"])
         return instance
 
     @classmethod
-    def address_exists_for_user(cls, user, address_line_one, zip_code) -> bool:
+    def changed_fields(cls, instance, validated_data) -> list:
+        """The address fields in validated_data that differ from the instance"""
+        return [
+            field
+            for field in UPDATABLE_FIELDS
+            if field in validated_data
+            and validated_data[field] != getattr(instance, field)
+        ]
+
+    @classmethod
+    def address_exists_for_user(
+        cls, user, country, address_line_one, zip_code
+    ) -> bool:
         """
-        Check if an address already exists in the address book
+        Check if an address already exists in the address book, ignoring case,
+        punctuation and how the zip code is written
         """
-        return (
-            AddressBook.objects.filter(
-                user=user, address_line_one=address_line_one, zip_code=zip_code
-            ).count()
-            > 0
-        )
+        return AddressBook.objects.filter(
+            user=user,
+            match_key=address_match_key(country, address_line_one, zip_code),
+        ).exists()
+
+    @classmethod
+    async def aaddress_exists_for_user(
+        cls, user, country, address_line_one, zip_code
+    ) -> bool:
+        return await AddressBook.objects.filter(
+            user=user,
+            match_key=address_match_key(country, address_line_one, zip_code),
+        ).aexists()
+
+    def validate_country(self, value):
+        # Stored upper case, so filtering by country is an exact match
+        return value.upper()
 
     def validate(self, data):
-        if not pycountry.countries.get(alpha_2=data["country"]):
+        # Partial updates only validate the fields they were given
+        if "country" in data and data["country"] not in COUNTRY_CODES:
             raise serializers.ValidationError("Country is not valid")
-        if len(data["zip_code"]) > 10:
-            raise serializers.ValidationError("Zip code can be up to 10 characters long")
-        if len(data["address_line_one"]) > 50:
+        if len(data.get("zip_code", "")) > 10:
+            raise serializers.ValidationError(
+                "Zip code can be up to 10 characters long"
+            )
+        if len(data.get("address_line_one", "")) > 50:
             raise serializers.ValidationError("Address line one is too long")
-        if data["address_line_two"]:
+        if data.get("address_line_two"):
             if len(data["address_line_two"]) > 50:
-                raise serializers.ValidationError("Address line two is too long")
-        if len(data["city"]) > 50:
+                raise serializers.ValidationError(
+                    "Address line two is too long"
+                )
+        if len(data.get("city", "")) > 50:
             raise serializers.ValidationError("City is too long")
 
         return data
+
+
+class AddressUpdateSerializer(serializers.Serializer):
+    """A row of a bulk update, an address id and the fields to change"""
+
+    def get_fields(self):
+        # Declared here, a "fields" class attribute would hide Serializer.fields
+        return {
+            "id": serializers.UUIDField(),
+            "fields": serializers.DictField(),
+        }
+
+    def validate_fields(self, value):
+        serializer = AddressBookSerializer(data=value, partial=True)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+
+class AddressBookReadSerializer:
+    """
+    Read only fast path for address listings.
+
+    Rows are fetched with ``.values()`` and rendered straight to dicts, skipping
+    model instances and DRF's per field ``to_representation``. The output is the
+    same as ``AddressBookSerializer(addresses, many=True).data``.
+    """
+
+    fields = (
+        "id",
+        "country",
+        "address_line_one",
+        "address_line_two",
+        "city",
+        "zip_code",
+    )
+
+    @classmethod
+    def queryset(cls, queryset):
+        return queryset.values(*cls.fields)
+
+    @classmethod
+    def to_representation(cls, rows) -> list:
+        return [{**row, "id": str(row["id"])} for row in rows]
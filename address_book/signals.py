@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from address_book.cache import address_book_cache
+from address_book.models import AddressBook
+
+
+@receiver(post_save, sender=AddressBook)
+@receiver(post_delete, sender=AddressBook)
+def invalidate_address_book_cache(sender, instance, **kwargs):
+    """Invalidate the owner's cached responses whenever an address changes"""
+    address_book_cache.bump_version(instance.user_id)
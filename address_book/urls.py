@@ -1,13 +1,23 @@
 from django.urls import path
 
 from address_book.views import AddressAPI as AddressBookView
-from address_book.views import GetAndUpdateAddressView
+from address_book.views import (
+    AddressBulkAPI,
+    AddressExportView,
+    AddressLookupAPI,
+    GetAndUpdateAddressView,
+)
 
 urlpatterns = [
     path("", AddressBookView.as_view(), name="addresses"),
+    path("bulk/", AddressBulkAPI.as_view(), name="bulk_addresses"),
+    path("export/", AddressExportView.as_view(), name="export_addresses"),
+    path("lookup/", AddressLookupAPI.as_view(), name="lookup_addresses"),
     path(
         "<uuid:address_id>/",
-        GetAndUpdateAddressView.as_view(http_method_names=["put", "get"]),
+        GetAndUpdateAddressView.as_view(
+            http_method_names=["put", "patch", "get"]
+        ),
         name="get_and_update_address",
     ),
 ]
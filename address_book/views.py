@@ -1,31 +1,137 @@
-import json
 import uuid
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime, timezone
 
-from django.contrib.auth.models import User
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_http_date_safe
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from address_book.models import AddressBook
-from address_book.serializer import AddressBookSerializer
+from address_book.async_views import AsyncAPIView
+from address_book.bulk import (
+    alookup_addresses,
+    batch_count,
+    can_delete_returning,
+    delete_addresses,
+    import_addresses,
+    update_addresses,
+)
+from address_book.cache import (
+    address_book_cache,
+    cache_address_response,
+    cached_response,
+)
+from address_book.etags import (
+    aaddress_book_etag,
+    address_etag,
+    etag_matches,
+    not_modified,
+)
+from address_book.export import EXPORT_CONTENT_TYPES, gzip_stream, iter_export
+from address_book.models import MATCH_KEY_FIELDS, AddressBook
+from address_book.negotiation import IgnoreFormatContentNegotiation
+from address_book.pagination import (
+    AddressCursorPagination,
+    AsyncPageNumberPagination,
+)
+from address_book.parsers import NDJSONParser
+from address_book.search import filter_addresses
+from address_book.serializer import (
+    AddressBookReadSerializer,
+    AddressBookSerializer,
+    AddressUpdateSerializer,
+)
+from address_service.parsers import ORJSONParser
+from address_service.query_budget import query_budget
+from address_service.renderers import ORJSONRenderer
 
+# Times a PATCH without If-Match whose match key depends on the stored address
+# reads it again after another write got in first, before giving up with a 409. Each retry is two more
+# queries than the view's budget.
+WRITE_ATTEMPTS = 3
 
-class GetAndUpdateAddressView(APIView):
-    @swagger_auto_schema(responses={200: AddressBookSerializer(many=False), 404: "Not found"})
-    def get(self, request, address_id=None) -> Response:
+
+def delete_query_budget(request) -> int:
+    # savepoint and release, then per batch a DELETE ... RETURNING, or without
+    # RETURNING a select, then a delete with its own savepoint and release
+    address_ids = (
+        request.data.get("address_ids")
+        if isinstance(request.data, dict)
+        else None
+    )
+    per_batch = 1 if can_delete_returning(connection) else 4
+    return 2 + per_batch * batch_count(
+        address_ids, settings.ADDRESS_BULK_BATCH_SIZE
+    )
+
+
+def bulk_import_query_budget(request) -> int:
+    # savepoint and release, then per batch a select for duplicates and an insert
+    return 2 + 2 * batch_count(request.data, settings.ADDRESS_BULK_BATCH_SIZE)
+
+
+def bulk_update_query_budget(request) -> int:
+    # savepoint and release, then per batch a select of the addresses, one for
+    # the changed match keys and an update
+    return 2 + 3 * batch_count(request.data, settings.ADDRESS_BULK_BATCH_SIZE)
+
+
+def lookup_ids(request):
+    """The ids to look up, from ?ids=a,b on GET or the body's "ids" list on POST"""
+    if request.method == "GET":
+        return [
+            id for id in request.query_params.get("ids", "").split(",") if id
+        ]
+    return request.data.get("ids") if isinstance(request.data, dict) else None
+
+
+def lookup_query_budget(request) -> int:
+    # an id__in query per batch
+    return batch_count(lookup_ids(request), settings.ADDRESS_BULK_BATCH_SIZE)
+
+
+class GetAndUpdateAddressView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        responses={
+            200: AddressBookSerializer(many=False),
+            304: "Not modified",
+            404: "Not found",
+        }
+    )
+    @cache_address_response
+    @query_budget(1)
+    async def get(self, request, address_id=None) -> Response:
         """
-        Get an address under a specific ID
+        Get an address under a specific ID.
+
+        The response carries an ETag, send it back in If-None-Match to get a
+        304 without the body if the address has not changed.
         """
-        user = User.objects.get(email=request.user.email)
+        user = request.user
         if address_id:
             try:
-                serializer = AddressBookSerializer(user.addresses.get(id=address_id))
+                address = await user.addresses.aget(id=address_id)
             except AddressBook.DoesNotExist:
                 return Response({"message": "Address not found"}, status=404)
-            return Response(serializer.data, status=200)
+            etag = address_etag(address)
+            if etag_matches(request.META.get("HTTP_IF_NONE_MATCH"), etag):
+                return not_modified(etag)
+            response = Response(
+                AddressBookSerializer(address).data, status=200
+            )
+            response["ETag"] = etag
+            return response
 
     @swagger_auto_schema(
         request_body=openapi.Schema(
@@ -40,10 +146,18 @@ class GetAndUpdateAddressView(APIView):
             required=["country", "address_line_one", "zip_code", "city"],
             additional_properties=["address_line_two"],
         ),
-        responses={200: AddressBookSerializer(many=False), 404: "Address not found"},
+        responses={
+            200: AddressBookSerializer(many=False),
+            404: "Address not found",
+            409: "Address kept changing while being updated",
+            412: "Address changed since the If-Match ETag",
+        },
         operation_description="Update an address in the address book",
     )
-    def put(self, request, address_id=None) -> Response:
+    # duplicate check, the address read and the conditional update, which inside
+    # a transaction also takes a savepoint, released or rolled back and released
+    @query_budget(6)
+    async def put(self, request, address_id=None) -> Response:
         """
         Update an address in the address book.
 
@@ -51,37 +165,165 @@ class GetAndUpdateAddressView(APIView):
         An assumption I made here was that a user, for a specific address,
         would click an update button on the client side and the client would
         send the ID of the address to update
-        """
-        user = User.objects.get(email=request.user.email)
-        address_data = json.loads(request.body)
 
-        serializer = AddressBookSerializer(data=address_data)
+        Send the address's ETag in If-Match to only update it if nobody else
+        has changed it in the meantime, otherwise the update fails with a 412.
+        """
+        user = request.user
+        serializer = AddressBookSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        if AddressBookSerializer.address_exists_for_user(
+        if await AddressBookSerializer.aaddress_exists_for_user(
             user,
+            serializer.data.get("country"),
             serializer.data.get("address_line_one"),
             serializer.data.get("zip_code"),
         ):
-            return Response({"message": "attempting to add duplicate address"}, status=400)
+            return Response(
+                {"message": "attempting to add duplicate address"}, status=400
+            )
 
         if serializer.data:
+            # The async ORM has no transactions, so the conditional update runs in a thread
+            return await sync_to_async(self._update_address)(
+                request, address_id, serializer
+            )
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "country": openapi.Schema(type=openapi.TYPE_STRING),
+                "address_line_one": openapi.Schema(type=openapi.TYPE_STRING),
+                "address_line_two": openapi.Schema(type=openapi.TYPE_STRING),
+                "city": openapi.Schema(type=openapi.TYPE_STRING),
+                "zip_code": openapi.Schema(type=openapi.TYPE_STRING),
+            },
+        ),
+        responses={
+            200: AddressBookSerializer(many=False),
+            400: "Invalid fields or duplicate address",
+            404: "Address not found",
+            409: "Address kept changing while being updated",
+            412: "Address changed since the If-Match ETag",
+        },
+        operation_description="Update some fields of an address",
+    )
+    # the address read and the conditional update of the changed columns, which
+    # inside a transaction also takes a savepoint, released or rolled back and released
+    @query_budget(5)
+    async def patch(self, request, address_id=None) -> Response:
+        """
+        Update only the fields sent, returning the whole address.
+
+        Only the columns whose values changed are written, and nothing is if
+        none did. The duplicate check is the unique constraint on the address's
+        match key, so it costs nothing unless the country, address line one or
+        zip code changed. If-Match works as it does for PUT.
+        """
+        serializer = AddressBookSerializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        return await sync_to_async(self._patch_address)(
+            request, address_id, serializer.validated_data
+        )
+
+    def _patch_address(self, request, address_id, data) -> Response:
+        response, address = self._write_address(request, address_id, data)
+        if response is None:
+            response = Response(
+                AddressBookSerializer(address).data, status=200
+            )
+            response["ETag"] = address_etag(address)
+        return response
+
+    def _update_address(self, request, address_id, serializer) -> Response:
+        response, address = self._write_address(
+            request, address_id, serializer.data
+        )
+        if response is None:
+            response = Response(serializer.data, status=200)
+            response["ETag"] = address_etag(address)
+        return response
+
+    def _write_address(self, request, address_id, data):
+        """
+        Write the fields of data that differ from the stored address. Returns an
+        error response, or None and the address as written.
+
+        The address is read, checked against If-Match, then written with
+        AddressBook.save_fields, an UPDATE run on its own. With If-Match the
+        UPDATE only applies to the version read, as it must when the new match
+        key depends on columns data doesn't set, and if another write lands in
+        between an If-Match request fails with a 412 while any other request
+        reads the address again and reapplies its changes.
+        """
+        user = request.user
+        if_match = request.META.get("HTTP_IF_MATCH")
+        for _ in range(WRITE_ATTEMPTS):
             try:
                 address = user.addresses.get(id=address_id)
             except AddressBook.DoesNotExist:
-                return Response({"message": "address not found"}, status=404)
-            serializer.update(address, serializer.data)
-            return Response(serializer.data, status=200)
+                return (
+                    Response({"message": "address not found"}, status=404),
+                    None,
+                )
+            if if_match and not etag_matches(if_match, address_etag(address)):
+                return (
+                    Response(
+                        {"message": "address has been modified"}, status=412
+                    ),
+                    None,
+                )
+            changed = AddressBookSerializer.changed_fields(address, data)
+            if not changed:
+                return None, address
+            for field in changed:
+                setattr(address, field, data[field])
+            if_unchanged = bool(if_match) or (
+                bool(MATCH_KEY_FIELDS.intersection(changed))
+                and not MATCH_KEY_FIELDS.issubset(data)
+            )
+            try:
+                written = address.save_fields(
+                    changed, if_unchanged=if_unchanged
+                )
+            except IntegrityError:
+                return (
+                    Response(
+                        {"message": "attempting to add duplicate address"},
+                        status=400,
+                    ),
+                    None,
+                )
+            if written:
+                address_book_cache.bump_version(user.pk)
+                return None, address
+            if if_match:
+                return (
+                    Response(
+                        {"message": "address has been modified"}, status=412
+                    ),
+                    None,
+                )
+        return (
+            Response(
+                {"message": "address is being modified, try again"}, status=409
+            ),
+            None,
+        )
 
 
-class AddressAPI(APIView, PageNumberPagination):
-    authentication_classes = [TokenAuthentication]
+class AddressAPI(AsyncAPIView, AsyncPageNumberPagination):
+    permission_classes = [IsAuthenticated]
     pagination_class = PageNumberPagination
     page_size = 10
     max_page_size = 100
 
     @swagger_auto_schema(
-        responses={200: AddressBookSerializer(many=True), 400: "Failed to create address"},
+        responses={
+            200: AddressBookSerializer(many=True),
+            400: "Failed to create address",
+        },
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
             required=["country", "address_line_one", "zip_code", "city"],
@@ -96,66 +338,472 @@ class AddressAPI(APIView, PageNumberPagination):
         ),
         operation_description="Create an address",
     )
-    def post(self, request) -> Response:
+    # the insert, inside a transaction also a savepoint, its release, and a
+    # rollback to it on a duplicate
+    @query_budget(4)
+    async def post(self, request) -> Response:
         """
         Add a new address to the address book.
         """
-        user = User.objects.get(email=request.user.email)
+        user = request.user
         serializer = AddressBookSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         if serializer.data:
-            if AddressBookSerializer.address_exists_for_user(
-                user,
-                serializer.data.get("address_line_one"),
-                serializer.data.get("zip_code"),
-            ):
+            # The unique constraint on (user, match_key) is the duplicate check,
+            # so concurrent inserts cannot both succeed. Inside a transaction the
+            # insert needs a savepoint to recover from a duplicate, which async
+            # code cannot open.
+            try:
+                await sync_to_async(self._create_address)(
+                    user, serializer.data
+                )
+            except IntegrityError:
                 return Response(
                     {"message": "attempting to add duplicate address"},
                     status=400,
                 )
-            AddressBookSerializer.create(self, {"user": user, **serializer.data})
+            await address_book_cache.abump_version(user.pk)
             return Response(serializer.data, status=200)
 
         return Response({"Failed to create address"}, status=400)
 
-    @swagger_auto_schema(responses={200: AddressBookSerializer(many=True)})
-    def get(
+    def _create_address(self, user, data):
+        # A lone INSERT in autocommit waits out SQLite's busy_timeout, where a
+        # BEGIN followed by it can fail at once when another connection writes
+        with transaction.atomic() if connection.in_atomic_block else nullcontext():
+            return AddressBookSerializer.create(self, {"user": user, **data})
+
+    @swagger_auto_schema(
+        responses={200: AddressBookSerializer(many=True)},
+        manual_parameters=[
+            openapi.Parameter(
+                "page", openapi.IN_QUERY, type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                description="Opaque cursor, pass an empty value for the first page",
+            ),
+            openapi.Parameter(
+                "city",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                description="City prefix",
+            ),
+            openapi.Parameter(
+                "zip_code",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                description="Zip code prefix",
+            ),
+            openapi.Parameter(
+                "country",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                description="Country code",
+            ),
+            openapi.Parameter(
+                "q",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                description="Free text search, matches words starting with each word given",
+            ),
+        ],
+    )
+    # aggregate for the ETag, then count and page, or only the page by cursor
+    @query_budget(3)
+    async def get(
         self,
         request,
     ) -> Response:
         """
-        Get all addresses for a user
+        Get all addresses for a user.
+
+        Pass ``?cursor=`` to page by cursor instead of page number, which keeps
+        deep pages as cheap as the first and skips the total count.
+
+        Filter with ``?city=`` and ``?zip_code=`` (prefixes), ``?country=`` and
+        ``?q=`` (free text across every field).
+
+        Each page carries an ETag that changes with any write to the address
+        book, send it back in If-None-Match to get a 304 if nothing changed.
         """
-        user = User.objects.get(email=request.user.email)
+        user = request.user
+        etag = await aaddress_book_etag(request)
+        if etag_matches(request.META.get("HTTP_IF_NONE_MATCH"), etag):
+            return not_modified(etag)
+        # Cached by ETag, so a page is never older than the address book
+        key = await address_book_cache.aresponse_key(request, etag)
+        cached = await address_book_cache.aget(key)
+        if cached is not None:
+            return cached_response(request, cached)
 
-        addresses = user.addresses.select_related("user")
-        page = self.paginate_queryset(addresses, request=request)
-        if page is not None:
-            serializer = AddressBookSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        # Pages need a stable order, id is the (user, id) index's
+        addresses = AddressBookReadSerializer.queryset(
+            filter_addresses(
+                user.addresses.order_by("id"), request.query_params, user
+            )
+        )
+        if AddressCursorPagination.cursor_query_param in request.query_params:
+            paginator = AddressCursorPagination()
+            # CursorPagination fetches the page itself, synchronously
+            page = await sync_to_async(paginator.paginate_queryset)(
+                addresses, request, view=self
+            )
+            response = paginator.get_paginated_response(
+                AddressBookReadSerializer.to_representation(page)
+            )
+        else:
+            page = await self.apaginate_queryset(addresses, request=request)
+            response = self.get_paginated_response(
+                AddressBookReadSerializer.to_representation(page)
+            )
+        response["ETag"] = etag
+        await address_book_cache.aset(key, (response.data, etag))
+        return response
 
     @swagger_auto_schema(
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
             properties={
                 "address_ids": openapi.Schema(
-                    type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_STRING)
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_STRING),
                 ),
             },
             required=["address_ids"],
         ),
-        responses={204: "Successfully deleted addresses"},
+        responses={
+            200: openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "deleted": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    "address_ids": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_STRING),
+                    ),
+                },
+            ),
+            400: "Invalid address ids",
+        },
         operation_description="Delete an address from an address book",
     )
+    @query_budget(delete_query_budget)
     def delete(self, request) -> Response:
         """
-        Delete address(es) from the address book
+        Delete address(es) from the address book.
+
+        Returns how many addresses were deleted and their ids, ids that do not
+        exist in the address book are ignored.
         """
-        user = User.objects.get(email=request.user.email)
-        ids = [uuid.UUID(id) for id in request.data["address_ids"]]
-        addresses_to_delete = user.addresses.filter(id__in=ids)
+        user = request.user
+        address_ids = (
+            request.data.get("address_ids")
+            if isinstance(request.data, dict)
+            else None
+        )
+        if not isinstance(address_ids, list):
+            return Response(
+                {"message": "address_ids must be a list of ids"}, status=400
+            )
+        try:
+            ids = list(dict.fromkeys(uuid.UUID(str(id)) for id in address_ids))
+        except ValueError:
+            return Response(
+                {"message": "address_ids contains an invalid id"}, status=400
+            )
+
+        deleted = delete_addresses(user, ids, settings.ADDRESS_BULK_BATCH_SIZE)
+        return Response(
+            {"deleted": len(deleted), "address_ids": deleted}, status=200
+        )
+
+
+class AddressLookupAPI(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    lookup_responses = {
+        200: openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "addresses": openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    description="Addresses keyed by id",
+                    additional_properties=openapi.Schema(
+                        type=openapi.TYPE_OBJECT
+                    ),
+                ),
+                "missing": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_STRING),
+                ),
+            },
+        ),
+        400: "Invalid or too many ids",
+    }
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "ids",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                description="Comma separated address ids",
+            ),
+        ],
+        responses=lookup_responses,
+        operation_description="Get many addresses by id",
+    )
+    @cache_address_response
+    @query_budget(lookup_query_budget)
+    async def get(self, request) -> Response:
+        """
+        Get the addresses with the ids given in ``?ids=``, comma separated.
+
+        Addresses are keyed by id, ids that are not in the address book are
+        listed in ``missing``. POST the ids instead when they don't fit in a URL.
+        """
+        return await self._lookup(request)
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "ids": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_STRING),
+                ),
+            },
+            required=["ids"],
+        ),
+        responses=lookup_responses,
+        operation_description="Get many addresses by id",
+    )
+    @query_budget(lookup_query_budget)
+    async def post(self, request) -> Response:
+        """
+        Get the addresses with the ids in the body's ``ids`` list, the same as
+        GET with ``?ids=``.
+        """
+        return await self._lookup(request)
+
+    async def _lookup(self, request) -> Response:
+        address_ids = lookup_ids(request)
+        if not isinstance(address_ids, list):
+            return Response(
+                {"message": "ids must be a list of ids"}, status=400
+            )
+        if len(address_ids) > settings.ADDRESS_LOOKUP_MAX_IDS:
+            return Response(
+                {
+                    "message": f"ids can hold up to {settings.ADDRESS_LOOKUP_MAX_IDS} ids"
+                },
+                status=400,
+            )
+        try:
+            ids = list(dict.fromkeys(uuid.UUID(str(id)) for id in address_ids))
+        except ValueError:
+            return Response(
+                {"message": "ids contains an invalid id"}, status=400
+            )
+
+        addresses = await alookup_addresses(
+            request.user, ids, settings.ADDRESS_BULK_BATCH_SIZE
+        )
+        missing = [str(id) for id in ids if str(id) not in addresses]
+        return Response(
+            {"addresses": addresses, "missing": missing}, status=200
+        )
+
+
+class AddressBulkAPI(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [ORJSONParser, NDJSONParser]
+
+    @swagger_auto_schema(
+        request_body=AddressBookSerializer(many=True),
+        responses={200: "Per-row import results", 400: "Invalid addresses"},
+        operation_description="Import many addresses from a JSON array or NDJSON stream",
+    )
+    @query_budget(bulk_import_query_budget)
+    def post(self, request) -> Response:
+        """
+        Add many addresses to the address book in one request.
+
+        Rows that duplicate an existing address, or an earlier row of the
+        same import, are skipped and reported as duplicates.
+        """
+        user = request.user
+        serializer = AddressBookSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response({"errors": serializer.errors}, status=400)
+
+        try:
+            results = import_addresses(
+                user,
+                serializer.validated_data,
+                settings.ADDRESS_BULK_BATCH_SIZE,
+            )
+        except IntegrityError:
+            # Another request inserted one of these addresses mid-import
+            return Response(
+                {"message": "attempting to add duplicate address"}, status=400
+            )
+
+        created = sum(1 for result in results if result["status"] == "created")
+        if created:
+            address_book_cache.bump_version(user.pk)
+        return Response(
+            {
+                "created": created,
+                "duplicates": len(results) - created,
+                "results": results,
+            },
+            status=200,
+        )
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "id": openapi.Schema(type=openapi.TYPE_STRING),
+                    "fields": openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        description="Address fields to change, validated as for PATCH",
+                    ),
+                },
+                required=["id", "fields"],
+            ),
+        ),
+        responses={200: "Per-row update results", 400: "Invalid updates"},
+        operation_description="Update many addresses from a JSON array or NDJSON stream",
+    )
+    @query_budget(bulk_update_query_budget)
+    def patch(self, request) -> Response:
+        """
+        Update some fields of many addresses in one request, all or nothing.
+
+        Each row reports whether the address was updated, unchanged, not found,
+        or skipped because the change would duplicate another address.
+        """
+        user = request.user
+        serializer = AddressUpdateSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response({"errors": serializer.errors}, status=400)
+        ids = [update["id"] for update in serializer.validated_data]
+        if len(set(ids)) != len(ids):
+            return Response(
+                {"message": "each address can only be updated once"},
+                status=400,
+            )
+
+        try:
+            results = update_addresses(
+                user,
+                serializer.validated_data,
+                settings.ADDRESS_BULK_BATCH_SIZE,
+            )
+        except IntegrityError:
+            # Another request took one of the new addresses mid-update
+            return Response(
+                {"message": "attempting to add duplicate address"}, status=400
+            )
+
+        counts = Counter(result["status"] for result in results)
+        if counts["updated"]:
+            address_book_cache.bump_version(user.pk)
+        return Response(
+            {
+                "updated": counts["updated"],
+                "unchanged": counts["unchanged"],
+                "not_found": counts["not_found"],
+                "duplicates": counts["duplicate"],
+                "results": results,
+            },
+            status=200,
+        )
+
+
+class AddressExportView(APIView):
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [ORJSONRenderer]
+    content_negotiation_class = IgnoreFormatContentNegotiation
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "format",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                enum=["ndjson", "csv"],
+            ),
+            openapi.Parameter(
+                "since",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                description="Only export addresses changed after this ISO 8601 datetime",
+            ),
+        ],
+        responses={200: "Streamed addresses", 400: "Invalid format or since"},
+        operation_description="Export the whole address book",
+    )
+    # The export is read while the response streams, a query per chunk
+    @query_budget(0)
+    def get(self, request):
+        """
+        Stream every address in the address book as NDJSON or CSV.
+
+        Only addresses changed after ``?since=`` or the If-Modified-Since header
+        are sent when either is given. The body is gzipped if the client accepts it.
+        """
+        export_format = request.query_params.get("format", "ndjson")
+        if export_format not in EXPORT_CONTENT_TYPES:
+            return Response(
+                {"message": "format must be one of ndjson, csv"}, status=400
+            )
+
+        modified_since = None
+        if "since" in request.query_params:
+            try:
+                modified_since = parse_datetime(request.query_params["since"])
+            except ValueError:
+                pass
+            if modified_since is None:
+                return Response(
+                    {"message": "since must be an ISO 8601 datetime"},
+                    status=400,
+                )
+            if modified_since.tzinfo is None:
+                modified_since = modified_since.replace(tzinfo=timezone.utc)
+        elif "HTTP_IF_MODIFIED_SINCE" in request.META:
+            timestamp = parse_http_date_safe(
+                request.META["HTTP_IF_MODIFIED_SINCE"]
+            )
+            if timestamp is not None:
+                modified_since = datetime.fromtimestamp(
+                    timestamp, tz=timezone.utc
+                )
+
+        addresses = request.user.addresses.order_by("id")
+        if modified_since is not None:
+            addresses = addresses.filter(updated_at__gt=modified_since)
 
-        if len(addresses_to_delete) > 0:
-            addresses_to_delete.delete()
-            return Response(status=204)
+        content = iter_export(
+            addresses, export_format, settings.ADDRESS_EXPORT_CHUNK_SIZE
+        )
+        gzipped = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+        response = StreamingHttpResponse(
+            gzip_stream(content) if gzipped else content,
+            content_type=EXPORT_CONTENT_TYPES[export_format],
+        )
+        if gzipped:
+            response["Content-Encoding"] = "gzip"
+        response["Vary"] = "Accept-Encoding"
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="addresses.{export_format}"'
+        return response
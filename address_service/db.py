@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from address_service.metrics import record_query
+from address_service.query_budget import record_budget_query
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to each new SQLite connection"""
+    if connection.vendor != "sqlite":
+        return
+    # On the driver's connection, past the execute wrappers, which a connection
+    # keeps when it reconnects, so the pragmas aren't counted as the queries of
+    # whichever request opened it
+    for pragma, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f"PRAGMA {pragma} = {value}")
+
+
+@receiver(connection_created)
+def install_query_metrics(sender, connection, **kwargs):
+    """Let PerformanceMiddleware count and time the queries made on every connection"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def install_query_budgets(sender, connection, **kwargs):
+    """Let query budgets see the queries made on every connection"""
+    if record_budget_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_budget_query)
@@ -0,0 +1,293 @@
+"""
+Per request performance metrics.
+
+PerformanceMiddleware records, for every request, the wall time, the number of
+queries and the time spent in them, the response render time and the response
+size, labelled with the URL name of the view. The totals are served in the
+Prometheus text format at /metrics/, to staff users and to requests bearing
+PERFORMANCE_METRICS_TOKEN, each response gets a Server-Timing header, and
+requests slower than PERFORMANCE_SLOW_REQUEST_MS are logged with their SQL.
+
+Render time is the renderer encoding the response body after the view returns.
+Serializers run inside the view, their time is part of the wall time only.
+
+Queries are counted by an execute wrapper installed on every connection (see
+address_service.db) that reports to the request in the current context. Async
+views run their queries in another thread, a context variable follows them there
+where a wrapper installed on the request thread's connection would not.
+
+Metrics are kept per process, scrape every worker process or run one.
+"""
+import asyncio
+import hmac
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.http import Http404, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Statements kept per request for the slow request log
+MAX_LOGGED_QUERIES = 100
+
+_current_request = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    __slots__ = ("started", "queries", "db_time", "render_time", "sql")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.sql = []
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper timing each query for the request being served, if any"""
+    metrics = _current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        metrics.queries += 1
+        metrics.db_time += duration
+        if len(metrics.sql) < MAX_LOGGED_QUERIES:
+            metrics.sql.append((duration, sql))
+
+
+class MetricsRegistry:
+    """Totals per (view, method, status), rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.series = {}
+
+    def observe(self, labels, duration, queries, db_time, render_time, size):
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = {
+                    "count": 0,
+                    "duration": 0.0,
+                    "buckets": [0] * len(DURATION_BUCKETS),
+                    "queries": 0,
+                    "db_time": 0.0,
+                    "render_time": 0.0,
+                    "size": 0,
+                }
+            series["count"] += 1
+            series["duration"] += duration
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    series["buckets"][index] += 1
+            series["queries"] += queries
+            series["db_time"] += db_time
+            series["render_time"] += render_time
+            series["size"] += size
+
+    def render(self) -> str:
+        with self.lock:
+            series = {
+                labels: {**values, "buckets": list(values["buckets"])}
+                for labels, values in self.series.items()
+            }
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        def sample(name, labels, value, **extra):
+            view, method, status = labels
+            pairs = {"view": view, "method": method, "status": status, **extra}
+            label_string = ",".join(
+                f'{key}="{label}"' for key, label in pairs.items()
+            )
+            return f"{name}{{{label_string}}} {value}"
+
+        metric(
+            "http_requests_total",
+            "counter",
+            "Requests served",
+            [
+                sample("http_requests_total", labels, values["count"])
+                for labels, values in series.items()
+            ],
+        )
+        name = "http_request_duration_seconds"
+        histogram = []
+        for labels, values in series.items():
+            for bound, count in zip(DURATION_BUCKETS, values["buckets"]):
+                histogram.append(
+                    sample(f"{name}_bucket", labels, count, le=bound)
+                )
+            histogram.append(
+                sample(f"{name}_bucket", labels, values["count"], le="+Inf")
+            )
+            histogram.append(sample(f"{name}_sum", labels, values["duration"]))
+            histogram.append(sample(f"{name}_count", labels, values["count"]))
+        metric(name, "histogram", "Wall time of requests", histogram)
+        for name, key, help_text in [
+            (
+                "http_request_db_queries_total",
+                "queries",
+                "Database queries made by requests",
+            ),
+            (
+                "http_request_db_seconds_total",
+                "db_time",
+                "Time requests spent in database queries",
+            ),
+            (
+                "http_response_render_seconds_total",
+                "render_time",
+                "Time renderers spent encoding response bodies, serializers not included",
+            ),
+            (
+                "http_response_bytes_total",
+                "size",
+                "Bytes of response bodies, not streamed ones",
+            ),
+        ]:
+            metric(
+                name,
+                "counter",
+                help_text,
+                [
+                    sample(name, labels, values[key])
+                    for labels, values in series.items()
+                ],
+            )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class PerformanceMiddleware:
+    """
+    Record performance metrics for each request, see the module docstring.
+    Only loaded when PERFORMANCE_METRICS_ENABLED is set, so it costs nothing
+    otherwise. Put it first in MIDDLEWARE so the timings cover the whole stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PERFORMANCE_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Tells Django this instance is a coroutine function
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current_request.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current_request.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns, time it from here
+        metrics = _current_request.get()
+        if metrics is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                metrics.render_time += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, metrics):
+        duration = time.perf_counter() - metrics.started
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match.view_name) if match else "unmatched"
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(
+            (view, request.method, response.status_code),
+            duration,
+            metrics.queries,
+            metrics.db_time,
+            metrics.render_time,
+            size,
+        )
+        response["Server-Timing"] = (
+            f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries", '
+            f'render;dur={metrics.render_time * 1000:.2f};desc="response render", '
+            f"total;dur={duration * 1000:.2f}"
+        )
+        if duration * 1000 >= settings.PERFORMANCE_SLOW_REQUEST_MS:
+            logger.warning(
+                "Slow request %s %s (%s) %.0fms, %d queries in %.0fms\n%s",
+                request.method,
+                request.get_full_path(),
+                view,
+                duration * 1000,
+                metrics.queries,
+                metrics.db_time * 1000,
+                "\n".join(
+                    f"  {query_time * 1000:.1f}ms {sql}"
+                    for query_time, sql in metrics.sql
+                ),
+            )
+
+
+def can_read_metrics(request) -> bool:
+    """Staff users, or any request with ``Authorization: Bearer <PERFORMANCE_METRICS_TOKEN>``"""
+    token = settings.PERFORMANCE_METRICS_TOKEN
+    if token:
+        scheme, _, credentials = request.headers.get(
+            "Authorization", ""
+        ).partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(
+            credentials.encode(), token.encode()
+        ):
+            return True
+    return request.user.is_active and request.user.is_staff
+
+
+def metrics_view(request):
+    """The metrics in the Prometheus text format, 404 while they are disabled"""
+    if not settings.PERFORMANCE_METRICS_ENABLED:
+        raise Http404
+    if not can_read_metrics(request):
+        raise PermissionDenied
+    return HttpResponse(
+        registry.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,47 @@
+"""
+JSON parsing with orjson.
+
+orjson is stricter than json in a few places json accepts, integers over 64
+bits, lone surrogates and numbers too large for a float, so where orjson
+rejects a document json decides. Errors therefore read the same as before.
+"""
+import codecs
+import json
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils.json import strict_constant
+
+from address_service.renderers import ORJSONRenderer
+
+
+def loads(data: bytes, encoding="utf-8", strict=True):
+    """
+    Parse a JSON document, raising ValueError if it is invalid. ``strict``
+    rejects NaN and Infinity like DRF's STRICT_JSON.
+    """
+    if codecs.lookup(encoding).name == "utf-8":
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(
+        data.decode(encoding),
+        parse_constant=strict_constant if strict else None,
+    )
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser on orjson, the parsed data is the same"""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            return loads(stream.read(), encoding, strict=self.strict)
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,177 @@
+"""
+Query budgets, a declared maximum number of queries per view.
+
+Decorate view handlers with ``query_budget``. While QUERY_BUDGET_ENABLED is on
+(by default with DEBUG) a handler that makes more queries than its budget, or
+runs the same statement with the same parameters twice, triggers a
+QueryBudgetWarning; with QUERY_BUDGET_RAISE on, as in the test suite, it raises
+QueryBudgetExceeded instead so the test fails.
+
+Budgets cover the handler only, authentication runs before it. Use
+``assert_query_budget`` to check a whole request, e.g. in tests.
+
+Queries are collected by an execute wrapper installed on every connection (see
+address_service.db), through a context variable so the queries async views run
+in other threads are seen too.
+"""
+import asyncio
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+_active_logs = ContextVar("query_budget_logs", default=())
+
+# Transaction control repeats legitimately, e.g. BEGIN for each atomic block
+# outside a transaction
+TRANSACTION_STATEMENTS = (
+    "BEGIN",
+    "COMMIT",
+    "ROLLBACK",
+    "SAVEPOINT",
+    "RELEASE",
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryBudgetWarning(UserWarning):
+    pass
+
+
+class QueryLog:
+    def __init__(self):
+        self.queries = []
+
+    def __len__(self):
+        return len(self.queries)
+
+    def duplicates(self) -> dict:
+        """Statements run more than once with the same parameters, with their count"""
+        counts = Counter(
+            (sql, params)
+            for sql, params in self.queries
+            if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS)
+        )
+        return {query: count for query, count in counts.items() if count > 1}
+
+    def problems(self, max_queries, allow_duplicates=False) -> list:
+        problems = []
+        if len(self) > max_queries:
+            problems.append(
+                f"{len(self)} queries, the budget is {max_queries}"
+            )
+        if not allow_duplicates:
+            problems.extend(
+                f"ran {count} times: {sql} {params}"
+                for (sql, params), count in self.duplicates().items()
+            )
+        return problems
+
+    def report(self, label, problems) -> str:
+        statements = "\n".join(
+            f"  {sql} {params}" for sql, params in self.queries
+        )
+        return f"{label} is over its query budget: {'; '.join(problems)}\n{statements}"
+
+
+def record_budget_query(execute, sql, params, many, context):
+    """Execute wrapper adding each query to the query logs being collected, if any"""
+    logs = _active_logs.get()
+    if logs:
+        query = (sql, repr(params))
+        for log in logs:
+            log.queries.append(query)
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def track_queries():
+    """Collect the queries run in this context, including nested ones"""
+    log = QueryLog()
+    token = _active_logs.set((*_active_logs.get(), log))
+    try:
+        yield log
+    finally:
+        _active_logs.reset(token)
+
+
+@contextmanager
+def assert_query_budget(max_queries, allow_duplicates=False, label="Block"):
+    """Raise QueryBudgetExceeded if the block goes over max_queries or repeats a query"""
+    with track_queries() as log:
+        yield log
+    problems = log.problems(max_queries, allow_duplicates)
+    if problems:
+        raise QueryBudgetExceeded(log.report(label, problems))
+
+
+def query_budget(max_queries, allow_duplicates=False):
+    """
+    Declare how many queries a view handler may make. Decorate APIView handler
+    methods, or function views above @api_view.
+
+    ``max_queries`` is a number, or for handlers whose queries grow with the
+    size of the request, a function of the request returning one. It is read
+    back from the handler's ``query_budget`` attribute.
+    """
+
+    def decorator(handler, label=None):
+        view_class = getattr(handler, "cls", None)
+        if view_class is not None:
+            # A function view from @api_view, budget its handlers so the budget
+            # leaves out authentication like it does for class based views
+            for method in view_class.http_method_names:
+                if method != "options" and hasattr(view_class, method):
+                    label = f"{view_class.__name__} {method.upper()}"
+                    setattr(
+                        view_class,
+                        method,
+                        decorator(getattr(view_class, method), label),
+                    )
+            return handler
+        label = label or handler.__qualname__
+
+        def check(request, log):
+            budget = (
+                max_queries(request) if callable(max_queries) else max_queries
+            )
+            problems = log.problems(budget, allow_duplicates)
+            if not problems:
+                return
+            message = log.report(label, problems)
+            if settings.QUERY_BUDGET_RAISE:
+                raise QueryBudgetExceeded(message)
+            warnings.warn(message, QueryBudgetWarning, stacklevel=3)
+
+        if asyncio.iscoroutinefunction(handler):
+
+            @wraps(handler)
+            async def wrapper(*args, **kwargs):
+                if not settings.QUERY_BUDGET_ENABLED:
+                    return await handler(*args, **kwargs)
+                with track_queries() as log:
+                    response = await handler(*args, **kwargs)
+                check(args[1], log)
+                return response
+
+        else:
+
+            @wraps(handler)
+            def wrapper(*args, **kwargs):
+                if not settings.QUERY_BUDGET_ENABLED:
+                    return handler(*args, **kwargs)
+                with track_queries() as log:
+                    response = handler(*args, **kwargs)
+                check(args[1], log)
+                return response
+
+        wrapper.query_budget = max_queries
+        return wrapper
+
+    return decorator
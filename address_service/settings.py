@@ -18,11 +18,17 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "address_service.settings")
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+def env_bool(name, default=False) -> bool:
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes")
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.1/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = "django-insecure-e+!%n#gu5eaz+p!^1en59bd7y@j0^udvwjz!r%e*@zxmf2qfv^"
+SECRET_KEY = (
+    "django-insecure-e+!%n#gu5eaz+p!^1en59bd7y@j0^udvwjz!r%e*@zxmf2qfv^"
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
@@ -44,9 +50,12 @@ INSTALLED_APPS = [
     "drf_yasg",
     # local apps
     "address_book",
+    "authentication",
+    "jobs",
 ]
 
 MIDDLEWARE = [
+    "address_service.metrics.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -60,9 +69,28 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.coreapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "authentication.backends.ExpiringTokenAuthentication",
     ],
     "PAGE_SIZE": 100,
+    # orjson, with the same output as DRF's JSONRenderer and JSONParser
+    "DEFAULT_RENDERER_CLASSES": [
+        "address_service.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "address_service.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # Proxies in front of the app that append to X-Forwarded-For. Throttles
+    # identify clients by REMOTE_ADDR while it is 0, a client can send any
+    # X-Forwarded-For it likes.
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
+    # Login attempts, checked before the password is hashed
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": os.environ.get("LOGIN_IP_RATE", "30/min"),
+        "login_email": os.environ.get("LOGIN_EMAIL_RATE", "10/min"),
+    },
 }
 
 SWAGGER_SETTINGS = {
@@ -73,6 +101,61 @@ SWAGGER_SETTINGS = {
 
 TOKEN_EXPIRATION_TIME = 86400
 
+# Authenticated tokens are cached for up to TOKEN_CACHE_TTL seconds (never past
+# their expiry). The default per-process LRU isn't evicted by logouts, token
+# rotations or deactivations handled by other workers, so a revoked token can
+# be accepted by them for that long. Set TOKEN_CACHE_USE_DJANGO_CACHE to share
+# the cache between workers through CACHES[TOKEN_CACHE_ALIAS], which must then
+# be a shared backend, and the TTL can be raised.
+TOKEN_CACHE_TTL = int(os.environ.get("TOKEN_CACHE_TTL", 5))
+TOKEN_CACHE_MAX_SIZE = 10000
+TOKEN_CACHE_USE_DJANGO_CACHE = False
+TOKEN_CACHE_ALIAS = "default"
+
+# Number of rows validated against the address book and inserted per query
+# by the bulk import endpoint
+ADDRESS_BULK_BATCH_SIZE = 500
+
+# Most ids the lookup endpoint accepts in one request, they are read from the
+# database ADDRESS_BULK_BATCH_SIZE at a time
+ADDRESS_LOOKUP_MAX_IDS = 1000
+
+# Number of rows read from the database and encoded per chunk of an export
+ADDRESS_EXPORT_CHUNK_SIZE = 2000
+
+# Address book GET responses are cached per user in CACHES[ADDRESS_CACHE_ALIAS]
+# and invalidated on every write. The default locmem cache is per process, a
+# write only invalidates the pages of the process that made it, so point this at
+# a shared cache when running more than one worker process or background jobs
+# (manage.py check warns, address_book.W001).
+ADDRESS_CACHE_ALIAS = "default"
+ADDRESS_CACHE_TIMEOUT = 300
+
+# Background jobs are run by manage.py run_workers, which checks for queued jobs
+# every JOBS_POLL_INTERVAL seconds. Running jobs that haven't reported progress
+# for JOBS_STALE_AFTER seconds are assumed lost with their worker and queued
+# again. Export results are saved to the default storage, under MEDIA_ROOT.
+JOBS_POLL_INTERVAL = float(os.environ.get("JOBS_POLL_INTERVAL", 1))
+JOBS_STALE_AFTER = int(os.environ.get("JOBS_STALE_AFTER", 600))
+
+# Per request wall time, query count and time, response render time and size,
+# served for Prometheus at /metrics/ and as a Server-Timing header. /metrics/ is
+# for staff users, or scrapers sending "Authorization: Bearer" with
+# PERFORMANCE_METRICS_TOKEN. Requests slower than PERFORMANCE_SLOW_REQUEST_MS
+# are logged with their SQL.
+PERFORMANCE_METRICS_ENABLED = env_bool("PERFORMANCE_METRICS_ENABLED")
+PERFORMANCE_METRICS_TOKEN = os.environ.get("PERFORMANCE_METRICS_TOKEN", "")
+PERFORMANCE_SLOW_REQUEST_MS = int(
+    os.environ.get("PERFORMANCE_SLOW_REQUEST_MS", 500)
+)
+
+# Views declare how many queries they may make with
+# address_service.query_budget.query_budget. Going over, or repeating a query,
+# warns while QUERY_BUDGET_ENABLED is on and raises with QUERY_BUDGET_RAISE,
+# which the test suite turns on.
+QUERY_BUDGET_ENABLED = env_bool("QUERY_BUDGET_ENABLED", DEBUG)
+QUERY_BUDGET_RAISE = env_bool("QUERY_BUDGET_RAISE")
+
 ROOT_URLCONF = "address_service.urls"
 
 TEMPLATES = [
@@ -97,11 +180,59 @@ WSGI_APPLICATION = "address_service.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Configured from the environment, SQLite unless DATABASE_ENGINE=postgresql
+#
+# DATABASE_CONN_MAX_AGE is how many seconds a connection stays open between
+# requests, health checks replace one that went away in the meantime. wsgi.py
+# defaults it to 60. Anywhere else it defaults to 0, a connection per request,
+# since under ASGI persistent connections are tied to a thread and leak.
+#
+# There is no connection pool under ASGI, that is left to pgbouncer. Set
+# DATABASE_PGBOUNCER=1 behind it in transaction pooling mode, which cannot keep
+# server side cursors open.
+
+DATABASE_ENGINE = os.environ.get("DATABASE_ENGINE", "sqlite")
+
+if DATABASE_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DATABASE_NAME", "address_service"),
+            "USER": os.environ.get("DATABASE_USER", "postgres"),
+            "PASSWORD": os.environ.get("DATABASE_PASSWORD", ""),
+            "HOST": os.environ.get("DATABASE_HOST", "localhost"),
+            "PORT": os.environ.get("DATABASE_PORT", "5432"),
+            "DISABLE_SERVER_SIDE_CURSORS": env_bool("DATABASE_PGBOUNCER"),
+            "OPTIONS": {
+                "connect_timeout": 5,
+                "application_name": "address_service",
+            },
+        }
     }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("DATABASE_NAME", BASE_DIR / "db.sqlite3"),
+        }
+    }
+
+DATABASES["default"]["CONN_MAX_AGE"] = int(
+    os.environ.get("DATABASE_CONN_MAX_AGE", 0)
+)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Applied to every new SQLite connection. WAL lets reads carry on while a write
+# is in progress, busy_timeout makes writers wait for the lock instead of
+# failing, synchronous=normal is durable in WAL mode apart from the last commits
+# on power loss.
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 5000,
+    "cache_size": -20000,
+    "temp_store": "memory",
+    "mmap_size": 134217728,
 }
 
 
@@ -124,6 +255,25 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# New passwords are hashed with Argon2id, PBKDF2 hashes from before still verify
+# and are rehashed on the user's next login. The costs default to OWASP's
+# minimum for Argon2id (19 MiB, 2 passes, 1 lane), raise them as far as login
+# throughput allows, see benchmarks/bench_login.py. The test suite hashes with
+# MD5, see tests/settings.py.
+PASSWORD_HASHERS = [
+    "authentication.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get("PASSWORD_ARGON2_TIME_COST", 2))
+PASSWORD_ARGON2_MEMORY_COST = int(
+    os.environ.get("PASSWORD_ARGON2_MEMORY_COST", 19456)
+)
+PASSWORD_ARGON2_PARALLELISM = int(
+    os.environ.get("PASSWORD_ARGON2_PARALLELISM", 1)
+)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.1/topics/i18n/
 
@@ -141,6 +291,9 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Job result files, served through the jobs API rather than MEDIA_URL
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", BASE_DIR / "media")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
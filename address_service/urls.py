@@ -4,6 +4,9 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework.permissions import AllowAny
 
+from address_service.metrics import metrics_view
+from address_service.views import health
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Address API",
@@ -17,5 +20,12 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("addresses/", include("address_book.urls")),
     path("authentication/", include("authentication.urls")),
-    path("docs/", schema_view.with_ui("swagger", cache_timeout=0), name="schema-redoc"),
+    path("jobs/", include("jobs.urls")),
+    path("health/", health, name="health"),
+    path("metrics/", metrics_view, name="metrics"),
+    path(
+        "docs/",
+        schema_view.with_ui("swagger", cache_timeout=0),
+        name="schema-redoc",
+    ),
 ]
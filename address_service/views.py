@@ -0,0 +1,17 @@
+from django.db import DatabaseError, connection
+from django.http import JsonResponse
+
+
+def health(request):
+    """
+    Health check for load balancers and orchestrators, 200 if the database
+    answers and 503 if it does not. Needs no authentication.
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except DatabaseError:
+        return JsonResponse(
+            {"status": "unavailable", "database": "unavailable"}, status=503
+        )
+    return JsonResponse({"status": "ok", "database": "ok"})
@@ -11,6 +11,9 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'address_service.settings')
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "address_service.settings")
+# Sync workers serve a request at a time per thread, so keep their connections
+# open between requests. Under ASGI settings.py leaves them at 0.
+os.environ.setdefault("DATABASE_CONN_MAX_AGE", "60")
 
 application = get_wsgi_application()
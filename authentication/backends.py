@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+# Columns of the user kept in the token cache
+USER_FIELDS = [field.attname for field in User._meta.concrete_fields]
+
+
+def token_expires_at(token):
+    return token.created + timedelta(seconds=settings.TOKEN_EXPIRATION_TIME)
+
+
+def is_token_expired(token) -> bool:
+    return token_expires_at(token) <= timezone.now()
+
+
+class TokenCache:
+    """
+    Bounded token key -> (user, token) cache with a per entry TTL.
+
+    Entries hold the user's column values and the token's creation time rather
+    than model instances, every hit builds its own User and Token, so requests
+    never share or mutate each other's objects.
+
+    Entries live in an in-process LRU by default, which other workers' logouts
+    and token rotations can't evict, keep TOKEN_CACHE_TTL short with it. With
+    TOKEN_CACHE_USE_DJANGO_CACHE they live in the configured Django cache
+    instead, so evictions are seen by every worker that shares it.
+    """
+
+    key_prefix = "auth_token:"
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def _django_cache(self):
+        if settings.TOKEN_CACHE_USE_DJANGO_CACHE:
+            return caches[settings.TOKEN_CACHE_ALIAS]
+        return None
+
+    def get(self, key):
+        django_cache = self._django_cache
+        if django_cache is not None:
+            entry = django_cache.get(self.key_prefix + key)
+            with self._lock:
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+        else:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[2] <= time.monotonic():
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+        if entry is None:
+            return None
+        user_values, token_created = entry[0], entry[1]
+        user = User.from_db(DEFAULT_DB_ALIAS, USER_FIELDS, user_values)
+        token = Token.from_db(
+            DEFAULT_DB_ALIAS,
+            ["key", "user_id", "created"],
+            [key, user.pk, token_created],
+        )
+        token.user = user
+        return user, token
+
+    def set(self, key, user, token, ttl):
+        if ttl <= 0:
+            return
+        user_values = [getattr(user, field) for field in USER_FIELDS]
+        django_cache = self._django_cache
+        if django_cache is not None:
+            django_cache.set(
+                self.key_prefix + key,
+                (user_values, token.created, None),
+                timeout=ttl,
+            )
+            return
+        with self._lock:
+            self._entries[key] = (
+                user_values,
+                token.created,
+                time.monotonic() + ttl,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.TOKEN_CACHE_MAX_SIZE:
+                self._entries.popitem(last=False)
+
+    def evict(self, key):
+        django_cache = self._django_cache
+        if django_cache is not None:
+            django_cache.delete(self.key_prefix + key)
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+token_cache = TokenCache()
+
+
+class ExpiringTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that rejects expired tokens on every request and
+    caches the token and its user, so a warm request does not query the database
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            user, token = cached
+            if is_token_expired(token):
+                token_cache.evict(key)
+                raise AuthenticationFailed("Token has expired")
+            if not user.is_active:
+                token_cache.evict(key)
+                raise AuthenticationFailed("User inactive or deleted.")
+            return user, token
+
+        user, token = super().authenticate_credentials(key)
+        if is_token_expired(token):
+            raise AuthenticationFailed("Token has expired")
+
+        remaining = (token_expires_at(token) - timezone.now()).total_seconds()
+        token_cache.set(
+            key, user, token, int(min(settings.TOKEN_CACHE_TTL, remaining))
+        )
+        return user, token
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """
+    Argon2id with its costs taken from the PASSWORD_ARGON2_* settings.
+
+    Django's defaults use 100 MiB and 8 lanes per hash, which caps concurrent
+    logins by memory and is slower than it needs to be on few cores. Hashes made
+    with other costs are rehashed on the user's next login.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
@@ -0,0 +1,22 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from authentication.backends import token_cache
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    """Drop a token from the cache when it is deleted by logout or rotation"""
+    token_cache.evict(instance.key)
+
+
+@receiver(post_save, sender=User)
+def evict_deactivated_users_tokens(sender, instance, **kwargs):
+    """Drop a user's tokens from the cache when the user is deactivated"""
+    if not instance.is_active:
+        for key in Token.objects.filter(user=instance).values_list(
+            "key", flat=True
+        ):
+            token_cache.evict(key)
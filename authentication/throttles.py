@@ -0,0 +1,42 @@
+"""
+Login throttles. DRF checks throttles before the view runs, so a rejected login
+costs a cache lookup instead of a password hash.
+
+Attempts are counted in the default cache, which is per process unless CACHES
+points at a shared cache. The rates are the login_ip and login_email entries of
+REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"].
+"""
+import hashlib
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LoginIPRateThrottle(SimpleRateThrottle):
+    """Login attempts per client IP, authenticated or not"""
+
+    scope = "login_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class LoginEmailRateThrottle(SimpleRateThrottle):
+    """Login attempts per email address, from any number of IPs"""
+
+    scope = "login_email"
+
+    def get_cache_key(self, request, view):
+        email = (
+            request.data.get("email")
+            if isinstance(request.data, dict)
+            else None
+        )
+        if not isinstance(email, str) or not email.strip():
+            # Nothing to throttle on, the serializer rejects the request
+            return None
+        # Hashed, cache keys can't hold arbitrary characters on every backend
+        ident = hashlib.sha256(email.strip().casefold().encode()).hexdigest()
+        return self.cache_format % {"scope": self.scope, "ident": ident}
@@ -1,34 +1,45 @@
-from datetime import timedelta
-
-from django.conf import settings
 from django.contrib.auth import login, logout
-from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import User
-from django.utils import timezone
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.authtoken.models import Token
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view,
+    permission_classes,
+    throttle_classes,
+)
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from address_service.query_budget import query_budget
+from authentication.backends import is_token_expired
 from authentication.serializers import UserSerializer
+from authentication.throttles import (
+    LoginEmailRateThrottle,
+    LoginIPRateThrottle,
+)
 
 
 def token_expire_handler(token):
-    """Check the assigned token is expired or not"""
-    time_elapsed = timezone.now() - token.created
-    remaining_time = timedelta(seconds=settings.TOKEN_EXPIRATION_TIME) - time_elapsed
-    is_expired = remaining_time < timedelta(seconds=0)
+    """Check the assigned token is expired or not, and rotate it if it is"""
+    is_expired = is_token_expired(token)
     if is_expired:
+        # Deleting the token also evicts it from the token cache
         token.delete()
-        token = Token.objects.create(user=token.user)
+        # user_id, token.user would load the user again
+        token = Token.objects.create(user_id=token.user_id)
     return is_expired, token
 
 
+# user, token get or create (savepoint, insert, release), or an expired token's
+# delete and insert, then login(): new session key check, session insert with
+# its savepoint and release, and last_login update. One more to save the
+# password when its hash is upgraded.
+@query_budget(11)
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPRateThrottle, LoginEmailRateThrottle])
 @swagger_auto_schema(
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
@@ -38,7 +49,12 @@ def token_expire_handler(token):
         },
         required=["username", "password"],
     ),
-    responses={201: "Returns a token", 404: "No such user exists", 401: "invalid credentials"},
+    responses={
+        201: "Returns a token",
+        404: "No such user exists",
+        401: "invalid credentials",
+        429: "Too many login attempts",
+    },
 )
 def authenticate_user(request):
     """
@@ -50,16 +66,17 @@ def authenticate_user(request):
         user = User.objects.get(email=serializer.data["email"])
     except User.DoesNotExist:
         raise AuthenticationFailed("No such user exists", 404)
-    if not check_password(serializer.data["password"], user.password):
+    # Rehashes and saves the password if it was hashed with an older hasher
+    if not user.check_password(serializer.data["password"]):
         raise AuthenticationFailed("Invalid credentials", 400)
     token, _ = Token.objects.get_or_create(user=user)
-    is_expired, token = token_expire_handler(token)
-    if is_expired:
-        token = Token.objects.create(user=user)
+    _, token = token_expire_handler(token)
     login(request, user)
     return Response({"token": token.key}, 201)
 
 
+# token, its delete, then the session's load and delete
+@query_budget(4)
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def logout_user(request):
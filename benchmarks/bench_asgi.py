@@ -0,0 +1,217 @@
+"""
+Compare the service under a sync WSGI server (gunicorn) and an async ASGI
+server (uvicorn) with many slow clients.
+
+Each client trickles its request headers out over --client-delay ms, the way
+clients on slow networks do. A sync worker is stuck reading that request the
+whole time, an ASGI server only parses it once it has arrived.
+
+    python -m benchmarks.bench_asgi --concurrency 200 --duration 20 --workers 2
+
+Needs gunicorn and uvicorn installed, both servers run against the same throwaway
+SQLite database seeded by create_test_data.
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.utils import percentiles, print_result
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(
+                f"server exited with status {process.returncode}"
+            )
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not start listening on port {port}")
+
+
+def server_command(name, port, workers) -> list:
+    if name == "wsgi (gunicorn sync)":
+        return [
+            "gunicorn",
+            "address_service.wsgi:application",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ]
+    return [
+        "uvicorn",
+        "address_service.asgi:application",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+        "--no-access-log",
+    ]
+
+
+async def slow_request(port, path, token, client_delay):
+    """Send one GET with its headers in two halves, return the status code"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n".encode())
+        await writer.drain()
+        await asyncio.sleep(client_delay)
+        writer.write(
+            f"Authorization: Token {token}\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def load(
+    port, paths, token, concurrency, duration, client_delay
+) -> dict:
+    timings = []
+    statuses = {}
+    deadline = time.monotonic() + duration
+
+    async def client():
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                status = await slow_request(
+                    port, random.choice(paths), token, client_delay
+                )
+            except (OSError, IndexError, ValueError):
+                status = "error"
+            timings.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(timings),
+        "requests_per_second": len(timings) / elapsed,
+        **percentiles(timings),
+        "statuses": ",".join(
+            f"{status}:{count}"
+            for status, count in sorted(statuses.items(), key=str)
+        ),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--per-user", type=int, default=1000, help="Addresses to seed"
+    )
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument(
+        "--duration", type=float, default=20, help="Seconds of load per server"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=2, help="Server worker processes"
+    )
+    parser.add_argument(
+        "--client-delay",
+        type=float,
+        default=100,
+        help="ms between request header writes",
+    )
+    args = parser.parse_args(argv)
+
+    for command in ("gunicorn", "uvicorn"):
+        if shutil.which(command) is None:
+            parser.error(f"{command} is not installed")
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "benchmarks.settings",
+            "DATABASE_NAME": os.path.join(directory, "bench_asgi.sqlite3"),
+        }
+        manage = [sys.executable, "manage.py"]
+        subprocess.run([*manage, "migrate", "-v", "0"], env=env, check=True)
+        seeded = subprocess.run(
+            [*manage, "create_test_data", "--per-user", str(args.per_user)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        token = re.search(r"token (\w+)", seeded).group(1)
+        ids = subprocess.run(
+            [
+                *manage,
+                "shell",
+                "-c",
+                "from address_book.models import AddressBook\n"
+                "print('\\n'.join(str(id) for id in AddressBook.objects.values_list('id', flat=True)[:500]))",
+            ],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        paths = [f"/addresses/{address_id}/" for address_id in ids]
+        paths += [
+            f"/addresses/?page={page}"
+            for page in range(1, max(2, args.per_user // 10))
+        ]
+
+        for name in ("wsgi (gunicorn sync)", "asgi (uvicorn)"):
+            port = free_port()
+            # Persistent connections suit sync workers, under ASGI they leak
+            conn_max_age = "60" if name.startswith("wsgi") else "0"
+            process = subprocess.Popen(
+                server_command(name, port, args.workers),
+                env={**env, "DATABASE_CONN_MAX_AGE": conn_max_age},
+            )
+            try:
+                wait_for_port(port, process)
+                result = asyncio.run(
+                    load(
+                        port,
+                        paths,
+                        token,
+                        args.concurrency,
+                        args.duration,
+                        args.client_delay / 1000,
+                    )
+                )
+            finally:
+                process.terminate()
+                process.wait()
+            print_result(name, result)
+
+
+if __name__ == "__main__":
+    main()
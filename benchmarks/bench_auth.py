@@ -0,0 +1,52 @@
+"""
+Compare the cost of authenticating a request with and without the token cache.
+
+    python -m benchmarks.bench_auth
+"""
+from benchmarks.utils import (
+    count_queries,
+    print_result,
+    setup_django,
+    test_database,
+    timeit,
+)
+
+setup_django()
+
+from django.contrib.auth.models import User  # noqa: E402
+from rest_framework.authentication import TokenAuthentication  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from authentication.backends import (  # noqa: E402
+    ExpiringTokenAuthentication,
+    token_cache,
+)
+
+
+def main():
+    with test_database():
+        user = User.objects.create_user(
+            username="bench", email="bench@example.com"
+        )
+        key = Token.objects.create(user=user).key
+
+        uncached = TokenAuthentication()
+        cached = ExpiringTokenAuthentication()
+        token_cache.clear()
+
+        for name, backend in [
+            ("TokenAuthentication", uncached),
+            ("ExpiringTokenAuthentication", cached),
+        ]:
+            result = timeit(
+                lambda: backend.authenticate_credentials(key), iterations=5000
+            )
+            result["queries_per_request"] = count_queries(
+                lambda: backend.authenticate_credentials(key)
+            )
+            print_result(name, result)
+        print_result("token cache", token_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Time a bulk import of many addresses, the whole request and its parts: DRF
+validating the rows, then import_addresses looking up duplicates and inserting.
+The insert is timed again with the SQLite search triggers dropped, which is
+what keeping the full text search index in sync costs.
+
+    python -m benchmarks.bench_bulk --rows 10000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.utils import (
+    percentiles,
+    print_result,
+    setup_django,
+    test_database,
+)
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from address_book.bulk import import_addresses  # noqa: E402
+from address_book.search import SQLITE_FTS_TABLE  # noqa: E402
+from address_book.serializer import AddressBookSerializer  # noqa: E402
+
+
+def addresses(count) -> list:
+    return [
+        {
+            "country": "GB",
+            "address_line_one": f"{number} Test Street",
+            "address_line_two": None,
+            "city": "London",
+            "zip_code": f"SW{number % 99} 1AA",
+        }
+        for number in range(count)
+    ]
+
+
+def timed(fn, iterations) -> dict:
+    """Time fn with a new user each run, as every import needs an empty address book"""
+    timings = []
+    for _ in range(iterations):
+        user = User.objects.create_user(
+            username=f"bench-{User.objects.count()}"
+        )
+        start = time.perf_counter()
+        fn(user)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"iterations": iterations, **percentiles(timings)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rows = addresses(args.rows)
+    body = json.dumps(rows)
+    serializer = AddressBookSerializer(data=rows, many=True)
+    serializer.is_valid(raise_exception=True)
+    validated = serializer.validated_data
+
+    # A file, like a deployed database, so commits pay for their writes
+    with tempfile.TemporaryDirectory() as directory:
+        with test_database(os.path.join(directory, "bulk.sqlite3")):
+
+            def request(user):
+                token = Token.objects.create(user=user)
+                client = Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+                response = client.post(
+                    reverse("bulk_addresses"),
+                    body,
+                    content_type="application/json",
+                )
+                assert response.status_code == 200, response.content
+
+            def validate(user):
+                AddressBookSerializer(data=rows, many=True).is_valid(
+                    raise_exception=True
+                )
+
+            def insert(user):
+                import_addresses(
+                    user, validated, settings.ADDRESS_BULK_BATCH_SIZE
+                )
+
+            print_result(
+                f"request, {args.rows} rows", timed(request, args.iterations)
+            )
+            print_result("validation", timed(validate, args.iterations))
+            print_result("import_addresses", timed(insert, args.iterations))
+            if connection.vendor == "sqlite":
+                with connection.cursor() as cursor:
+                    for trigger in ("insert", "update", "delete"):
+                        cursor.execute(
+                            f"DROP TRIGGER {SQLITE_FTS_TABLE}_{trigger}"
+                        )
+                print_result(
+                    "import_addresses without search triggers",
+                    timed(insert, args.iterations),
+                )
+
+
+if __name__ == "__main__":
+    main()
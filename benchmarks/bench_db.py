@@ -0,0 +1,156 @@
+"""
+Measure what the database settings buy.
+
+- The cost of opening a connection per request (DATABASE_CONN_MAX_AGE=0)
+  against reusing a persistent one
+- Mixed reads and writes from several threads, on SQLite with and without WAL
+
+Runs against the database configured by the DATABASE_* environment variables,
+e.g. a local Postgres container
+
+    docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=postgres postgres:15
+    DATABASE_ENGINE=postgresql DATABASE_PASSWORD=postgres python -m benchmarks.bench_db
+
+or SQLite by default
+
+    python -m benchmarks.bench_db --threads 8
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from benchmarks.utils import print_result, setup_django, test_database, timeit
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import (  # noqa: E402
+    OperationalError,
+    close_old_connections,
+    connection,
+)
+
+from address_book.models import AddressBook  # noqa: E402
+
+
+def query():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def reconnect_and_query():
+    connection.close()
+    query()
+
+
+def mixed_load(user, threads, operations, write_ratio) -> dict:
+    """Each thread reads a page of addresses or inserts one, returns throughput and errors"""
+    errors = []
+    barrier = threading.Barrier(threads)
+
+    def worker(worker_id):
+        barrier.wait()
+        try:
+            for number in range(operations):
+                try:
+                    if number % int(1 / write_ratio) == 0:
+                        AddressBook.objects.create(
+                            user=user,
+                            country="GB",
+                            address_line_one=f"{worker_id}-{number} {uuid.uuid4().hex[:8]}",
+                            city="Bench",
+                            zip_code="BE1 1NC",
+                        )
+                    else:
+                        list(
+                            user.addresses.order_by("id").values("id", "city")[
+                                :10
+                            ]
+                        )
+                except OperationalError as exc:
+                    errors.append(str(exc))
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    workers = [
+        threading.Thread(target=worker, args=(i,)) for i in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "operations_per_second": threads * operations / elapsed,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else "",
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument(
+        "--operations", type=int, default=500, help="Operations per thread"
+    )
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    sqlite = connection.vendor == "sqlite"
+    with tempfile.TemporaryDirectory() as directory:
+        # A file, an in-memory SQLite database cannot be shared between threads
+        with test_database(
+            os.path.join(directory, "bench_db.sqlite3") if sqlite else None
+        ):
+            print_result(
+                "query on a persistent connection",
+                timeit(query, iterations=2000),
+            )
+            print_result(
+                "connect and query",
+                timeit(reconnect_and_query, iterations=500),
+            )
+
+            user = User.objects.create_user(
+                username="bench", email="bench@example.com"
+            )
+            if not sqlite:
+                print_result(
+                    f"{connection.vendor} mixed load",
+                    mixed_load(
+                        user, args.threads, args.operations, args.write_ratio
+                    ),
+                )
+                return
+
+            pragmas = dict(settings.SQLITE_PRAGMAS)
+            for name, overrides in [
+                (
+                    "sqlite rollback journal, no busy timeout",
+                    {"journal_mode": "delete", "busy_timeout": 0},
+                ),
+                ("sqlite rollback journal", {"journal_mode": "delete"}),
+                ("sqlite WAL (default pragmas)", {}),
+            ]:
+                settings.SQLITE_PRAGMAS = {**pragmas, **overrides}
+                close_old_connections()
+                connection.close()
+                print_result(
+                    name,
+                    mixed_load(
+                        user, args.threads, args.operations, args.write_ratio
+                    ),
+                )
+            settings.SQLITE_PRAGMAS = pragmas
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Compare DRF's JSONRenderer and JSONParser with the orjson ones on address
+pages shaped like the API's responses, and json with orjson for export chunks.
+Checks the output is identical before timing.
+
+    python -m benchmarks.bench_json
+"""
+import io
+import json
+import uuid
+
+from benchmarks.utils import print_result, setup_django, timeit
+
+setup_django()
+
+import orjson  # noqa: E402
+from faker import Faker  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from address_book.serializer import AddressBookReadSerializer  # noqa: E402
+from address_service.parsers import ORJSONParser  # noqa: E402
+from address_service.renderers import ORJSONRenderer  # noqa: E402
+
+PAGE_SIZES = [10, 100, 1000]
+EXPORT_CHUNK_SIZE = 2000
+
+
+def make_addresses(count):
+    fake = Faker(["en_GB", "de_DE", "fr_FR", "ja_JP"])
+    Faker.seed(0)
+    rows = [
+        {
+            "id": uuid.UUID(int=number),
+            "country": fake.current_country_code(),
+            "address_line_one": fake.street_address()[:50],
+            "address_line_two": fake.secondary_address()[:50]
+            if number % 3
+            else None,
+            "city": fake.city()[:50],
+            "zip_code": fake.postcode()[:10],
+        }
+        for number in range(count)
+    ]
+    return AddressBookReadSerializer.to_representation(rows)
+
+
+def compare(name, old, new, iterations):
+    assert old() == new(), f"{name}: outputs differ"
+    old_result = timeit(old, iterations=iterations)
+    new_result = timeit(new, iterations=iterations)
+    print_result(
+        name,
+        {
+            "json_mean_ms": old_result["mean_ms"],
+            "orjson_mean_ms": new_result["mean_ms"],
+            "speedup": f"{old_result['mean_ms'] / new_result['mean_ms']:.1f}x",
+        },
+    )
+
+
+def main():
+    addresses = make_addresses(max(PAGE_SIZES + [EXPORT_CHUNK_SIZE]))
+    json_renderer, orjson_renderer = JSONRenderer(), ORJSONRenderer()
+    json_parser, orjson_parser = JSONParser(), ORJSONParser()
+
+    for page_size in PAGE_SIZES:
+        iterations = max(50, 20000 // page_size)
+        # A page of the address listing
+        page = {
+            "count": 100000,
+            "next": "http://localhost:8000/addresses/?page=3",
+            "previous": "http://localhost:8000/addresses/?page=1",
+            "results": addresses[:page_size],
+        }
+        compare(
+            f"render page_size={page_size}",
+            lambda: json_renderer.render(page),
+            lambda: orjson_renderer.render(page),
+            iterations,
+        )
+        body = json_renderer.render(addresses[:page_size])
+        compare(
+            f"parse bulk import rows={page_size}",
+            lambda: json_parser.parse(io.BytesIO(body)),
+            lambda: orjson_parser.parse(io.BytesIO(body)),
+            iterations,
+        )
+
+    lookup = {
+        "addresses": {address["id"]: address for address in addresses[:50]},
+        "missing": [],
+    }
+    compare(
+        "render lookup ids=50",
+        lambda: json_renderer.render(lookup),
+        lambda: orjson_renderer.render(lookup),
+        2000,
+    )
+
+    chunk = addresses[:EXPORT_CHUNK_SIZE]
+    compare(
+        f"export ndjson chunk rows={EXPORT_CHUNK_SIZE}",
+        lambda: "".join(
+            json.dumps(address, ensure_ascii=False, separators=(",", ":"))
+            + "\n"
+            for address in chunk
+        ).encode(),
+        lambda: b"".join(orjson.dumps(address) + b"\n" for address in chunk),
+        50,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Logins per second per core: the cost of checking a password with each hasher,
+and of the whole login request with the configured one, throttled or not.
+Everything runs on one thread, so the rates are per core.
+
+    python -m benchmarks.bench_login
+"""
+import argparse
+import json
+import logging
+from unittest import mock
+
+from benchmarks.utils import print_result, setup_django, test_database, timeit
+
+setup_django()
+
+from django.contrib.auth.hashers import (  # noqa: E402
+    check_password,
+    make_password,
+)
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.throttling import SimpleRateThrottle  # noqa: E402
+
+HASHERS = {
+    "md5 (tests)": "django.contrib.auth.hashers.MD5PasswordHasher",
+    "pbkdf2 (django default)": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "argon2 (django default)": "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "argon2 (configured)": "authentication.hashers.Argon2PasswordHasher",
+}
+
+
+def per_second(result):
+    return {"logins_per_s": 1000 / result["mean_ms"], **result}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    for name, hasher in HASHERS.items():
+        with override_settings(PASSWORD_HASHERS=[hasher]):
+            encoded = make_password("password")
+            result = timeit(
+                lambda: check_password("password", encoded),
+                iterations=args.iterations,
+                warmup=2,
+            )
+        print_result(f"check_password {name}", per_second(result))
+
+    with test_database():
+        User.objects.create_user(
+            username="bench", email="bench@example.com", password="password"
+        )
+        client = Client()
+        body = json.dumps(
+            {"email": "bench@example.com", "password": "password"}
+        )
+
+        def login():
+            return client.post(
+                reverse("login_user"), body, content_type="application/json"
+            )
+
+        unthrottled = {"login_ip": None, "login_email": None}
+        with mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, unthrottled):
+            assert login().status_code == 201
+            result = timeit(login, iterations=args.iterations, warmup=2)
+        print_result("login request", per_second(result))
+
+        cache.clear()
+        # Django logs every 429 as a warning
+        logging.getLogger("django.request").setLevel(logging.ERROR)
+        with mock.patch.dict(
+            SimpleRateThrottle.THROTTLE_RATES, {"login_email": "1/hour"}
+        ):
+            login()
+            assert login().status_code == 429
+            result = timeit(login, iterations=args.iterations * 10, warmup=2)
+        print_result("throttled login request", per_second(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Overhead of PerformanceMiddleware on cheap requests, where it is largest
+relative to the work done.
+
+    python -m benchmarks.bench_metrics
+"""
+import statistics
+
+from benchmarks.utils import print_result, setup_django, test_database, timeit
+
+setup_django()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from address_book.models import AddressBook  # noqa: E402
+
+ITERATIONS = 5000
+ROUNDS = 10
+
+
+def main():
+    with test_database():
+        user = User.objects.create_user(
+            username="bench", email="bench@example.com"
+        )
+        token = Token.objects.create(user=user)
+        address = AddressBook.objects.create(
+            user=user,
+            country="GB",
+            address_line_one="1 Bench Street",
+            city="Bench",
+            zip_code="BE1 1NC",
+        )
+        paths = {"health": "/health/", "address": f"/addresses/{address.id}/"}
+
+        clients = {}
+        for enabled in (False, True):
+            with override_settings(PERFORMANCE_METRICS_ENABLED=enabled):
+                # The middleware is loaded on a client's first request
+                clients[enabled] = Client(
+                    HTTP_AUTHORIZATION=f"Token {token.key}"
+                )
+                clients[enabled].get("/health/")
+
+        for name, path in paths.items():
+            # Alternate rounds so drift over the run affects both sides alike
+            timings = {False: [], True: []}
+            for _ in range(ROUNDS):
+                for enabled, client in clients.items():
+                    result = timeit(
+                        lambda: client.get(path),
+                        iterations=ITERATIONS // ROUNDS,
+                    )
+                    timings[enabled].append(result["mean_ms"])
+            means = {
+                enabled: statistics.fmean(values)
+                for enabled, values in timings.items()
+            }
+            print_result(
+                name,
+                {
+                    "off_mean_ms": means[False],
+                    "on_mean_ms": means[True],
+                    "overhead": f"{means[True] / means[False] - 1:+.1%}",
+                },
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Time the address listing filters against a large address book and print the
+query plan SQLite picks for each, to check they use an index rather than
+scanning the user's addresses.
+
+    python -m benchmarks.bench_search --per-user 100000
+"""
+import argparse
+import os
+
+from benchmarks.utils import print_result, setup_django, test_database, timeit
+
+setup_django()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from address_book.search import filter_addresses  # noqa: E402
+from address_book.serializer import AddressBookReadSerializer  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--per-user", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    with test_database():
+        call_command(
+            "create_test_data",
+            per_user=args.per_user,
+            stdout=open(os.devnull, "w"),
+        )
+        token = Token.objects.select_related("user").get()
+        user = token.user
+        sample = user.addresses.order_by("?").first()
+        searches = {
+            "country": {"country": "gb"},
+            "city prefix": {"city": sample.city[:3]},
+            "zip_code prefix": {"zip_code": sample.zip_code[:3]},
+            "q": {"q": sample.address_line_one.split()[-1]},
+            "q two words": {
+                "q": f"{sample.address_line_one.split()[-1]} {sample.city[:4]}"
+            },
+        }
+
+        for name, params in searches.items():
+            matches = filter_addresses(user.addresses.all(), params, user)
+            queryset = AddressBookReadSerializer.queryset(matches).order_by(
+                "id"
+            )[:10]
+            sql, sql_params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", sql_params)
+                plan = [row[-1] for row in cursor.fetchall()]
+            print(f"{name} {params}, {matches.count()} matches")
+            for step in plan:
+                print(f"    {step}")
+            print_result(
+                f"{name} page",
+                timeit(
+                    lambda: list(queryset.all()), iterations=args.iterations
+                ),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Compare AddressBookSerializer with the AddressBookReadSerializer fast path
+when rendering a page of addresses.
+
+    python -m benchmarks.bench_serializers
+"""
+from benchmarks.utils import print_result, setup_django, test_database, timeit
+
+setup_django()
+
+from django.contrib.auth.models import User  # noqa: E402
+from faker import Faker  # noqa: E402
+
+from address_book.models import AddressBook  # noqa: E402
+from address_book.serializer import (  # noqa: E402
+    AddressBookReadSerializer,
+    AddressBookSerializer,
+)
+
+PAGE_SIZES = [10, 100, 1000]
+
+
+def main():
+    fake = Faker()
+    with test_database():
+        user = User.objects.create_user(
+            username="bench", email="bench@example.com"
+        )
+        AddressBook.objects.bulk_create(
+            AddressBook(
+                user=user,
+                country="GB",
+                address_line_one=f"{number} {fake.street_name()}"[:50],
+                city=fake.city(),
+                zip_code=fake.postcode(),
+            )
+            for number in range(max(PAGE_SIZES))
+        )
+        addresses = user.addresses.order_by("id")
+
+        for page_size in PAGE_SIZES:
+            current = AddressBookSerializer(
+                addresses[:page_size], many=True
+            ).data
+            fast = AddressBookReadSerializer.to_representation(
+                AddressBookReadSerializer.queryset(addresses)[:page_size]
+            )
+            assert (
+                fast == current
+            ), "fast path output differs from AddressBookSerializer"
+
+            iterations = max(20, 20000 // page_size)
+            print_result(
+                f"AddressBookSerializer page_size={page_size}",
+                timeit(
+                    lambda: AddressBookSerializer(
+                        addresses[:page_size], many=True
+                    ).data,
+                    iterations=iterations,
+                ),
+            )
+            print_result(
+                f"AddressBookReadSerializer page_size={page_size}",
+                timeit(
+                    lambda: AddressBookReadSerializer.to_representation(
+                        AddressBookReadSerializer.queryset(addresses)[
+                            :page_size
+                        ]
+                    ),
+                    iterations=iterations,
+                ),
+            )
+
+
+if __name__ == "__main__":
+    main()
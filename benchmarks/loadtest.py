@@ -0,0 +1,445 @@
+"""
+Load test the address and authentication endpoints with a mixed workload.
+
+In process (default), against a throwaway SQLite test database file seeded
+with create_test_data. It gets SQLITE_PRAGMAS like any connection, so WAL and
+busy_timeout let the worker threads write concurrently. Queries per request are
+recorded in this mode:
+
+    python -m benchmarks.loadtest --per-user 10000 --requests 2000 --concurrency 8
+
+Against a running server, e.g. `python manage.py runserver`, using the token and
+email printed by `python manage.py create_test_data`:
+
+    python -m benchmarks.loadtest --url http://localhost:8000 --token <token> --email <email>
+
+A request that fails to send or raises is counted as an error of its
+operation, like a 5xx, and the exception is listed under the report. Results are
+written as JSON with --output and compared with an earlier run with --compare,
+which exits with status 1 if any operation's p95 latency regressed by more than
+--max-regression.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.utils import percentiles, setup_django, test_database
+
+DEFAULT_MIX = (
+    "list=40,cursor=10,detail=25,create=10,update=10,delete=4,login=1"
+)
+
+
+def parse_mix(value) -> dict:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name}")
+        mix[name] = int(weight)
+    return mix
+
+
+class InProcessTransport:
+    """Send requests through Django's test client, counting queries per request"""
+
+    def __init__(self, token):
+        from django.test import Client
+
+        # The test client picks up exceptions through a global signal, so with
+        # several threads it would re-raise one request's exception in each of
+        # them. Unraised, it is this request's 500 and logged by django.request.
+        self.client = Client(
+            HTTP_AUTHORIZATION=f"Token {token}", raise_request_exception=False
+        )
+
+    def request(self, method, path, body=None):
+        from django.db import connection
+
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            response = getattr(self.client, method.lower())(
+                path,
+                data=json.dumps(body) if body is not None else None,
+                content_type="application/json",
+            )
+            if response.streaming:
+                b"".join(response.streaming_content)
+        return response.status_code, len(queries)
+
+    def close(self):
+        from django.db import connection
+
+        # Each worker thread has its own database connection
+        connection.close()
+
+
+class HTTPTransport:
+    """Send requests to a live server over one keep-alive connection per worker"""
+
+    def __init__(self, url, token):
+        parts = urlsplit(url)
+        connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.connection = connection_class(parts.netloc, timeout=30)
+        self.headers = {
+            "Authorization": f"Token {token}",
+            "Content-Type": "application/json",
+        }
+
+    def request(self, method, path, body=None):
+        self.connection.request(
+            method,
+            path,
+            body=json.dumps(body) if body is not None else None,
+            headers=self.headers,
+        )
+        response = self.connection.getresponse()
+        response.read()
+        return response.status, None
+
+    def close(self):
+        self.connection.close()
+
+
+class Workload:
+    """Shared state for the operations, the ids of addresses known to exist"""
+
+    def __init__(self, address_ids, email, pages):
+        self.address_ids = list(address_ids)
+        self.email = email
+        self.pages = max(1, pages)
+        self.lock = threading.Lock()
+
+    def random_id(self):
+        with self.lock:
+            return (
+                random.choice(self.address_ids)
+                if self.address_ids
+                else uuid.uuid4()
+            )
+
+    def add_id(self, address_id):
+        with self.lock:
+            self.address_ids.append(address_id)
+
+    def pop_id(self):
+        with self.lock:
+            if not self.address_ids:
+                return uuid.uuid4()
+            return self.address_ids.pop(
+                random.randrange(len(self.address_ids))
+            )
+
+
+def random_address(address_id=None):
+    address = {
+        "country": "GB",
+        "address_line_one": f"{random.randint(1, 9999)} Load Test Street {uuid.uuid4().hex[:8]}",
+        "address_line_two": None,
+        "city": "Benchmark City",
+        "zip_code": f"LT{random.randint(1, 99)} {random.randint(1, 9)}AA",
+    }
+    if address_id is not None:
+        address["id"] = str(address_id)
+    return address
+
+
+def op_list(transport, workload):
+    query = urlencode({"page": random.randint(1, workload.pages)})
+    return transport.request("GET", f"/addresses/?{query}")
+
+
+def op_cursor(transport, workload):
+    return transport.request("GET", "/addresses/?cursor=")
+
+
+def op_detail(transport, workload):
+    return transport.request("GET", f"/addresses/{workload.random_id()}/")
+
+
+def op_create(transport, workload):
+    address_id = uuid.uuid4()
+    result = transport.request(
+        "POST", "/addresses/", random_address(address_id)
+    )
+    if result[0] == 200:
+        workload.add_id(address_id)
+    return result
+
+
+def op_update(transport, workload):
+    return transport.request(
+        "PUT", f"/addresses/{workload.random_id()}/", random_address()
+    )
+
+
+def op_delete(transport, workload):
+    return transport.request(
+        "DELETE", "/addresses/", {"address_ids": [str(workload.pop_id())]}
+    )
+
+
+def op_login(transport, workload):
+    return transport.request(
+        "POST",
+        "/authentication/login/",
+        {"email": workload.email, "password": "password"},
+    )
+
+
+OPERATIONS = {
+    "list": op_list,
+    "cursor": op_cursor,
+    "detail": op_detail,
+    "create": op_create,
+    "update": op_update,
+    "delete": op_delete,
+    "login": op_login,
+}
+
+
+def run(make_transport, workload, mix, requests, concurrency) -> dict:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    plan = random.choices(names, weights=weights, k=requests)
+    chunks = [plan[worker::concurrency] for worker in range(concurrency)]
+    samples = defaultdict(list)
+    exceptions = Counter()
+    samples_lock = threading.Lock()
+
+    def worker(operations):
+        transport = make_transport()
+        results = []
+        raised = Counter()
+        try:
+            for name in operations:
+                start = time.perf_counter()
+                try:
+                    status, queries = OPERATIONS[name](transport, workload)
+                except Exception as exc:
+                    # Recorded with no status, it counts as an error
+                    status, queries = None, None
+                    raised[f"{name}: {exc.__class__.__name__}: {exc}"] += 1
+                results.append(
+                    (
+                        name,
+                        (time.perf_counter() - start) * 1000,
+                        status,
+                        queries,
+                    )
+                )
+        finally:
+            transport.close()
+            with samples_lock:
+                for name, elapsed, status, queries in results:
+                    samples[name].append((elapsed, status, queries))
+                exceptions.update(raised)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, chunks))
+    duration = time.perf_counter() - start
+
+    operations = {}
+    for name, results in sorted(samples.items()):
+        queries = [result[2] for result in results if result[2] is not None]
+        operations[name] = {
+            "count": len(results),
+            "errors": sum(
+                1
+                for result in results
+                if result[1] is None or result[1] >= 500
+            ),
+            "requests_per_second": len(results) / duration,
+            **percentiles([result[0] for result in results]),
+            "queries_per_request": sum(queries) / len(queries)
+            if queries
+            else None,
+        }
+    return {
+        "duration_s": duration,
+        "requests": requests,
+        "requests_per_second": requests / duration,
+        "errors": sum(
+            operation["errors"] for operation in operations.values()
+        ),
+        "operations": operations,
+        "exceptions": dict(exceptions.most_common()),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report):
+    print(
+        f"{report['requests']} requests in {report['duration_s']:.2f}s, "
+        f"{report['requests_per_second']:.1f} req/s, {report['errors']} errors"
+    )
+    print(
+        f"{'operation':<10}{'count':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}"
+    )
+    for name, operation in report["operations"].items():
+        queries = operation["queries_per_request"]
+        print(
+            f"{name:<10}{operation['count']:>8}{operation['requests_per_second']:>10.1f}"
+            f"{operation['p50_ms']:>10.2f}{operation['p95_ms']:>10.2f}{operation['p99_ms']:>10.2f}"
+            f"{'-' if queries is None else f'{queries:.1f}':>10}"
+        )
+    for exception, count in report["exceptions"].items():
+        print(f"{count:>6} x {exception}")
+
+
+def compare(report, baseline, max_regression) -> bool:
+    """Print the change against a baseline, returns False if p95 regressed"""
+    ok = True
+    print(
+        f"\ncompared with {baseline['meta'].get('revision')} ({baseline['meta']['timestamp']})"
+    )
+    for name, operation in report["operations"].items():
+        previous = baseline["operations"].get(name)
+        if not previous:
+            continue
+        change = (
+            operation["p95_ms"] / previous["p95_ms"] - 1
+            if previous["p95_ms"]
+            else 0
+        )
+        regressed = change > max_regression
+        ok = ok and not regressed
+        print(
+            f"{name:<10} p95 {previous['p95_ms']:.2f} -> {operation['p95_ms']:.2f} ms "
+            f"({change:+.0%}){'  REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--url",
+        help="Base URL of a running server, runs in process when omitted",
+    )
+    parser.add_argument(
+        "--token", help="Token to authenticate with against --url"
+    )
+    parser.add_argument(
+        "--email",
+        help="Email of the token's user, for login requests against --url",
+    )
+    parser.add_argument(
+        "--per-user",
+        type=int,
+        default=1000,
+        help="Addresses to seed in process",
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX)
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed for the workload"
+    )
+    parser.add_argument(
+        "--output", help="Write the results as JSON to this file"
+    )
+    parser.add_argument(
+        "--compare", help="Compare the results with a JSON baseline file"
+    )
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "mode": "http" if args.url else "in-process",
+        "per_user": None if args.url else args.per_user,
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+    }
+
+    if args.url:
+        if not args.token:
+            parser.error("--token is required with --url")
+        workload = Workload([], args.email or "", pages=1)
+        report = run(
+            lambda: HTTPTransport(args.url, args.token),
+            workload,
+            args.mix,
+            args.requests,
+            args.concurrency,
+        )
+    else:
+        setup_django()
+        from django.core.management import call_command
+        from rest_framework.authtoken.models import Token
+
+        with tempfile.TemporaryDirectory() as directory:
+            with test_database(os.path.join(directory, "loadtest.sqlite3")):
+                call_command(
+                    "create_test_data",
+                    per_user=args.per_user,
+                    stdout=open(os.devnull, "w"),
+                )
+                token = Token.objects.select_related("user").get()
+                workload = Workload(
+                    token.user.addresses.values_list("id", flat=True),
+                    token.user.email,
+                    pages=args.per_user // 10,
+                )
+                report = run(
+                    lambda: InProcessTransport(token.key),
+                    workload,
+                    args.mix,
+                    args.requests,
+                    args.concurrency,
+                )
+
+    report = {"meta": meta, **report}
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if args.compare:
+        with open(args.compare) as baseline:
+            if not compare(report, json.load(baseline), args.max_regression):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
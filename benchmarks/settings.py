@@ -0,0 +1,8 @@
+"""
+Settings for benchmarks that run the service in a separate server process.
+The database comes from the DATABASE_* environment variables as usual.
+"""
+from address_service.settings import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
@@ -0,0 +1,85 @@
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "address_service.settings")
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database(name=None):
+    """
+    Create a throwaway test database for the duration of a benchmark, the same
+    way the test runner does, so benchmarks never touch db.sqlite3.
+
+    Pass a file name for SQLite when several threads need to share the database,
+    the default in-memory database locks up under concurrent writes.
+    """
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment,
+        teardown_test_environment,
+    )
+
+    if name is not None:
+        connection.settings_dict["TEST"]["NAME"] = name
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def count_queries(fn) -> int:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as context:
+        fn()
+    return len(context.captured_queries)
+
+
+def timeit(fn, iterations=1000, warmup=10) -> dict:
+    """Run fn repeatedly and return latency percentiles in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"iterations": iterations, **percentiles(timings)}
+
+
+def percentiles(timings) -> dict:
+    """Summarise latencies in milliseconds"""
+    timings = sorted(timings)
+    if not timings:
+        return {}
+
+    def at(fraction):
+        return timings[max(0, int(len(timings) * fraction) - 1)]
+
+    return {
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+    }
+
+
+def print_result(name, result):
+    fields = ", ".join(
+        f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in result.items()
+    )
+    print(f"{name}: {fields}")
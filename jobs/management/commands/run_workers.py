@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs in a pool of worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Jobs run at once, each in its own process. 0 runs them in this process",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once there are no queued jobs left",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"Running jobs with {options['processes']} processes"
+        )
+        Worker(processes=options["processes"], burst=options["burst"]).run()
+        self.stdout.write("Stopped")
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0001_add_job_model"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="claim",
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,120 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class JobCancelled(Exception):
+    """Raised in a running job when it has been asked to stop"""
+
+
+class JobClaimLost(Exception):
+    """
+    Raised in a running job that was queued again, and maybe claimed by another
+    worker, after its worker stopped reporting for too long
+    """
+
+
+def result_file_path(job, filename) -> str:
+    return f"jobs/{job.user_id}/{job.id}/{filename}"
+
+
+class Job(models.Model):
+    """
+    A long running operation on a user's address book, run by
+    ``manage.py run_workers``, see jobs.worker.
+    """
+
+    class Kind(models.TextChoices):
+        IMPORT_ADDRESSES = "import_addresses"
+        DELETE_ADDRESSES = "delete_addresses"
+        EXPORT_ADDRESSES = "export_addresses"
+
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        SUCCEEDED = "succeeded"
+        FAILED = "failed"
+        CANCELLED = "cancelled"
+
+    FINISHED = {Status.SUCCEEDED, Status.FAILED, Status.CANCELLED}
+
+    id = models.UUIDField(editable=False, default=uuid.uuid4, primary_key=True)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="jobs"
+    )
+    kind = models.CharField(max_length=32, choices=Kind.choices)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.QUEUED
+    )
+    params = models.JSONField(encoder=DjangoJSONEncoder)
+    # A client chosen key, submitting the same key again returns the same job
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True)
+    # Items done out of total, total is set when the job starts
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    # A running job stops at its next progress report once this is set
+    cancel_requested = models.BooleanField(default=False)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    result_file = models.FileField(upload_to=result_file_path, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Last sign of life from the worker running the job
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    # Set by the worker that claimed the job, only its writes to the job count
+    claim = models.UUIDField(null=True, blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "idempotency_key"],
+                condition=models.Q(idempotency_key__isnull=False),
+                name="unique_job_idempotency_key_per_user",
+            ),
+        ]
+        indexes = [
+            # Workers take the oldest queued job
+            models.Index(
+                fields=["status", "created_at"],
+                name="job_status_created_at_idx",
+            ),
+            # A user's jobs, newest first
+            models.Index(
+                fields=["user", "-created_at"], name="job_user_created_at_idx"
+            ),
+        ]
+
+    def report_progress(
+        self, progress, total=None, result=None, cancellable=True
+    ):
+        """
+        Record how far the job has got, with the result so far if given. Raises
+        JobCancelled if the job has been cancelled, unless ``cancellable`` is
+        off, and JobClaimLost if it is no longer this worker's. Handlers call
+        this between batches, it is also the job's heartbeat.
+        """
+        fields = {"progress": progress, "heartbeat_at": timezone.now()}
+        if total is not None:
+            fields["total"] = total
+        if result is not None:
+            fields["result"] = result
+        owned = Job.objects.filter(
+            pk=self.pk, status=Job.Status.RUNNING, claim=self.claim
+        )
+        if cancellable:
+            updated = owned.filter(cancel_requested=False).update(**fields)
+        else:
+            updated = owned.update(**fields)
+        for field, value in fields.items():
+            setattr(self, field, value)
+        if not updated:
+            if cancellable and owned.exists():
+                raise JobCancelled
+            raise JobClaimLost
+
+    def __str__(self):
+        return f"{self.kind} {self.id} ({self.status})"
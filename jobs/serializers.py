@@ -0,0 +1,46 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from jobs.models import Job
+from jobs.tasks import JOB_KINDS
+
+
+class JobSerializer(serializers.ModelSerializer):
+    result_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "progress",
+            "total",
+            "cancel_requested",
+            "result",
+            "result_url",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+    def get_result_url(self, job):
+        if not job.result_file:
+            return None
+        url = reverse("job_result", kwargs={"job_id": job.id})
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
+class JobSubmitSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=Job.Kind.choices)
+    params = serializers.DictField(default=dict)
+
+    def validate(self, data):
+        params_serializer_class, _ = JOB_KINDS[data["kind"]]
+        params = params_serializer_class(data=data["params"])
+        if not params.is_valid():
+            raise serializers.ValidationError({"params": params.errors})
+        # The representation is plain JSON, the same as the job stores
+        return {"kind": data["kind"], "params": params.data}
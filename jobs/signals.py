@@ -0,0 +1,14 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from jobs.models import Job
+
+
+@receiver(post_delete, sender=Job)
+def delete_result_file(sender, instance, **kwargs):
+    """Remove a job's result file along with the job, once the delete commits"""
+    if instance.result_file:
+        transaction.on_commit(partial(instance.result_file.delete, save=False))
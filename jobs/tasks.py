@@ -0,0 +1,154 @@
+"""
+What each kind of job does.
+
+Every kind has a serializer validating its params when the job is submitted, the
+validated params are stored on the job as JSON, and a handler the worker calls
+with the job. Handlers work in batches, each committed on its own, and report
+progress between them, which is also where they stop if the job was cancelled.
+Whatever a handler returns is stored as the job's result.
+
+Batches that write report progress at both ends of the batch's transaction,
+the result so far with the second report. The progress committed is then
+exactly the work committed, and a job queued again resumes from it with its
+counts. The first report makes the transaction start with a write: SQLite can't
+turn a transaction that has read into a write transaction once another process
+has written, it fails with "database is locked" rather than waiting.
+"""
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from address_book.bulk import delete_addresses, import_addresses
+from address_book.cache import address_book_cache
+from address_book.export import EXPORT_CONTENT_TYPES, encode_export, iter_pages
+from address_book.serializer import AddressBookSerializer
+from jobs.models import Job
+
+
+class ImportAddressesSerializer(serializers.Serializer):
+    addresses = AddressBookSerializer(many=True, allow_empty=False)
+
+
+class DeleteAddressesSerializer(serializers.Serializer):
+    address_ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False
+    )
+
+    def validate_address_ids(self, value):
+        return list(dict.fromkeys(value))
+
+
+class ExportAddressesSerializer(serializers.Serializer):
+    format = serializers.ChoiceField(
+        choices=list(EXPORT_CONTENT_TYPES), default="ndjson"
+    )
+    # Only export addresses changed after this
+    since = serializers.DateTimeField(required=False)
+
+
+def import_addresses_job(job) -> dict:
+    """Import addresses, skipping duplicates like the bulk import endpoint"""
+    rows = job.params["addresses"]
+    batch_size = settings.ADDRESS_BULK_BATCH_SIZE
+    # Picking up after the last batch committed if the job ran before
+    result = job.result or {
+        "created": 0,
+        "duplicates": 0,
+        "duplicate_indexes": [],
+    }
+    job.report_progress(job.progress, total=len(rows))
+    for start in range(job.progress, len(rows), batch_size):
+        batch = rows[start : start + batch_size]
+        with transaction.atomic():
+            job.report_progress(start)
+            results = import_addresses(job.user, batch, batch_size)
+            duplicates = [
+                start + row["index"]
+                for row in results
+                if row["status"] == "duplicate"
+            ]
+            created = len(results) - len(duplicates)
+            result = {
+                "created": result["created"] + created,
+                "duplicates": result["duplicates"] + len(duplicates),
+                "duplicate_indexes": result["duplicate_indexes"] + duplicates,
+            }
+            # The batch is done, a cancellation stops the job before the next one
+            job.report_progress(
+                start + len(batch), result=result, cancellable=False
+            )
+        if created:
+            address_book_cache.bump_version(job.user_id)
+    return result
+
+
+def delete_addresses_job(job) -> dict:
+    """Delete addresses by id, ignoring ids not in the address book"""
+    address_ids = [uuid.UUID(id) for id in job.params["address_ids"]]
+    batch_size = settings.ADDRESS_BULK_BATCH_SIZE
+    # Picking up after the last batch committed if the job ran before
+    result = job.result or {"deleted": 0}
+    job.report_progress(job.progress, total=len(address_ids))
+    for start in range(job.progress, len(address_ids), batch_size):
+        batch = address_ids[start : start + batch_size]
+        with transaction.atomic():
+            job.report_progress(start)
+            deleted = delete_addresses(job.user, batch, batch_size)
+            result = {"deleted": result["deleted"] + len(deleted)}
+            # The batch is done, a cancellation stops the job before the next one
+            job.report_progress(
+                start + len(batch), result=result, cancellable=False
+            )
+    return result
+
+
+def export_addresses_job(job) -> dict:
+    """
+    Write the address book to the job's result file, as NDJSON or CSV. It isn't
+    a snapshot, addresses changed while it runs may or may not be in it.
+    """
+    export_format = job.params["format"]
+    addresses = job.user.addresses.all()
+    if job.params.get("since"):
+        addresses = addresses.filter(
+            updated_at__gt=parse_datetime(job.params["since"])
+        )
+    job.report_progress(0, total=addresses.count())
+
+    def batches():
+        # Paged rather than streamed from one cursor, progress is written
+        # between pages
+        for batch in iter_pages(addresses, settings.ADDRESS_EXPORT_CHUNK_SIZE):
+            yield batch
+            progress = job.progress + len(batch)
+            job.report_progress(progress, total=max(job.total, progress))
+
+    with tempfile.TemporaryFile() as file:
+        for chunk in encode_export(batches(), export_format):
+            file.write(chunk)
+        file.seek(0)
+        job.result_file.save(
+            f"addresses.{export_format}", File(file), save=False
+        )
+    return {"exported": job.progress}
+
+
+JOB_KINDS = {
+    Job.Kind.IMPORT_ADDRESSES: (
+        ImportAddressesSerializer,
+        import_addresses_job,
+    ),
+    Job.Kind.DELETE_ADDRESSES: (
+        DeleteAddressesSerializer,
+        delete_addresses_job,
+    ),
+    Job.Kind.EXPORT_ADDRESSES: (
+        ExportAddressesSerializer,
+        export_addresses_job,
+    ),
+}
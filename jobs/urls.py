@@ -0,0 +1,10 @@
+from django.urls import path
+
+from jobs.views import CancelJobView, JobResultView, JobsAPI, JobView
+
+urlpatterns = [
+    path("", JobsAPI.as_view(), name="jobs"),
+    path("<uuid:job_id>/", JobView.as_view(), name="job"),
+    path("<uuid:job_id>/cancel/", CancelJobView.as_view(), name="cancel_job"),
+    path("<uuid:job_id>/result/", JobResultView.as_view(), name="job_result"),
+]
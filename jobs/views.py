@@ -0,0 +1,202 @@
+from django.db import IntegrityError, transaction
+from django.http import FileResponse
+from django.urls import reverse
+from django.utils import timezone
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from address_book.export import EXPORT_CONTENT_TYPES
+from address_service.query_budget import query_budget
+from jobs.models import Job
+from jobs.serializers import JobSerializer, JobSubmitSerializer
+
+IDEMPOTENCY_KEY_MAX_LENGTH = Job._meta.get_field("idempotency_key").max_length
+
+
+def job_response(request, job, status) -> Response:
+    response = Response(
+        JobSerializer(job, context={"request": request}).data, status=status
+    )
+    response["Location"] = reverse("job", kwargs={"job_id": job.id})
+    return response
+
+
+class JobsAPI(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=JobSubmitSerializer,
+        manual_parameters=[
+            openapi.Parameter(
+                "Idempotency-Key",
+                openapi.IN_HEADER,
+                type=openapi.TYPE_STRING,
+                description="Submitting the same key again returns the job it created",
+            ),
+        ],
+        responses={
+            202: JobSerializer,
+            200: "The job submitted before with the same idempotency key",
+            400: "Invalid job",
+            409: "The idempotency key was used for a different job",
+        },
+        operation_description="Submit a background job",
+    )
+    # idempotency key lookup, then savepoint, insert, release, and on losing a
+    # race for the key a rollback to the savepoint and the other job's lookup
+    @query_budget(6)
+    def post(self, request) -> Response:
+        """
+        Queue a job to import, delete or export addresses, run by
+        ``manage.py run_workers``. Poll the returned job for its progress.
+
+        params by kind
+        - import_addresses: ``{"addresses": [...]}``, validated like the bulk import
+        - delete_addresses: ``{"address_ids": [...]}``
+        - export_addresses: ``{"format": "ndjson" or "csv", "since": datetime}``,
+          the file is downloaded from the job's ``result_url``
+        """
+        user = request.user
+        idempotency_key = request.META.get("HTTP_IDEMPOTENCY_KEY") or None
+        if (
+            idempotency_key
+            and len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH
+        ):
+            message = f"Idempotency-Key can be up to {IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+            return Response({"message": message}, status=400)
+        serializer = JobSubmitSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        kind, params = (
+            serializer.validated_data["kind"],
+            serializer.validated_data["params"],
+        )
+
+        if idempotency_key is not None:
+            job = user.jobs.filter(idempotency_key=idempotency_key).first()
+            if job is not None:
+                return self.submitted_before(request, job, kind, params)
+        try:
+            with transaction.atomic():
+                job = Job.objects.create(
+                    user=user,
+                    kind=kind,
+                    params=params,
+                    idempotency_key=idempotency_key,
+                )
+        except IntegrityError:
+            # A concurrent request with the same key created it first
+            job = user.jobs.get(idempotency_key=idempotency_key)
+            return self.submitted_before(request, job, kind, params)
+        return job_response(request, job, 202)
+
+    def submitted_before(self, request, job, kind, params) -> Response:
+        if job.kind != kind or job.params != params:
+            return Response(
+                {
+                    "message": "Idempotency-Key was already used for a different job"
+                },
+                status=409,
+            )
+        return job_response(request, job, 200)
+
+    @swagger_auto_schema(responses={200: JobSerializer(many=True)})
+    # count and page
+    @query_budget(2)
+    def get(self, request) -> Response:
+        """
+        List the user's jobs, newest first.
+        """
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(
+            request.user.jobs.order_by("-created_at"), request, view=self
+        )
+        return paginator.get_paginated_response(
+            JobSerializer(page, many=True, context={"request": request}).data
+        )
+
+
+class JobView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(responses={200: JobSerializer, 404: "Job not found"})
+    @query_budget(1)
+    def get(self, request, job_id=None) -> Response:
+        """
+        Get a job's status and progress, ``progress`` out of ``total`` items.
+        """
+        job = request.user.jobs.filter(id=job_id).first()
+        if job is None:
+            return Response({"message": "job not found"}, status=404)
+        return Response(
+            JobSerializer(job, context={"request": request}).data, status=200
+        )
+
+
+class CancelJobView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(type=openapi.TYPE_OBJECT),
+        responses={
+            200: "Cancelled",
+            202: "Cancellation requested, the job stops after its current batch",
+            404: "Job not found",
+            409: "The job has already finished",
+        },
+    )
+    # cancel if queued, or flag if running, then the job's lookup
+    @query_budget(3)
+    def post(self, request, job_id=None) -> Response:
+        """
+        Cancel a job. A queued job never runs, a running job stops after the
+        batch it is on, keeping the work it has done.
+        """
+        jobs = request.user.jobs.filter(id=job_id)
+        cancelled = jobs.filter(status=Job.Status.QUEUED).update(
+            status=Job.Status.CANCELLED,
+            cancel_requested=True,
+            finished_at=timezone.now(),
+        )
+        if not cancelled:
+            jobs.filter(status=Job.Status.RUNNING).update(
+                cancel_requested=True
+            )
+        job = jobs.first()
+        if job is None:
+            return Response({"message": "job not found"}, status=404)
+        if job.status == Job.Status.RUNNING:
+            return job_response(request, job, 202)
+        if job.status != Job.Status.CANCELLED:
+            return Response(
+                {"message": "job has already finished"}, status=409
+            )
+        return job_response(request, job, 200)
+
+
+class JobResultView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        responses={200: "The result file", 404: "No result file"}
+    )
+    @query_budget(1)
+    def get(self, request, job_id=None):
+        """
+        Download the file a job produced, the export of an export job.
+        """
+        job = request.user.jobs.filter(id=job_id).first()
+        if job is None or not job.result_file:
+            return Response({"message": "job has no result file"}, status=404)
+        export_format = job.params.get("format")
+        return FileResponse(
+            job.result_file.open("rb"),
+            as_attachment=True,
+            filename=f"addresses.{export_format}",
+            content_type=EXPORT_CONTENT_TYPES.get(
+                export_format, "application/octet-stream"
+            ),
+        )
@@ -0,0 +1,199 @@
+"""
+Running jobs without a broker, the jobs table is the queue.
+
+``run_workers`` claims the oldest queued job with a conditional UPDATE that only
+one claimer can win, so any number of worker commands can share a database,
+and hands it to a process pool. Each process runs one job at a time.
+
+A running job's heartbeat is refreshed every time it reports progress. Jobs
+whose heartbeat is older than JOBS_STALE_AFTER seconds are assumed to have lost
+their worker and are queued again. Every claim sets a new claim token on the
+job and only the worker holding the current one can report progress or finish
+the job, a slow worker whose job was queued again stops at its next progress
+report instead of running alongside the new one.
+
+Imports and deletes commit their progress and result so far with each batch,
+so a job queued again picks up after the last batch committed with the counts
+it had. Exports start over.
+"""
+import logging
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from jobs.models import Job, JobCancelled, JobClaimLost
+from jobs.tasks import JOB_KINDS
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for stale jobs
+REQUEUE_INTERVAL = 60
+
+
+def claim_job():
+    """
+    Mark the oldest queued job as running and return its id and claim token, or
+    None if there is none
+    """
+    while True:
+        job_id = (
+            Job.objects.filter(status=Job.Status.QUEUED)
+            .order_by("created_at")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        now = timezone.now()
+        claim = uuid.uuid4()
+        claimed = Job.objects.filter(
+            id=job_id, status=Job.Status.QUEUED
+        ).update(
+            status=Job.Status.RUNNING,
+            claim=claim,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        if claimed:
+            return job_id, claim
+        # Another worker or a cancellation got there first
+
+
+def requeue_stale_jobs() -> int:
+    """Queue again the running jobs whose worker has stopped reporting"""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_STALE_AFTER)
+    requeued = Job.objects.filter(
+        status=Job.Status.RUNNING, heartbeat_at__lt=cutoff
+    ).update(status=Job.Status.QUEUED, claim=None)
+    if requeued:
+        logger.warning("Queued %d stale jobs again", requeued)
+    return requeued
+
+
+def finish_job(job, status, **fields):
+    Job.objects.filter(
+        pk=job.pk, status=Job.Status.RUNNING, claim=job.claim
+    ).update(status=status, finished_at=timezone.now(), **fields)
+
+
+def run_job(job_id, claim):
+    """Run a claimed job to the end, recording its result, failure or cancellation"""
+    try:
+        job = Job.objects.select_related("user").get(pk=job_id)
+        # The claim this worker made, the job may have been claimed again since
+        job.claim = claim
+        _, handler = JOB_KINDS[job.kind]
+        try:
+            result = handler(job)
+        except JobClaimLost:
+            logger.warning(
+                "Job %s was queued again while it ran, stopped", job.pk
+            )
+        except JobCancelled:
+            logger.info("Job %s cancelled", job.pk)
+            # Keeping the progress made, the batches done are committed
+            finish_job(job, Job.Status.CANCELLED, progress=job.progress)
+        except Exception as exc:
+            logger.exception("Job %s failed", job.pk)
+            finish_job(
+                job,
+                Job.Status.FAILED,
+                error=str(exc) or exc.__class__.__name__,
+            )
+        else:
+            finish_job(
+                job,
+                Job.Status.SUCCEEDED,
+                result=result,
+                result_file=job.result_file.name or "",
+                progress=job.progress,
+            )
+    finally:
+        # Pool processes live on between jobs
+        close_old_connections()
+
+
+def init_process():
+    # Running jobs finish when the workers are asked to stop, only the main
+    # process handles the signals. Spawned processes (macOS) set Django up again.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    django.setup()
+
+
+class Worker:
+    """
+    Claims queued jobs and runs them, in a pool of ``processes`` processes or in
+    this process if it is 0. ``burst`` stops once the queue is empty instead of
+    polling it every JOBS_POLL_INTERVAL seconds. SIGINT and SIGTERM stop taking
+    new jobs and wait for the running ones.
+    """
+
+    def __init__(self, processes=1, burst=False):
+        self.processes = processes
+        self.burst = burst
+        self.stopping = threading.Event()
+        self.requeue_at = 0
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def run(self):
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+        if self.processes == 0:
+            self.run_inline()
+        else:
+            self.run_pool()
+
+    def requeue_stale_jobs(self):
+        if time.monotonic() >= self.requeue_at:
+            requeue_stale_jobs()
+            self.requeue_at = time.monotonic() + REQUEUE_INTERVAL
+
+    def run_inline(self):
+        while not self.stopping.is_set():
+            self.requeue_stale_jobs()
+            claimed = claim_job()
+            if claimed is not None:
+                run_job(*claimed)
+            elif self.burst:
+                break
+            else:
+                self.stopping.wait(settings.JOBS_POLL_INTERVAL)
+
+    def run_pool(self):
+        running = set()
+        with ProcessPoolExecutor(
+            max_workers=self.processes, initializer=init_process
+        ) as pool:
+            while not self.stopping.is_set():
+                self.requeue_stale_jobs()
+                while len(running) < self.processes:
+                    claimed = claim_job()
+                    if claimed is None:
+                        break
+                    # Forked processes must not inherit this process's connections
+                    connections.close_all()
+                    running.add(pool.submit(run_job, *claimed))
+                if running:
+                    # Wake up for a finished job, or to poll while a process is idle
+                    idle = len(running) < self.processes
+                    timeout = settings.JOBS_POLL_INTERVAL if idle else None
+                    _, running = wait(
+                        running, timeout=timeout, return_when=FIRST_COMPLETED
+                    )
+                elif self.burst:
+                    break
+                else:
+                    self.stopping.wait(settings.JOBS_POLL_INTERVAL)
+            wait(running)
@@ -0,0 +1,181 @@
+import json
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from address_book.cache import address_book_cache
+from address_book.checks import check_address_cache_is_shared
+from tests.factories import AddressBookFactory, UserFactory
+
+
+class TestAddressCache(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.api_client = APIClient()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.api_client.credentials(HTTP_AUTHORIZATION="Token " + cls.token.key)
+
+    def setUp(self):
+        self.address = AddressBookFactory(
+            user=self.user,
+            country="GB",
+            address_line_one="1 Test Street",
+            city="Test City",
+            zip_code="TE1 1ST",
+        )
+
+    def list_addresses(self):
+        return self.api_client.get(reverse("addresses")).json()["results"]
+
+    def get_address(self):
+        return self.api_client.get(
+            reverse(
+                "get_and_update_address",
+                kwargs={"address_id": self.address.id},
+            )
+        ).json()
+
+    def test_repeated_reads_are_served_from_the_cache(self):
+        self.list_addresses()
+
+        # the token and the page both come from the cache, the page once the
+        # ETag's aggregate shows it is current
+        with self.assertNumQueries(1):
+            self.list_addresses()
+
+        self.get_address()
+        with self.assertNumQueries(0):
+            self.get_address()
+
+        assert address_book_cache.stats() == {
+            "hits": 2,
+            "misses": 2,
+            "hit_ratio": 0.5,
+        }
+
+    def test_other_users_do_not_share_cached_responses(self):
+        self.list_addresses()
+        other_client = APIClient()
+        other_client.credentials(
+            HTTP_AUTHORIZATION="Token "
+            + Token.objects.create(user=UserFactory()).key
+        )
+
+        response = other_client.get(reverse("addresses"))
+
+        assert response.json()["results"] == []
+
+    def test_no_stale_reads_after_create(self):
+        assert len(self.list_addresses()) == 1
+
+        self.api_client.post(
+            reverse("addresses"),
+            data=json.dumps(
+                {
+                    "country": "GB",
+                    "address_line_one": "2 Test Street",
+                    "address_line_two": None,
+                    "city": "Test City",
+                    "zip_code": "TE1 1ST",
+                }
+            ),
+            content_type="application/json",
+        )
+
+        assert len(self.list_addresses()) == 2
+
+    def test_no_stale_reads_after_update(self):
+        self.list_addresses()
+        self.get_address()
+
+        self.api_client.put(
+            reverse(
+                "get_and_update_address",
+                kwargs={"address_id": self.address.id},
+            ),
+            data=json.dumps(
+                {
+                    "country": "GB",
+                    "address_line_one": "10 Test Street",
+                    "address_line_two": None,
+                    "city": "Test City",
+                    "zip_code": "TE1 1ST",
+                }
+            ),
+            content_type="application/json",
+        )
+
+        assert self.list_addresses()[0]["address_line_one"] == "10 Test Street"
+        assert self.get_address()["address_line_one"] == "10 Test Street"
+
+    def test_no_stale_reads_after_delete(self):
+        self.list_addresses()
+        self.get_address()
+
+        self.api_client.delete(
+            reverse("addresses"),
+            data=json.dumps({"address_ids": [str(self.address.id)]}),
+            content_type="application/json",
+        )
+
+        assert self.list_addresses() == []
+        assert self.get_address() == {"message": "Address not found"}
+
+    def test_no_stale_reads_after_bulk_import(self):
+        self.list_addresses()
+
+        self.api_client.post(
+            reverse("bulk_addresses"),
+            data=json.dumps(
+                [
+                    {
+                        "country": "GB",
+                        "address_line_one": "2 Test Street",
+                        "address_line_two": None,
+                        "city": "Test City",
+                        "zip_code": "TE1 1ST",
+                    }
+                ]
+            ),
+            content_type="application/json",
+        )
+
+        assert len(self.list_addresses()) == 2
+
+    def test_no_stale_reads_after_model_save(self):
+        self.get_address()
+
+        self.address.city = "New City"
+        self.address.save()
+
+        assert self.get_address()["city"] == "New City"
+
+    def test_version_is_bumped_again_when_the_write_commits(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.address.save()
+        version = address_book_cache.get_version(self.user.pk)
+
+        for callback in callbacks:
+            callback()
+
+        assert address_book_cache.get_version(self.user.pk) > version
+
+
+class TestAddressCacheCheck(SimpleTestCase):
+    def test_warns_about_a_per_process_cache(self):
+        warnings = check_address_cache_is_shared(None)
+
+        assert [warning.id for warning in warnings] == ["address_book.W001"]
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+            }
+        }
+    )
+    def test_shared_cache(self):
+        assert check_address_cache_is_shared(None) == []
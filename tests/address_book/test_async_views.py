@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from address_book.models import AddressBook
+from address_book.views import (
+    AddressAPI,
+    AddressBulkAPI,
+    GetAndUpdateAddressView,
+)
+from tests.factories import AddressBookFactory, UserFactory
+
+
+class TestAsyncViews(TestCase):
+    """The address views served as coroutines, as they are under ASGI"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.address = AddressBookFactory(
+            user=cls.user, address_line_one="1 Async Street"
+        )
+        # AsyncClient takes extra keyword arguments as header names, not WSGI keys
+        cls.headers = {"AUTHORIZATION": "Token " + cls.token.key}
+
+    def test_views_are_async(self):
+        assert asyncio.iscoroutinefunction(AddressAPI.as_view())
+        assert asyncio.iscoroutinefunction(GetAndUpdateAddressView.as_view())
+        assert not asyncio.iscoroutinefunction(AddressBulkAPI.as_view())
+
+    async def test_list_addresses(self):
+        response = await self.async_client.get(
+            reverse("addresses"), **self.headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["count"] == 1
+        assert response.json()["results"][0]["id"] == str(self.address.id)
+
+    async def test_list_addresses_by_cursor(self):
+        response = await self.async_client.get(
+            reverse("addresses"), {"cursor": ""}, **self.headers
+        )
+
+        assert response.status_code == 200
+        assert [address["id"] for address in response.json()["results"]] == [
+            str(self.address.id)
+        ]
+
+    async def test_list_invalid_page(self):
+        response = await self.async_client.get(
+            reverse("addresses"), {"page": 5}, **self.headers
+        )
+
+        assert response.status_code == 404
+
+    async def test_get_address(self):
+        response = await self.async_client.get(
+            reverse("get_and_update_address", args=[self.address.id]),
+            **self.headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["address_line_one"] == "1 Async Street"
+        assert response["ETag"]
+
+    async def test_create_and_update_address(self):
+        address = {
+            "country": "GB",
+            "address_line_one": "2 Async Street",
+            "address_line_two": None,
+            "city": "London",
+            "zip_code": "AS1 1NC",
+        }
+        response = await self.async_client.post(
+            reverse("addresses"),
+            json.dumps(address),
+            content_type="application/json",
+            **self.headers,
+        )
+        assert response.status_code == 200
+
+        created = await AddressBook.objects.aget(
+            user=self.user, address_line_one="2 Async Street"
+        )
+        response = await self.async_client.put(
+            reverse("get_and_update_address", args=[created.id]),
+            json.dumps(
+                {
+                    **address,
+                    "address_line_one": "3 Async Street",
+                    "city": "Leeds",
+                }
+            ),
+            content_type="application/json",
+            **self.headers,
+        )
+        assert response.status_code == 200
+        assert (await AddressBook.objects.aget(id=created.id)).city == "Leeds"
+
+    async def test_unauthenticated(self):
+        response = await self.async_client.get(reverse("addresses"))
+
+        assert response.status_code == 401
@@ -0,0 +1,144 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from faker import Faker
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from address_book.models import AddressBook
+from tests.factories import AddressBookFactory, UserFactory, make_address
+
+
+class TestBulkImportAddresses(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.fake = Faker()
+        cls.user = UserFactory()
+        cls.api_client = APIClient()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.api_client.credentials(HTTP_AUTHORIZATION="Token " + cls.token.key)
+
+    def test_bulk_import_json_array(self):
+        response = self.api_client.post(
+            reverse("bulk_addresses"),
+            data=json.dumps([make_address(i) for i in range(3)]),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        assert response.json()["created"] == 3
+        assert response.json()["duplicates"] == 0
+        assert [result["status"] for result in response.json()["results"]] == [
+            "created"
+        ] * 3
+        assert AddressBook.objects.filter(user=self.user).count() == 3
+
+    def test_bulk_import_ndjson(self):
+        response = self.api_client.post(
+            reverse("bulk_addresses"),
+            data="\n".join(json.dumps(make_address(i)) for i in range(3))
+            + "\n",
+            content_type="application/x-ndjson",
+        )
+
+        assert response.status_code == 200
+        assert response.json()["created"] == 3
+        assert AddressBook.objects.filter(user=self.user).count() == 3
+
+    @override_settings(ADDRESS_BULK_BATCH_SIZE=2)
+    def test_bulk_import_skips_duplicates(self):
+        AddressBookFactory(
+            user=self.user,
+            country="GB",
+            address_line_one="0 Test Street",
+            zip_code="TE1 1ST",
+        )
+
+        response = self.api_client.post(
+            reverse("bulk_addresses"),
+            data=json.dumps(
+                [
+                    make_address(0),
+                    make_address(1),
+                    make_address(2),
+                    make_address(1),
+                ]
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        assert response.json()["created"] == 2
+        assert response.json()["duplicates"] == 2
+        assert [result["status"] for result in response.json()["results"]] == [
+            "duplicate",
+            "created",
+            "created",
+            "duplicate",
+        ]
+        assert AddressBook.objects.filter(user=self.user).count() == 3
+
+    def test_bulk_import_rejects_invalid_rows(self):
+        invalid = {**make_address(1), "country": "JA"}
+
+        response = self.api_client.post(
+            reverse("bulk_addresses"),
+            data=json.dumps([make_address(0), invalid]),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+        assert response.json()["errors"] == [
+            {},
+            {"non_field_errors": ["Country is not valid"]},
+        ]
+        assert AddressBook.objects.filter(user=self.user).count() == 0
+
+    @override_settings(ADDRESS_BULK_BATCH_SIZE=100)
+    def test_bulk_import_query_count_is_per_batch(self):
+        addresses = [make_address(i) for i in range(250)]
+
+        # auth, then a savepoint pair around 3 batches of (duplicate lookup, insert)
+        with self.assertNumQueries(1 + 2 + 3 * 2):
+            response = self.api_client.post(
+                reverse("bulk_addresses"),
+                data=json.dumps(addresses),
+                content_type="application/json",
+            )
+
+        assert response.status_code == 200
+        assert response.json()["created"] == 250
+
+    def test_bulk_import_inserts_a_batch_in_one_query(self):
+        # More rows than fit in one INSERT within SQLite's 999 parameters
+        addresses = [make_address(i) for i in range(300)]
+
+        # auth, then a savepoint pair around one duplicate lookup and one insert
+        with self.assertNumQueries(1 + 2 + 2):
+            response = self.api_client.post(
+                reverse("bulk_addresses"),
+                data=json.dumps(addresses),
+                content_type="application/json",
+            )
+
+        assert response.status_code == 200
+        assert response.json()["created"] == 300
+
+    def test_bulk_imported_addresses_read_back_and_are_searchable(self):
+        response = self.api_client.post(
+            reverse("bulk_addresses"),
+            data=json.dumps([make_address(0)]),
+            content_type="application/json",
+        )
+
+        address = AddressBook.objects.get(user=self.user)
+        assert str(address.id) == response.json()["results"][0]["id"]
+        assert address.updated_at is not None
+        assert address.match_key == "GB|TE11ST|0 test street"
+        response = self.api_client.get(
+            reverse("addresses"), data={"q": "test"}
+        )
+        assert [result["id"] for result in response.json()["results"]] == [
+            str(address.id)
+        ]
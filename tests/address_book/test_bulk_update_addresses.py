@@ -0,0 +1,173 @@
+import json
+import uuid
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from address_book.models import AddressBook
+from tests.factories import AddressBookFactory, UserFactory
+
+
+class TestBulkUpdateAddresses(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.api_client = APIClient()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.api_client.credentials(HTTP_AUTHORIZATION="Token " + cls.token.key)
+
+    def setUp(self):
+        self.addresses = [
+            AddressBookFactory(
+                id=uuid.UUID(int=i),
+                user=self.user,
+                country="GB",
+                address_line_one=f"{i} Old Street",
+                city="Oldtown",
+                zip_code="OL1 1DT",
+            )
+            for i in range(3)
+        ]
+
+    def bulk_update(self, updates):
+        return self.api_client.patch(
+            reverse("bulk_addresses"),
+            data=json.dumps(updates),
+            content_type="application/json",
+        )
+
+    def test_bulk_update(self):
+        response = self.bulk_update(
+            [
+                {"id": str(address.id), "fields": {"city": "Newtown"}}
+                for address in self.addresses
+            ]
+        )
+
+        assert response.status_code == 200
+        assert response.json()["updated"] == 3
+        assert [result["status"] for result in response.json()["results"]] == [
+            "updated"
+        ] * 3
+        assert set(AddressBook.objects.values_list("city", flat=True)) == {
+            "Newtown"
+        }
+
+    def test_bulk_update_reports_each_row(self):
+        other_address = AddressBookFactory(address_line_one="1 Other Street")
+
+        response = self.bulk_update(
+            [
+                {
+                    "id": str(uuid.UUID(int=0)),
+                    "fields": {"zip_code": "NE1 1WT"},
+                },
+                {"id": str(uuid.UUID(int=1)), "fields": {"city": "Oldtown"}},
+                {"id": str(uuid.UUID(int=99)), "fields": {"city": "Newtown"}},
+                {"id": str(other_address.id), "fields": {"city": "Newtown"}},
+                {
+                    "id": str(uuid.UUID(int=2)),
+                    "fields": {"address_line_one": "1 old street"},
+                },
+            ]
+        )
+
+        assert response.status_code == 200
+        assert response.json()["updated"] == 1
+        assert response.json()["unchanged"] == 1
+        assert response.json()["not_found"] == 2
+        assert response.json()["duplicates"] == 1
+        assert [result["status"] for result in response.json()["results"]] == [
+            "updated",
+            "unchanged",
+            "not_found",
+            "not_found",
+            "duplicate",
+        ]
+        updated = AddressBook.objects.get(id=uuid.UUID(int=0))
+        assert updated.zip_code == "NE1 1WT"
+        assert updated.match_key == "GB|NE11WT|0 old street"
+        assert (
+            AddressBook.objects.get(id=uuid.UUID(int=2)).address_line_one
+            == "2 Old Street"
+        )
+
+    def test_bulk_update_duplicates_within_the_request(self):
+        response = self.bulk_update(
+            [
+                {
+                    "id": str(uuid.UUID(int=0)),
+                    "fields": {"address_line_one": "9 New Street"},
+                },
+                {
+                    "id": str(uuid.UUID(int=1)),
+                    "fields": {"address_line_one": "9 new street"},
+                },
+            ]
+        )
+
+        assert [result["status"] for result in response.json()["results"]] == [
+            "updated",
+            "duplicate",
+        ]
+
+    def test_bulk_update_writes_only_changed_columns(self):
+        address = self.addresses[0]
+        updated_at = self.addresses[1].updated_at
+
+        self.bulk_update(
+            [{"id": str(address.id), "fields": {"city": "Newtown"}}]
+        )
+
+        address.refresh_from_db()
+        assert address.city == "Newtown"
+        assert address.updated_at > updated_at
+        assert (
+            AddressBook.objects.get(id=self.addresses[1].id).updated_at
+            == updated_at
+        )
+
+    @override_settings(ADDRESS_BULK_BATCH_SIZE=2)
+    def test_bulk_update_query_count_is_per_batch(self):
+        updates = [
+            {"id": str(address.id), "fields": {"zip_code": "NE1 1WT"}}
+            for address in self.addresses
+        ]
+
+        # auth, then a savepoint pair around 2 batches of (select, duplicate
+        # lookup, update)
+        with self.assertNumQueries(1 + 2 + 2 * 3):
+            response = self.bulk_update(updates)
+
+        assert response.json()["updated"] == 3
+
+    def test_bulk_update_rejects_invalid_rows(self):
+        response = self.bulk_update(
+            [
+                {"id": str(uuid.UUID(int=0)), "fields": {"city": "Newtown"}},
+                {"id": "nope", "fields": {"country": "JA"}},
+            ]
+        )
+
+        assert response.status_code == 400
+        errors = response.json()["errors"]
+        assert errors[0] == {}
+        assert set(errors[1]) == {"id", "fields"}
+        assert AddressBook.objects.get(id=uuid.UUID(int=0)).city == "Oldtown"
+
+    def test_bulk_update_rejects_repeated_ids(self):
+        id = str(uuid.UUID(int=0))
+
+        response = self.bulk_update(
+            [
+                {"id": id, "fields": {"city": "A"}},
+                {"id": id, "fields": {"city": "B"}},
+            ]
+        )
+
+        assert response.status_code == 400
+        assert response.json() == {
+            "message": "each address can only be updated once"
+        }
@@ -0,0 +1,155 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from address_book.cache import address_book_cache
+from tests.factories import AddressBookFactory, UserFactory
+
+
+class TestConditionalRequests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.api_client = APIClient()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.api_client.credentials(HTTP_AUTHORIZATION="Token " + cls.token.key)
+
+    def setUp(self):
+        self.address = AddressBookFactory(
+            user=self.user,
+            country="GB",
+            address_line_one="1 Test Street",
+            city="Test City",
+            zip_code="TE1 1ST",
+        )
+        self.address_url = reverse(
+            "get_and_update_address", kwargs={"address_id": self.address.id}
+        )
+
+    def update_address(self, **headers):
+        return self.api_client.put(
+            self.address_url,
+            data=json.dumps(
+                {
+                    "country": "GB",
+                    "address_line_one": "2 Test Street",
+                    "address_line_two": None,
+                    "city": "Test City",
+                    "zip_code": "TE1 1ST",
+                }
+            ),
+            content_type="application/json",
+            **headers,
+        )
+
+    def test_get_address_not_modified(self):
+        etag = self.api_client.get(self.address_url)["ETag"]
+
+        response = self.api_client.get(
+            self.address_url, HTTP_IF_NONE_MATCH=etag
+        )
+
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        assert response.content == b""
+
+    def test_get_address_not_modified_without_cache(self):
+        etag = self.api_client.get(self.address_url)["ETag"]
+        cache.clear()
+
+        response = self.api_client.get(
+            self.address_url, HTTP_IF_NONE_MATCH=etag
+        )
+
+        assert response.status_code == 304
+
+    def test_get_address_modified(self):
+        etag = self.api_client.get(self.address_url)["ETag"]
+        self.update_address()
+
+        response = self.api_client.get(
+            self.address_url, HTTP_IF_NONE_MATCH=etag
+        )
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert response.json()["address_line_one"] == "2 Test Street"
+
+    def test_list_addresses_not_modified(self):
+        etag = self.api_client.get(reverse("addresses"))["ETag"]
+
+        response = self.api_client.get(
+            reverse("addresses"), HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 304
+
+        # pages have their own ETags
+        response = self.api_client.get(
+            reverse("addresses"), {"cursor": ""}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
+
+    def test_list_addresses_modified_after_write(self):
+        etag = self.api_client.get(reverse("addresses"))["ETag"]
+        AddressBookFactory(user=self.user, address_line_one="3 Test Street")
+
+        response = self.api_client.get(
+            reverse("addresses"), HTTP_IF_NONE_MATCH=etag
+        )
+
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == 2
+
+    def test_list_addresses_modified_by_another_process(self):
+        etag = self.api_client.get(reverse("addresses"))["ETag"]
+        # A write made by another worker, whose cache invalidation this
+        # process never sees
+        with mock.patch.object(address_book_cache, "bump_version"):
+            AddressBookFactory(
+                user=self.user, address_line_one="3 Test Street"
+            )
+
+        response = self.api_client.get(
+            reverse("addresses"), HTTP_IF_NONE_MATCH=etag
+        )
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert len(response.json()["results"]) == 2
+
+    def test_update_with_matching_if_match(self):
+        etag = self.api_client.get(self.address_url)["ETag"]
+
+        response = self.update_address(HTTP_IF_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_update_with_stale_if_match(self):
+        etag = self.api_client.get(self.address_url)["ETag"]
+        self.update_address()
+
+        response = self.api_client.put(
+            self.address_url,
+            data=json.dumps(
+                {
+                    "country": "GB",
+                    "address_line_one": "4 Test Street",
+                    "address_line_two": None,
+                    "city": "Test City",
+                    "zip_code": "TE1 1ST",
+                }
+            ),
+            content_type="application/json",
+            HTTP_IF_MATCH=etag,
+        )
+
+        assert response.status_code == 412
+        assert response.json() == {"message": "address has been modified"}
+        self.address.refresh_from_db()
+        assert self.address.address_line_one == "2 Test Street"
@@ -0,0 +1,19 @@
+import pycountry
+from django.test import SimpleTestCase
+
+from address_book.countries import COUNTRY_CODES
+from address_book.management.commands.generate_country_codes import (
+    COUNTRY_CODES_PATH,
+    render_country_codes,
+)
+
+
+class TestCountryCodes(SimpleTestCase):
+    def test_country_codes_match_pycountry(self):
+        assert COUNTRY_CODES == {
+            country.alpha_2 for country in pycountry.countries
+        }
+
+    def test_country_codes_module_is_up_to_date(self):
+        # Fails when pycountry is upgraded without running generate_country_codes
+        assert COUNTRY_CODES_PATH.read_text() == render_country_codes()
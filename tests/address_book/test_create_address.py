@@ -1,13 +1,22 @@
+import importlib
 import json
+from types import SimpleNamespace
 
+from django.apps import apps
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase
 from django.urls import reverse
 from faker import Faker
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
+from address_book.models import AddressBook
 from tests.factories import AddressBookFactory, UserFactory
 
+check_for_duplicate_addresses = importlib.import_module(
+    "address_book.migrations.0002_add_unique_address_per_user"
+).check_for_duplicate_addresses
+
 
 class TestCreateAddress(TestCase):
     @classmethod
@@ -59,7 +68,9 @@ class TestCreateAddress(TestCase):
         )
 
         assert response.status_code == 400
-        assert response.json() == {"zip_code": ["This field may not be blank."]}
+        assert response.json() == {
+            "zip_code": ["This field may not be blank."]
+        }
 
     def test_create_address_fails_if_invalid_country(self):
         response = self.api_client.post(
@@ -77,7 +88,28 @@ class TestCreateAddress(TestCase):
         )
 
         assert response.status_code == 400
-        assert response.json() == {"non_field_errors": ["Country is not valid"]}
+        assert response.json() == {
+            "non_field_errors": ["Country is not valid"]
+        }
+
+    def test_create_address_stores_country_upper_case(self):
+        response = self.api_client.post(
+            reverse("addresses"),
+            data=json.dumps(
+                {
+                    "country": "gb",
+                    "address_line_one": "1 Testerson Street",
+                    "address_line_two": "Test Town",
+                    "city": "Bean City",
+                    "zip_code": "TE1 1ST",
+                }
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        assert response.json()["country"] == "GB"
+        assert AddressBook.objects.get(user=self.user).country == "GB"
 
     def test_create_address_fails_if_invalid_address_line_one(self):
         response = self.api_client.post(
@@ -96,7 +128,9 @@ class TestCreateAddress(TestCase):
 
         assert response.status_code == 400
         assert response.json() == {
-            "address_line_one": ["Ensure this field has no more than 50 characters."]
+            "address_line_one": [
+                "Ensure this field has no more than 50 characters."
+            ]
         }
 
     def test_create_address_fails_if_invalid_address_line_two(self):
@@ -116,7 +150,9 @@ class TestCreateAddress(TestCase):
 
         assert response.status_code == 400
         assert response.json() == {
-            "address_line_two": ["Ensure this field has no more than 50 characters."]
+            "address_line_two": [
+                "Ensure this field has no more than 50 characters."
+            ]
         }
 
     def test_create_address_fails_if_invalid_city(self):
@@ -135,7 +171,9 @@ class TestCreateAddress(TestCase):
         )
 
         assert response.status_code == 400
-        assert response.json() == {"city": ["Ensure this field has no more than 50 characters."]}
+        assert response.json() == {
+            "city": ["Ensure this field has no more than 50 characters."]
+        }
 
     def test_create_fails_if_existing_address(self):
         # Address line one and zip code are composed together
@@ -167,4 +205,83 @@ class TestCreateAddress(TestCase):
         )
 
         assert response.status_code == 400
-        assert response.json()["message"] == "attempting to add duplicate address"
+        assert (
+            response.json()["message"] == "attempting to add duplicate address"
+        )
+
+    def test_duplicate_address_is_rejected_by_database(self):
+        AddressBookFactory(
+            user=self.user,
+            country="GB",
+            address_line_one="1 Test Street",
+            zip_code="TE1 1ST",
+        )
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AddressBookFactory(
+                user=self.user,
+                country="GB",
+                address_line_one="1 Test Street",
+                zip_code="TE1 1ST",
+            )
+
+    def test_same_address_allowed_in_different_countries(self):
+        AddressBookFactory(
+            user=self.user,
+            country="US",
+            address_line_one="1 Test Street",
+            zip_code="TE1 1ST",
+        )
+
+        response = self.api_client.post(
+            reverse("addresses"),
+            data=json.dumps(
+                {
+                    "country": "GB",
+                    "address_line_one": "1 Test Street",
+                    "address_line_two": None,
+                    "city": "Test City",
+                    "zip_code": "TE1 1ST",
+                }
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        assert AddressBook.objects.filter(user=self.user).count() == 2
+
+    def test_unique_address_migration_keeps_addresses_in_other_countries(self):
+        for country in ("GB", "US"):
+            AddressBookFactory(
+                user=self.user,
+                country=country,
+                address_line_one="1 Test St",
+                zip_code="TE1 1ST",
+            )
+
+        check_for_duplicate_addresses(
+            apps, SimpleNamespace(connection=connection)
+        )
+
+        assert AddressBook.objects.filter(user=self.user).count() == 2
+
+    def test_same_address_allowed_for_different_users(self):
+        AddressBookFactory(
+            address_line_one="1 Test Street", zip_code="TE1 1ST"
+        )
+
+        response = self.api_client.post(
+            reverse("addresses"),
+            data=json.dumps(
+                {
+                    "country": "GB",
+                    "address_line_one": "1 Test Street",
+                    "address_line_two": None,
+                    "city": "Test City",
+                    "zip_code": "TE1 1ST",
+                }
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
@@ -0,0 +1,52 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from address_book.models import AddressBook
+from tests.factories import AddressBookFactory
+
+
+class TestCreateTestData(TestCase):
+    def test_create_test_data(self):
+        AddressBookFactory()
+
+        call_command(
+            "create_test_data", "25", "--batch-size", "10", stdout=StringIO()
+        )
+
+        user = User.objects.get()
+        assert user.check_password("password")
+        assert Token.objects.filter(user=user).exists()
+        assert AddressBook.objects.filter(user=user).count() == 25
+        assert AddressBook.objects.count() == 25
+
+    def test_create_test_data_for_many_users_without_wiping(self):
+        AddressBookFactory()
+
+        call_command(
+            "create_test_data",
+            "--users",
+            "3",
+            "--per-user",
+            "4",
+            "--no-wipe",
+            stdout=StringIO(),
+        )
+
+        assert User.objects.count() == 4
+        assert Token.objects.count() == 3
+        assert AddressBook.objects.count() == 1 + 3 * 4
+
+    def test_create_test_data_needs_a_user(self):
+        AddressBookFactory()
+
+        with self.assertRaisesMessage(
+            CommandError, "--users must be at least 1"
+        ):
+            call_command("create_test_data", "--users", "0", stdout=StringIO())
+
+        # Nothing was wiped
+        assert AddressBook.objects.count() == 1
@@ -1,7 +1,8 @@
 import json
 import uuid
+from unittest import mock
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from faker import Faker
 from rest_framework.authtoken.models import Token
@@ -45,7 +46,11 @@ class TestDeleteAddress(TestCase):
             content_type="application/json",
         )
 
-        assert response.status_code == 204
+        assert response.status_code == 200
+        assert response.json() == {
+            "deleted": 1,
+            "address_ids": ["00000000-0000-0000-0000-000000000001"],
+        }
 
     def test_delete_multiple_addresses(self):
         response = self.api_client.delete(
@@ -61,5 +66,103 @@ class TestDeleteAddress(TestCase):
             content_type="application/json",
         )
 
-        assert response.status_code == 204
+        assert response.status_code == 200
+        assert response.json()["deleted"] == 2
         assert AddressBook.objects.count() == 1
+
+    def test_delete_ignores_missing_and_other_users_addresses(self):
+        other_address = AddressBookFactory(address_line_one="1 Other Street")
+
+        response = self.api_client.delete(
+            reverse("addresses"),
+            data=json.dumps(
+                {
+                    "address_ids": [
+                        str(uuid.UUID(int=99)),
+                        str(other_address.id),
+                    ]
+                }
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"deleted": 0, "address_ids": []}
+        assert AddressBook.objects.count() == 4
+
+    def test_delete_malformed_id(self):
+        response = self.api_client.delete(
+            reverse("addresses"),
+            data=json.dumps(
+                {
+                    "address_ids": [
+                        "00000000-0000-0000-0000-000000000001",
+                        "nope",
+                    ]
+                }
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+        assert response.json() == {
+            "message": "address_ids contains an invalid id"
+        }
+        assert AddressBook.objects.count() == 3
+
+    def test_delete_missing_address_ids(self):
+        response = self.api_client.delete(
+            reverse("addresses"),
+            data=json.dumps({}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+
+    @override_settings(ADDRESS_BULK_BATCH_SIZE=2)
+    def test_delete_in_batches(self):
+        ids = [str(uuid.UUID(int=i)) for i in range(3)]
+
+        # auth, then a savepoint pair around two DELETE ... RETURNING statements
+        with self.assertNumQueries(1 + 2 + 2):
+            response = self.api_client.delete(
+                reverse("addresses"),
+                data=json.dumps({"address_ids": ids}),
+                content_type="application/json",
+            )
+
+        assert response.json()["deleted"] == 3
+        assert sorted(response.json()["address_ids"]) == ids
+        assert AddressBook.objects.count() == 0
+
+    def test_delete_without_returning_support(self):
+        with mock.patch(
+            "address_book.bulk.can_delete_returning", return_value=False
+        ), mock.patch(
+            "address_book.views.can_delete_returning", return_value=False
+        ):
+            response = self.api_client.delete(
+                reverse("addresses"),
+                data=json.dumps({"address_ids": [str(uuid.UUID(int=1))]}),
+                content_type="application/json",
+            )
+
+        assert response.json() == {
+            "deleted": 1,
+            "address_ids": ["00000000-0000-0000-0000-000000000001"],
+        }
+        assert AddressBook.objects.count() == 2
+
+    def test_delete_invalidates_the_cache(self):
+        url = reverse(
+            "get_and_update_address", kwargs={"address_id": uuid.UUID(int=1)}
+        )
+        assert self.api_client.get(url).status_code == 200
+
+        self.api_client.delete(
+            reverse("addresses"),
+            data=json.dumps({"address_ids": [str(uuid.UUID(int=1))]}),
+            content_type="application/json",
+        )
+
+        assert self.api_client.get(url).status_code == 404
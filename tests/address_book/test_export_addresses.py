@@ -0,0 +1,129 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from address_book.models import AddressBook
+from tests.factories import AddressBookFactory, UserFactory
+
+
+class TestExportAddresses(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.api_client = APIClient()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.api_client.credentials(HTTP_AUTHORIZATION="Token " + cls.token.key)
+        for number in range(5):
+            AddressBookFactory(
+                user=cls.user,
+                country="GB",
+                address_line_one=f"{number} Test Street",
+                city="Test City",
+                zip_code="TE1 1ST",
+            )
+        # Another user's addresses must never be exported
+        AddressBookFactory(address_line_one="1 Other Street")
+
+    @override_settings(ADDRESS_EXPORT_CHUNK_SIZE=2)
+    def test_export_ndjson(self):
+        response = self.api_client.get(
+            reverse("export_addresses"), data={"format": "ndjson"}
+        )
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        assert len(rows) == 5
+        assert rows[0].keys() == {
+            "id",
+            "country",
+            "address_line_one",
+            "address_line_two",
+            "city",
+            "zip_code",
+        }
+        assert {row["address_line_one"] for row in rows} == {
+            f"{number} Test Street" for number in range(5)
+        }
+
+    def test_export_csv(self):
+        response = self.api_client.get(
+            reverse("export_addresses"), data={"format": "csv"}
+        )
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/csv"
+        rows = list(
+            csv.reader(
+                io.StringIO(b"".join(response.streaming_content).decode())
+            )
+        )
+        assert rows[0] == [
+            "id",
+            "country",
+            "address_line_one",
+            "address_line_two",
+            "city",
+            "zip_code",
+        ]
+        assert len(rows) == 6
+
+    def test_export_gzip(self):
+        response = self.api_client.get(
+            reverse("export_addresses"), HTTP_ACCEPT_ENCODING="gzip, deflate"
+        )
+
+        assert response["Content-Encoding"] == "gzip"
+        body = gzip.decompress(b"".join(response.streaming_content))
+        assert len(body.splitlines()) == 5
+
+    def test_export_since(self):
+        AddressBook.objects.filter(user=self.user).update(
+            updated_at=timezone.now() - timedelta(days=2)
+        )
+        AddressBook.objects.filter(
+            user=self.user, address_line_one="0 Test Street"
+        ).update(updated_at=timezone.now())
+        cut_off = timezone.now() - timedelta(days=1)
+
+        response = self.api_client.get(
+            reverse("export_addresses"), data={"since": cut_off.isoformat()}
+        )
+        rows = b"".join(response.streaming_content).splitlines()
+        assert len(rows) == 1
+
+        response = self.api_client.get(
+            reverse("export_addresses"),
+            HTTP_IF_MODIFIED_SINCE=http_date(cut_off.timestamp()),
+        )
+        rows = b"".join(response.streaming_content).splitlines()
+        assert len(rows) == 1
+
+    def test_export_invalid_format(self):
+        response = self.api_client.get(
+            reverse("export_addresses"), data={"format": "xml"}
+        )
+
+        assert response.status_code == 400
+        assert response.json() == {
+            "message": "format must be one of ndjson, csv"
+        }
+
+    def test_export_invalid_since(self):
+        response = self.api_client.get(
+            reverse("export_addresses"), data={"since": "yesterday"}
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,115 @@
+import json
+import uuid
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from tests.factories import AddressBookFactory, UserFactory
+
+
+class TestLookupAddresses(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.api_client = APIClient()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.api_client.credentials(HTTP_AUTHORIZATION="Token " + cls.token.key)
+        cls.addresses = [
+            AddressBookFactory(
+                id=uuid.UUID(int=i),
+                user=cls.user,
+                address_line_one=f"{i} Lookup Street",
+            )
+            for i in range(3)
+        ]
+
+    def lookup(self, ids):
+        return self.api_client.post(
+            reverse("lookup_addresses"),
+            data=json.dumps({"ids": ids}),
+            content_type="application/json",
+        )
+
+    def test_lookup_returns_addresses_keyed_by_id(self):
+        ids = [str(uuid.UUID(int=2)), str(uuid.UUID(int=0))]
+
+        # auth, then one query for the addresses
+        with self.assertNumQueries(2):
+            response = self.lookup(ids)
+
+        assert response.status_code == 200
+        addresses = response.json()["addresses"]
+        assert list(addresses) == ids
+        assert addresses[ids[0]] == {
+            "id": ids[0],
+            "country": self.addresses[2].country,
+            "address_line_one": "2 Lookup Street",
+            "address_line_two": self.addresses[2].address_line_two,
+            "city": self.addresses[2].city,
+            "zip_code": self.addresses[2].zip_code,
+        }
+        assert response.json()["missing"] == []
+
+    def test_lookup_lists_missing_and_other_users_addresses(self):
+        other_address = AddressBookFactory(address_line_one="1 Other Street")
+        ids = [
+            str(uuid.UUID(int=1)),
+            str(uuid.UUID(int=99)),
+            str(other_address.id),
+        ]
+
+        response = self.lookup(ids)
+
+        assert response.status_code == 200
+        assert list(response.json()["addresses"]) == [ids[0]]
+        assert response.json()["missing"] == ids[1:]
+
+    def test_lookup_by_query_parameter(self):
+        ids = [str(uuid.UUID(int=0)), str(uuid.UUID(int=99))]
+
+        response = self.api_client.get(
+            reverse("lookup_addresses"), {"ids": ",".join(ids)}
+        )
+
+        assert response.status_code == 200
+        assert list(response.json()["addresses"]) == ids[:1]
+        assert response.json()["missing"] == ids[1:]
+
+    def test_lookup_repeated_ids(self):
+        id = str(uuid.UUID(int=1))
+
+        response = self.lookup([id, id.upper()])
+
+        assert list(response.json()["addresses"]) == [id]
+
+    @override_settings(ADDRESS_BULK_BATCH_SIZE=2)
+    def test_lookup_in_batches(self):
+        ids = [str(uuid.UUID(int=i)) for i in range(4)]
+
+        # auth, then an id__in query per batch
+        with self.assertNumQueries(1 + 2):
+            response = self.lookup(ids)
+
+        assert list(response.json()["addresses"]) == ids[:3]
+        assert response.json()["missing"] == ids[3:]
+
+    @override_settings(ADDRESS_LOOKUP_MAX_IDS=2)
+    def test_lookup_too_many_ids(self):
+        response = self.lookup([str(uuid.UUID(int=i)) for i in range(3)])
+
+        assert response.status_code == 400
+        assert response.json() == {"message": "ids can hold up to 2 ids"}
+
+    def test_lookup_invalid_ids(self):
+        assert self.lookup([str(uuid.UUID(int=0)), "nope"]).json() == {
+            "message": "ids contains an invalid id"
+        }
+        response = self.api_client.post(
+            reverse("lookup_addresses"),
+            data=json.dumps({}),
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+        assert response.json() == {"message": "ids must be a list of ids"}
@@ -0,0 +1,219 @@
+import importlib
+import json
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from address_book.matching import (
+    address_match_key,
+    normalize_text,
+    normalize_zip_code,
+)
+from address_book.models import AddressBook
+from tests.factories import AddressBookFactory, UserFactory
+
+backfill_match_keys = importlib.import_module(
+    "address_book.migrations.0006_add_match_key"
+).backfill_match_keys
+
+
+class TestNormalization(SimpleTestCase):
+    def test_normalize_text(self):
+        assert normalize_text("10 Downing St.") == "10 downing st"
+        assert normalize_text("  10,  DOWNING\tst ") == "10 downing st"
+        assert (
+            normalize_text("Flat 2/3 O'Brien_Road") == "flat 2 3 o brien road"
+        )
+        assert normalize_text("Straße") == normalize_text("STRASSE")
+        assert normalize_text(None) == ""
+
+    def test_normalize_zip_code(self):
+        assert normalize_zip_code("GB", "sw1a2aa") == normalize_zip_code(
+            "GB", "SW1A 2AA"
+        )
+        assert normalize_zip_code("DE", "D-10115") == "10115"
+        assert normalize_zip_code("FR", "F 75007") == "75007"
+        assert normalize_zip_code("US", "20500-0003") == "20500"
+        assert normalize_zip_code("US", "20500") == "20500"
+        # Only numeric postcodes lose their prefix
+        assert normalize_zip_code("SE", "SE1 7PB") == "SE17PB"
+
+    def test_address_match_key(self):
+        assert address_match_key(
+            "GB", "10 Downing St.", "SW1A 2AA"
+        ) == address_match_key("gb", "10 downing st", "sw1a2aa")
+        assert address_match_key(
+            "GB", "10 Downing St", "SW1A 2AA"
+        ) != address_match_key("GB", "11 Downing St", "SW1A 2AA")
+        assert address_match_key(
+            "DE", "Hauptstraße 1", "10115"
+        ) != address_match_key("AT", "Hauptstraße 1", "10115")
+
+
+class TestMatchKey(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.api_client = APIClient()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.api_client.credentials(HTTP_AUTHORIZATION="Token " + cls.token.key)
+
+    def create_address(self, address_line_one, zip_code):
+        return self.api_client.post(
+            reverse("addresses"),
+            data=json.dumps(
+                {
+                    "country": "GB",
+                    "address_line_one": address_line_one,
+                    "address_line_two": None,
+                    "city": "London",
+                    "zip_code": zip_code,
+                }
+            ),
+            content_type="application/json",
+        )
+
+    def test_match_key_is_set_on_save(self):
+        address = AddressBookFactory(
+            user=self.user,
+            country="GB",
+            address_line_one="10 Downing St.",
+            zip_code="SW1A 2AA",
+        )
+        assert address.match_key == "GB|SW1A2AA|10 downing st"
+
+        address.address_line_one = "11 Downing St."
+        address.save(update_fields=["address_line_one"])
+        address.refresh_from_db()
+        assert address.match_key == "GB|SW1A2AA|11 downing st"
+
+    def test_create_rejects_near_duplicate(self):
+        assert (
+            self.create_address("10 Downing St.", "SW1A 2AA").status_code
+            == 200
+        )
+
+        response = self.create_address("10 downing st", "sw1a2aa")
+
+        assert response.status_code == 400
+        assert response.json() == {
+            "message": "attempting to add duplicate address"
+        }
+        assert AddressBook.objects.filter(user=self.user).count() == 1
+
+    def test_bulk_import_skips_near_duplicates(self):
+        address = {
+            "country": "GB",
+            "address_line_two": None,
+            "city": "London",
+        }
+        response = self.api_client.post(
+            reverse("bulk_addresses"),
+            data=json.dumps(
+                [
+                    {
+                        **address,
+                        "address_line_one": "10 Downing St.",
+                        "zip_code": "SW1A 2AA",
+                    },
+                    {
+                        **address,
+                        "address_line_one": "10 DOWNING ST",
+                        "zip_code": "SW1A2AA",
+                    },
+                ]
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        assert [result["status"] for result in response.json()["results"]] == [
+            "created",
+            "duplicate",
+        ]
+        assert (
+            AddressBook.objects.get(user=self.user).match_key
+            == "GB|SW1A2AA|10 downing st"
+        )
+
+    def test_backfill(self):
+        other_user = UserFactory()
+        first = AddressBookFactory(
+            user=self.user,
+            country="GB",
+            address_line_one="10 Downing St.",
+            zip_code="SW1A 2AA",
+        )
+        # Saved before match keys existed, bulk_create skips save()
+        [near_duplicate] = AddressBook.objects.bulk_create(
+            [
+                AddressBook(
+                    user=self.user,
+                    country="GB",
+                    address_line_one="10 downing st",
+                    city="London",
+                    zip_code="sw1a2aa",
+                )
+            ]
+        )
+        other = AddressBookFactory(
+            user=other_user,
+            country="GB",
+            address_line_one="10 Downing St.",
+            zip_code="SW1A 2AA",
+        )
+        AddressBook.objects.update(match_key=None)
+
+        # The backfill only uses the schema editor's connection, and SQLite's schema
+        # editor cannot be opened inside the test's transaction
+        backfill_match_keys(apps, SimpleNamespace(connection=connection))
+
+        keys = dict(AddressBook.objects.values_list("id", "match_key"))
+        # The first of the pair in id order keeps the key, the other is left for a dedupe
+        kept, skipped = sorted(
+            [first, near_duplicate], key=lambda address: address.id
+        )
+        assert keys[kept.id] == "GB|SW1A2AA|10 downing st"
+        assert keys[skipped.id] is None
+        assert keys[other.id] == "GB|SW1A2AA|10 downing st"
+
+    def test_backfill_keys_addresses_in_different_countries_apart(self):
+        first = AddressBookFactory(
+            user=self.user,
+            country="DE",
+            address_line_one="Hauptstraße 1",
+            zip_code="10115",
+        )
+        second = AddressBookFactory(
+            user=self.user,
+            country="AT",
+            address_line_one="Hauptstrasse 1",
+            zip_code="10115",
+        )
+        AddressBook.objects.update(match_key=None)
+
+        backfill_match_keys(apps, SimpleNamespace(connection=connection))
+
+        keys = dict(AddressBook.objects.values_list("id", "match_key"))
+        assert keys == {
+            first.id: "DE|10115|hauptstrasse 1",
+            second.id: "AT|10115|hauptstrasse 1",
+        }
+
+    def test_backfill_keeps_current_keys(self):
+        address = AddressBookFactory(
+            user=self.user,
+            country="GB",
+            address_line_one="10 Downing St.",
+            zip_code="SW1A 2AA",
+        )
+
+        backfill_match_keys(apps, SimpleNamespace(connection=connection))
+
+        address.refresh_from_db()
+        assert address.match_key == "GB|SW1A2AA|10 downing st"
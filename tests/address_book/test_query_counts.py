@@ -0,0 +1,126 @@
+import json
+import uuid
+
+import pytest
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from tests.factories import AddressBookFactory, UserFactory
+
+# Token authentication loads the token and its user in a single joined query,
+# the views must not look the user up again.
+AUTH_QUERIES = 1
+
+
+@pytest.fixture
+def user():
+    return UserFactory()
+
+
+@pytest.fixture
+def api_client(user):
+    api_client = APIClient()
+    token = Token.objects.create(user=user)
+    api_client.credentials(HTTP_AUTHORIZATION="Token " + token.key)
+    return api_client
+
+
+def address_payload():
+    return {
+        "country": "GB",
+        "address_line_one": "1 Test Street",
+        "address_line_two": None,
+        "city": "Test City",
+        "zip_code": "TE1 1ST",
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("address_count", [1, 25])
+def test_list_addresses_query_count(
+    django_assert_num_queries, api_client, user, address_count
+):
+    AddressBookFactory.create_batch(address_count, user=user)
+
+    # the ETag's aggregate, count and page
+    with django_assert_num_queries(AUTH_QUERIES + 3):
+        response = api_client.get(reverse("addresses"))
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_create_address_query_count(django_assert_num_queries, api_client):
+    # savepoint, insert, release
+    with django_assert_num_queries(AUTH_QUERIES + 3):
+        response = api_client.post(
+            reverse("addresses"),
+            data=json.dumps(address_payload()),
+            content_type="application/json",
+        )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_delete_addresses_query_count(
+    django_assert_num_queries, api_client, user
+):
+    addresses = AddressBookFactory.create_batch(3, user=user)
+
+    # savepoint, DELETE ... RETURNING, release
+    with django_assert_num_queries(AUTH_QUERIES + 3):
+        response = api_client.delete(
+            reverse("addresses"),
+            data=json.dumps(
+                {"address_ids": [str(address.id) for address in addresses]}
+            ),
+            content_type="application/json",
+        )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_get_address_query_count(django_assert_num_queries, api_client, user):
+    address = AddressBookFactory(user=user)
+
+    with django_assert_num_queries(AUTH_QUERIES + 1):
+        response = api_client.get(
+            reverse(
+                "get_and_update_address", kwargs={"address_id": address.id}
+            )
+        )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_update_address_query_count(
+    django_assert_num_queries, api_client, user
+):
+    address = AddressBookFactory(user=user)
+
+    # duplicate check, select, then savepoint, conditional update, release
+    with django_assert_num_queries(AUTH_QUERIES + 5):
+        response = api_client.put(
+            reverse(
+                "get_and_update_address", kwargs={"address_id": address.id}
+            ),
+            data=json.dumps(address_payload()),
+            content_type="application/json",
+        )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_unauthenticated_request_is_rejected(api_client):
+    api_client.credentials()
+
+    response = api_client.get(
+        reverse("get_and_update_address", kwargs={"address_id": uuid.uuid4()})
+    )
+
+    assert response.status_code == 401
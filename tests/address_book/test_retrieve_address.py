@@ -1,12 +1,16 @@
+import json
 import uuid
+import warnings
 
 import pytest
+from django.core.paginator import UnorderedObjectListWarning
 from django.test import TestCase
 from django.urls import reverse
 from faker import Faker
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
+from address_book.serializer import AddressBookSerializer
 from tests.factories import AddressBookFactory, UserFactory
 
 
@@ -75,7 +79,10 @@ class TestRetrieveAddress(TestCase):
     def test_get_addresses_is_paginated(self):
         response = self.api_client.get(reverse("addresses"))
         assert response.json().get("count") == 11
-        assert response.json().get("next") == "http://testserver/addresses/?page=2"
+        assert (
+            response.json().get("next")
+            == "http://testserver/addresses/?page=2"
+        )
         assert response.json().get("previous") is None
         assert len(response.json().get("results")) == 10
 
@@ -83,5 +90,73 @@ class TestRetrieveAddress(TestCase):
         response = self.api_client.get(reverse("addresses"), data={"page": 2})
         assert response.json().get("count") == 11
         assert response.json().get("next") is None
-        assert response.json().get("previous") == "http://testserver/addresses/"
+        assert (
+            response.json().get("previous") == "http://testserver/addresses/"
+        )
         assert len(response.json().get("results")) == 1
+
+    @pytest.mark.django_db
+    def test_get_addresses_pages_in_id_order(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", UnorderedObjectListWarning)
+            pages = [
+                self.api_client.get(
+                    reverse("addresses"), data={"page": page}
+                ).json()["results"]
+                for page in (1, 2)
+            ]
+
+        ids = [address["id"] for address in pages[0] + pages[1]]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == 11
+
+    @pytest.mark.django_db
+    def test_get_addresses_by_cursor(self):
+        response = self.api_client.get(
+            reverse("addresses"), data={"cursor": ""}
+        )
+        first_page = response.json()
+        assert "count" not in first_page
+        assert first_page.get("previous") is None
+        assert len(first_page.get("results")) == 10
+
+        response = self.api_client.get(first_page.get("next"))
+        second_page = response.json()
+        assert second_page.get("next") is None
+        assert len(second_page.get("results")) == 1
+
+        ids = [
+            address["id"]
+            for address in first_page["results"] + second_page["results"]
+        ]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == 11
+
+    @pytest.mark.django_db
+    def test_get_addresses_by_cursor_does_not_count(self):
+        # auth, the ETag's aggregate and a single LIMIT query for the page
+        with self.assertNumQueries(3):
+            response = self.api_client.get(
+                reverse("addresses"), data={"cursor": ""}
+            )
+
+        assert response.status_code == 200
+
+    @pytest.mark.django_db
+    def test_get_addresses_matches_address_serializer(self):
+        AddressBookFactory(
+            user=self.user,
+            address_line_one="1 Test Street",
+            address_line_two="Flat 1",
+        )
+
+        response = self.api_client.get(
+            reverse("addresses"), data={"cursor": "", "page_size": 100}
+        )
+        results = response.json()["results"]
+
+        expected = AddressBookSerializer(
+            self.user.addresses.order_by("id"), many=True
+        ).data
+        assert len(results) == 12
+        assert results == json.loads(json.dumps(expected))
@@ -0,0 +1,127 @@
+import importlib
+from io import StringIO
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from address_book.models import AddressBook
+from address_book.search import SQLITE_FTS_TABLE
+from tests.factories import AddressBookFactory, UserFactory
+
+uppercase_countries = importlib.import_module(
+    "address_book.migrations.0007_uppercase_country"
+).uppercase_countries
+
+
+class TestSearchAddresses(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.api_client = APIClient()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.api_client.credentials(HTTP_AUTHORIZATION="Token " + cls.token.key)
+
+    def setUp(self):
+        for country, address_line_one, city, zip_code in [
+            ("GB", "10 Downing Street", "London", "SW1A 2AA"),
+            ("GB", "221B Baker Street", "London", "NW1 6XE"),
+            ("GB", "1 Deansgate", "Manchester", "M3 1AZ"),
+            ("FR", "5 Avenue Anatole France", "Paris", "75007"),
+        ]:
+            AddressBookFactory(
+                user=self.user,
+                country=country,
+                address_line_one=address_line_one,
+                city=city,
+                zip_code=zip_code,
+            )
+        # Another user's address that matches every search
+        AddressBookFactory(
+            country="GB",
+            address_line_one="11 Downing Street",
+            city="London",
+            zip_code="SW1A 2AB",
+        )
+
+    def search(self, **params):
+        response = self.api_client.get(reverse("addresses"), data=params)
+        assert response.status_code == 200
+        return sorted(
+            address["address_line_one"]
+            for address in response.json()["results"]
+        )
+
+    def test_filter_by_city_prefix(self):
+        assert self.search(city="Lon") == [
+            "10 Downing Street",
+            "221B Baker Street",
+        ]
+        assert self.search(city="Manchester") == ["1 Deansgate"]
+
+    def test_filter_by_zip_code_prefix(self):
+        assert self.search(zip_code="SW1") == ["10 Downing Street"]
+
+    def test_filter_by_country(self):
+        assert self.search(country="fr") == ["5 Avenue Anatole France"]
+
+    def test_filter_by_country_after_upper_casing_stored_countries(self):
+        AddressBookFactory(
+            user=self.user, country="fr", address_line_one="8 Rue de Rivoli"
+        )
+
+        uppercase_countries(apps, SimpleNamespace(connection=connection))
+
+        assert self.search(country="FR") == [
+            "5 Avenue Anatole France",
+            "8 Rue de Rivoli",
+        ]
+
+    def test_free_text_search(self):
+        assert self.search(q="downing") == ["10 Downing Street"]
+        assert self.search(q="street lond") == [
+            "10 Downing Street",
+            "221B Baker Street",
+        ]
+        assert self.search(q="paris 75007") == ["5 Avenue Anatole France"]
+        assert self.search(q="nowhere") == []
+
+    def test_free_text_search_ignores_query_syntax(self):
+        assert self.search(q='"downing" * -street:') == ["10 Downing Street"]
+        assert self.search(q="!!") == sorted(
+            AddressBook.objects.filter(user=self.user).values_list(
+                "address_line_one", flat=True
+            )
+        )
+
+    def test_search_index_follows_updates_and_deletes(self):
+        address = AddressBook.objects.get(
+            user=self.user, address_line_one="1 Deansgate"
+        )
+        address.city = "Salford"
+        address.save()
+        assert self.search(q="salford") == ["1 Deansgate"]
+        assert self.search(q="manchester") == []
+
+        address.delete()
+        assert self.search(q="salford") == []
+
+    def test_rebuild_search_index(self):
+        # As if a VACUUM had renumbered the rows under the index
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('delete-all')"
+            )
+        assert self.search(q="downing") == []
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        assert self.search(q="downing") == ["10 Downing Street"]
+
+    def test_filters_combine(self):
+        assert self.search(city="London", q="baker") == ["221B Baker Street"]
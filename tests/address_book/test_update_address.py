@@ -1,12 +1,19 @@
 import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from faker import Faker
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
+from address_book.etags import address_etag
+from address_book.models import AddressBook
 from tests.factories import AddressBookFactory, UserFactory
 
 
@@ -30,7 +37,9 @@ class TestUpdateAddress(TestCase):
         )
 
         response = self.api_client.put(
-            reverse("get_and_update_address", kwargs={"address_id": address.id}),
+            reverse(
+                "get_and_update_address", kwargs={"address_id": address.id}
+            ),
             data=json.dumps(
                 {
                     "country": "US",
@@ -68,7 +77,9 @@ class TestUpdateAddress(TestCase):
         )
 
         response = self.api_client.put(
-            reverse("get_and_update_address", kwargs={"address_id": address.id}),
+            reverse(
+                "get_and_update_address", kwargs={"address_id": address.id}
+            ),
             data=json.dumps(
                 {
                     "country": "GB",
@@ -82,12 +93,17 @@ class TestUpdateAddress(TestCase):
         )
 
         assert response.status_code == 400
-        assert response.json()["message"] == "attempting to add duplicate address"
+        assert (
+            response.json()["message"] == "attempting to add duplicate address"
+        )
 
     def test_update_non_existant_address(self):
 
         response = self.api_client.put(
-            reverse("get_and_update_address", kwargs={"address_id": uuid.UUID(int=1)}),
+            reverse(
+                "get_and_update_address",
+                kwargs={"address_id": uuid.UUID(int=1)},
+            ),
             data=json.dumps(
                 {
                     "country": "GB",
@@ -102,3 +118,220 @@ class TestUpdateAddress(TestCase):
 
         assert response.status_code == 404
         assert response.json()["message"] == "address not found"
+
+
+class TestPartialUpdateAddress(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.api_client = APIClient()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.api_client.credentials(HTTP_AUTHORIZATION="Token " + cls.token.key)
+
+    def setUp(self):
+        self.address = AddressBookFactory(
+            user=self.user,
+            country="GB",
+            address_line_one="1 Patch Street",
+            address_line_two=None,
+            city="Patchville",
+            zip_code="PA1 1CH",
+        )
+
+    def patch(self, data, address_id=None, **extra):
+        return self.api_client.patch(
+            reverse(
+                "get_and_update_address",
+                kwargs={"address_id": address_id or self.address.id},
+            ),
+            data=json.dumps(data),
+            content_type="application/json",
+            **extra,
+        )
+
+    def test_patch_writes_only_changed_columns(self):
+        # auth, select, then savepoint, conditional update and release
+        with self.assertNumQueries(5), CaptureQueriesContext(
+            connection
+        ) as queries:
+            response = self.patch({"city": "Newtown", "zip_code": "PA1 1CH"})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "id": str(self.address.id),
+            "country": "GB",
+            "address_line_one": "1 Patch Street",
+            "address_line_two": None,
+            "city": "Newtown",
+            "zip_code": "PA1 1CH",
+        }
+        update = next(
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith("UPDATE")
+        )
+        assert '"city"' in update and '"updated_at"' in update
+        for column in ("country", "address_line_one", "zip_code", "match_key"):
+            assert f'"{column}"' not in update
+        self.address.refresh_from_db()
+        assert self.address.city == "Newtown"
+        assert response["ETag"] == address_etag(self.address)
+
+    def test_patch_without_changes_does_not_write(self):
+        updated_at = self.address.updated_at
+
+        # auth and select, nothing is written
+        with self.assertNumQueries(2):
+            response = self.patch({"city": "Patchville"})
+
+        assert response.status_code == 200
+        self.address.refresh_from_db()
+        assert self.address.updated_at == updated_at
+
+    def test_patch_key_fields_updates_match_key(self):
+        response = self.patch({"address_line_one": "2 Patch Street"})
+
+        assert response.status_code == 200
+        self.address.refresh_from_db()
+        assert self.address.match_key == "GB|PA11CH|2 patch street"
+
+    def test_patch_can_recase_own_address(self):
+        response = self.patch({"address_line_one": "1 PATCH STREET"})
+
+        assert response.status_code == 200
+        assert response.json()["address_line_one"] == "1 PATCH STREET"
+
+    def test_patch_to_duplicate_address(self):
+        AddressBookFactory(
+            user=self.user,
+            country="GB",
+            address_line_one="2 Patch Street",
+            zip_code="PA1 1CH",
+        )
+
+        response = self.patch({"address_line_one": "2 patch street"})
+
+        assert response.status_code == 400
+        assert (
+            response.json()["message"] == "attempting to add duplicate address"
+        )
+        self.address.refresh_from_db()
+        assert self.address.address_line_one == "1 Patch Street"
+
+    def test_patch_validates_given_fields(self):
+        response = self.patch({"country": "XX"})
+
+        assert response.status_code == 400
+        assert response.json() == {
+            "non_field_errors": ["Country is not valid"]
+        }
+
+    def test_patch_if_match(self):
+        assert (
+            self.patch(
+                {"city": "Newtown"}, HTTP_IF_MATCH='"stale"'
+            ).status_code
+            == 412
+        )
+
+        response = self.patch(
+            {"city": "Newtown"}, HTTP_IF_MATCH=address_etag(self.address)
+        )
+
+        assert response.status_code == 200
+
+    def test_patch_non_existant_address(self):
+        response = self.patch({"city": "Newtown"}, address_id=uuid.UUID(int=1))
+
+        assert response.status_code == 404
+        assert response.json()["message"] == "address not found"
+
+
+class TestConcurrentUpdates(TransactionTestCase):
+    THREADS = 8
+
+    def setUp(self):
+        # A retry reads and writes again, going over the views' query budgets
+        settings = override_settings(QUERY_BUDGET_ENABLED=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.user = UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.address = AddressBookFactory(
+            user=self.user,
+            country="GB",
+            address_line_one="1 Race Street",
+            zip_code="RA1 1CE",
+        )
+
+    def put(self, address_line_one, **extra):
+        api_client = APIClient()
+        api_client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        try:
+            return api_client.put(
+                reverse(
+                    "get_and_update_address",
+                    kwargs={"address_id": self.address.id},
+                ),
+                data=json.dumps(
+                    {
+                        "country": "GB",
+                        "address_line_one": address_line_one,
+                        "address_line_two": None,
+                        "city": "Racetown",
+                        "zip_code": "RA1 1CE",
+                    }
+                ),
+                content_type="application/json",
+                **extra,
+            )
+        finally:
+            connection.close()
+
+    def test_concurrent_puts(self):
+        lines = [
+            f"{number} Race Street"
+            for number in range(2, self.THREADS * 4 + 2)
+        ]
+
+        with ThreadPoolExecutor(self.THREADS) as executor:
+            responses = list(executor.map(self.put, lines))
+
+        assert {response.status_code for response in responses} == {200}
+        self.address.refresh_from_db()
+        assert self.address.address_line_one in lines
+
+    def test_concurrent_puts_with_if_match(self):
+        etag = address_etag(self.address)
+        lines = [
+            f"{number} Race Street"
+            for number in range(2, self.THREADS * 4 + 2)
+        ]
+
+        with ThreadPoolExecutor(self.THREADS) as executor:
+            responses = list(
+                executor.map(
+                    lambda line: self.put(line, HTTP_IF_MATCH=etag), lines
+                )
+            )
+
+        # Exactly one update was made against the ETag, the others lost the race
+        statuses = sorted(response.status_code for response in responses)
+        assert statuses == [200] + [412] * (len(lines) - 1)
+
+    def test_write_that_loses_the_race_to_if_match_fails(self):
+        etag = address_etag(self.address)
+        save_fields = AddressBook.save_fields
+
+        def changed_meanwhile(address, update_fields, **kwargs):
+            AddressBook.objects.filter(id=address.id).update(
+                city="Elsewhere", updated_at=timezone.now()
+            )
+            return save_fields(address, update_fields, **kwargs)
+
+        with mock.patch.object(AddressBook, "save_fields", changed_meanwhile):
+            response = self.put("2 Race Street", HTTP_IF_MATCH=etag)
+
+        assert response.status_code == 412
+        self.address.refresh_from_db()
+        assert self.address.city == "Elsewhere"
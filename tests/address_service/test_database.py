@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.urls import reverse
+
+from address_service.query_budget import (
+    assert_query_budget,
+    record_budget_query,
+)
+
+
+class TestSQLitePragmas(TestCase):
+    def pragma(self, db, name):
+        with db.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_to_connection(self):
+        assert self.pragma(connection, "busy_timeout") == 5000
+        # 1 is NORMAL
+        assert self.pragma(connection, "synchronous") == 1
+        assert self.pragma(connection, "temp_store") == 2
+
+    def test_file_database_uses_wal(self):
+        with tempfile.TemporaryDirectory() as directory:
+            db = connection.copy()
+            db.settings_dict["NAME"] = os.path.join(directory, "wal.sqlite3")
+            try:
+                assert self.pragma(db, "journal_mode") == "wal"
+            finally:
+                db.close()
+
+    def test_pragmas_are_not_counted_as_queries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            db = connection.copy()
+            db.settings_dict["NAME"] = os.path.join(
+                directory, "queries.sqlite3"
+            )
+            db.execute_wrappers.append(record_budget_query)
+            try:
+                # Connecting again keeps the execute wrappers
+                for _ in range(2):
+                    with assert_query_budget(1), db.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                    db.close()
+            finally:
+                db.close()
+
+
+class TestConnMaxAge(TestCase):
+    def conn_max_age(self, module):
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "address_service.settings",
+        }
+        env.pop("DATABASE_CONN_MAX_AGE", None)
+        code = (
+            f"import {module}\n"
+            "from django.db import connection\n"
+            "print(connection.settings_dict['CONN_MAX_AGE'])"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return int(result.stdout)
+
+    def test_wsgi_keeps_connections_open(self):
+        assert self.conn_max_age("address_service.wsgi") == 60
+
+    def test_asgi_connects_per_request(self):
+        assert self.conn_max_age("address_service.asgi") == 0
+
+
+class TestHealth(TestCase):
+    def test_health(self):
+        response = self.client.get(reverse("health"))
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok", "database": "ok"}
+
+    def test_health_database_unavailable(self):
+        with mock.patch.object(
+            connection, "cursor", side_effect=DatabaseError
+        ):
+            response = self.client.get(reverse("health"))
+
+        assert response.status_code == 503
+        assert response.json()["database"] == "unavailable"
@@ -0,0 +1,125 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from address_service.metrics import registry
+from tests.factories import AddressBookFactory
+
+
+@override_settings(
+    PERFORMANCE_METRICS_ENABLED=True,
+    PERFORMANCE_METRICS_TOKEN="scraper-token",
+    PERFORMANCE_SLOW_REQUEST_MS=10000,
+)
+class TestPerformanceMetrics(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="tester", email="tester@example.com", password="password"
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.address = AddressBookFactory(user=cls.user)
+
+    def setUp(self):
+        registry.reset()
+        self.api_client = APIClient()
+        self.api_client.credentials(
+            HTTP_AUTHORIZATION="Token " + self.token.key
+        )
+
+    def get_address(self):
+        return self.api_client.get(
+            reverse("get_and_update_address", args=[self.address.id])
+        )
+
+    def test_server_timing_header(self):
+        response = self.get_address()
+
+        assert response.status_code == 200
+        timing = response["Server-Timing"]
+        # Queries made by the async view in another thread are counted
+        assert 'desc="2 queries"' in timing
+        assert "render;dur=" in timing
+        assert "total;dur=" in timing
+
+    def test_metrics_endpoint(self):
+        self.get_address()
+        self.api_client.post(
+            reverse("login_user"),
+            data=json.dumps(
+                {"email": "tester@example.com", "password": "password"}
+            ),
+            content_type="application/json",
+        )
+
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer scraper-token"
+        )
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        metrics = response.content.decode()
+        labels = 'view="get_and_update_address",method="GET",status="200"'
+        assert f"http_requests_total{{{labels}}} 1" in metrics
+        assert f"http_request_db_queries_total{{{labels}}} 2" in metrics
+        assert (
+            f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1'
+            in metrics
+        )
+        assert (
+            'http_requests_total{view="login_user",method="POST",status="201"} 1'
+            in metrics
+        )
+        response_bytes = f"http_response_bytes_total{{{labels}}} "
+        assert int(metrics.split(response_bytes)[1].split()[0]) > 0
+        assert f"http_response_render_seconds_total{{{labels}}} " in metrics
+
+    def test_metrics_endpoint_is_for_staff_or_the_scraper_token(self):
+        assert self.client.get(reverse("metrics")).status_code == 403
+        wrong_token = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer nope"
+        )
+        assert wrong_token.status_code == 403
+        # An API token is not a metrics token
+        api_token = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Token " + self.token.key
+        )
+        assert api_token.status_code == 403
+
+        self.client.force_login(self.user)
+        assert self.client.get(reverse("metrics")).status_code == 403
+
+        staff = User.objects.create_user(
+            username="staff", password="password", is_staff=True
+        )
+        self.client.force_login(staff)
+        assert self.client.get(reverse("metrics")).status_code == 200
+
+    @override_settings(PERFORMANCE_METRICS_TOKEN="")
+    def test_metrics_endpoint_without_a_token_is_staff_only(self):
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer "
+        )
+
+        assert response.status_code == 403
+
+    @override_settings(PERFORMANCE_SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged_with_sql(self):
+        with self.assertLogs("address_service.metrics", "WARNING") as logs:
+            self.get_address()
+
+        assert "Slow request GET" in logs.output[0]
+        assert "get_and_update_address" in logs.output[0]
+        assert 'FROM "address_book_addressbook"' in logs.output[0]
+
+
+class TestPerformanceMetricsDisabled(TestCase):
+    def test_disabled(self):
+        response = self.client.get(reverse("health"))
+
+        assert "Server-Timing" not in response
+        assert self.client.get(reverse("metrics")).status_code == 404
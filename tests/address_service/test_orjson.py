@@ -0,0 +1,118 @@
+import datetime
+import decimal
+import io
+import uuid
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from address_book.parsers import NDJSONParser
+from address_service.parsers import ORJSONParser
+from address_service.renderers import ORJSONRenderer
+
+RENDERED = [
+    None,
+    {"message": "Address not found"},
+    ReturnList(
+        [ReturnDict({"id": "a", "city": None}, serializer=None)],
+        serializer=None,
+    ),
+    '\x00\x1f\x7f"\\/\b\f\n\r\t é\U0001f600 \u2028 \u2029',
+    uuid.UUID(int=1),
+    datetime.datetime(
+        2022, 8, 1, 12, 30, 15, 123, tzinfo=datetime.timezone.utc
+    ),
+    datetime.datetime(
+        2022,
+        8,
+        1,
+        12,
+        30,
+        tzinfo=datetime.timezone(datetime.timedelta(hours=2)),
+    ),
+    datetime.datetime(2022, 8, 1),
+    datetime.date(2022, 8, 1),
+    datetime.time(12, 30, 1, 5),
+    datetime.timedelta(minutes=1),
+    decimal.Decimal("1.50"),
+    gettext_lazy("Not found"),
+    (1, True, None, 0.5, -3),
+    2**64,
+    {1: "non string key"},
+]
+
+
+@pytest.mark.parametrize("data", RENDERED)
+def test_renderer_matches_json_renderer(data):
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_renderer_indents_like_json_renderer():
+    data = {"addresses": [{"id": "a"}]}
+    accepted = "application/json; indent=4"
+
+    assert ORJSONRenderer().render(data, accepted) == JSONRenderer().render(
+        data, accepted
+    )
+
+
+def test_renderer_raises_like_json_renderer():
+    aware_time = datetime.time(12, tzinfo=datetime.timezone.utc)
+
+    with pytest.raises(ValueError):
+        ORJSONRenderer().render({"time": aware_time})
+
+
+PARSED = [
+    b'{"country": "GB", "address_line_two": null, "ids": [1, 2.5, true]}',
+    '["é\U0001f600 \u2028"]'.encode(),
+    b'{"big": 18446744073709551616}',
+    b'["\\ud800"]',
+    b"[1e400]",
+    b'{"key": 1, "key": 2}',
+]
+
+
+@pytest.mark.parametrize("body", PARSED)
+def test_parser_matches_json_parser(body):
+    assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+        io.BytesIO(body)
+    )
+
+
+@pytest.mark.parametrize("body", [b'{"country": ', b"[NaN]", b"\xff"])
+def test_parser_errors_match_json_parser(body):
+    with pytest.raises(ParseError) as expected:
+        JSONParser().parse(io.BytesIO(body))
+
+    with pytest.raises(ParseError) as error:
+        ORJSONParser().parse(io.BytesIO(body))
+
+    assert error.value.detail == expected.value.detail
+
+
+def test_parser_decodes_other_encodings():
+    body = '{"city": "Zürich"}'.encode("utf-16")
+
+    assert ORJSONParser().parse(
+        io.BytesIO(body), parser_context={"encoding": "utf-16"}
+    ) == {"city": "Zürich"}
+
+
+def test_ndjson_parser():
+    body = b'{"city": "A"}\n\n{"city": NaN}\n'
+
+    assert NDJSONParser().parse(io.BytesIO(body))[0] == {"city": "A"}
+
+    with pytest.raises(ParseError, match="line 2"):
+        NDJSONParser().parse(io.BytesIO(b'{"city": "A"}\n{"city": \n'))
+
+
+def test_api_uses_orjson():
+    assert api_settings.DEFAULT_RENDERER_CLASSES[0] is ORJSONRenderer
+    assert api_settings.DEFAULT_PARSER_CLASSES[0] is ORJSONParser
@@ -0,0 +1,217 @@
+import json
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.urls import URLResolver, reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from address_book import urls as address_book_urls
+from address_service.query_budget import (
+    QueryBudgetExceeded,
+    QueryBudgetWarning,
+    assert_query_budget,
+    query_budget,
+)
+from authentication import urls as authentication_urls
+from jobs import urls as jobs_urls
+from tests.factories import AddressBookFactory
+
+# Token authentication runs before the handler, outside its budget
+AUTH_QUERIES = 1
+
+
+class CountingView:
+    @query_budget(1)
+    def get(self, request):
+        User.objects.count()
+        User.objects.count()
+
+
+def endpoints():
+    for module in (address_book_urls, authentication_urls, jobs_urls):
+        for pattern in module.urlpatterns:
+            assert not isinstance(pattern, URLResolver)
+            view_class = pattern.callback.cls
+            methods = pattern.callback.view_initkwargs.get(
+                "http_method_names", view_class.http_method_names
+            )
+            for method in methods:
+                if method not in ("options", "head") and hasattr(
+                    view_class, method
+                ):
+                    yield pattern.name, method, getattr(view_class, method)
+
+
+@pytest.mark.django_db
+def test_assert_query_budget():
+    with assert_query_budget(1) as log:
+        User.objects.count()
+    assert len(log) == 1
+
+    with pytest.raises(
+        QueryBudgetExceeded, match="2 queries, the budget is 1"
+    ):
+        with assert_query_budget(1, allow_duplicates=True):
+            User.objects.count()
+            User.objects.filter(pk=1).count()
+
+
+@pytest.mark.django_db
+def test_assert_query_budget_duplicates():
+    with pytest.raises(QueryBudgetExceeded, match="ran 2 times"):
+        with assert_query_budget(5):
+            User.objects.filter(pk=1).count()
+            User.objects.filter(pk=1).count()
+
+    # Same statement with other parameters is not a duplicate
+    with assert_query_budget(5):
+        User.objects.filter(pk=1).count()
+        User.objects.filter(pk=2).count()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_repeated_transactions_are_not_duplicates():
+    with assert_query_budget(4):
+        with transaction.atomic():
+            User.objects.filter(pk=1).count()
+        with transaction.atomic():
+            User.objects.filter(pk=2).count()
+
+
+@pytest.mark.django_db
+def test_nested_budgets_see_all_queries():
+    with assert_query_budget(2) as outer:
+        User.objects.filter(pk=1).count()
+        with assert_query_budget(1) as inner:
+            User.objects.filter(pk=2).count()
+    assert len(outer) == 2
+    assert len(inner) == 1
+
+
+@pytest.mark.django_db
+def test_decorator_raises_in_tests():
+    with pytest.raises(
+        QueryBudgetExceeded, match="CountingView.get is over its query budget"
+    ):
+        CountingView().get(object())
+
+
+@pytest.mark.django_db
+def test_decorator_warns_in_development(settings):
+    settings.QUERY_BUDGET_RAISE = False
+
+    with pytest.warns(QueryBudgetWarning, match="2 queries, the budget is 1"):
+        CountingView().get(object())
+
+
+@pytest.mark.django_db
+def test_decorator_disabled(settings, recwarn):
+    settings.QUERY_BUDGET_ENABLED = False
+
+    CountingView().get(object())
+
+    assert not recwarn.list
+
+
+@pytest.mark.parametrize("name, method, handler", list(endpoints()))
+def test_every_endpoint_declares_a_budget(name, method, handler):
+    assert hasattr(
+        handler, "query_budget"
+    ), f"{method.upper()} {name} has no query budget"
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        username="tester", email="tester@example.com", password="password"
+    )
+
+
+@pytest.fixture
+def api_client(user):
+    api_client = APIClient()
+    api_client.credentials(
+        HTTP_AUTHORIZATION="Token " + Token.objects.create(user=user).key
+    )
+    return api_client
+
+
+def address_payload(number=1):
+    return {
+        "country": "GB",
+        "address_line_one": f"{number} Budget Street",
+        "address_line_two": None,
+        "city": "Budget City",
+        "zip_code": "BU1 1GT",
+    }
+
+
+@pytest.mark.django_db
+def test_address_endpoints_within_budget(query_budget, api_client, user):
+    # Matched by the city filter below, so the listing fetches a page
+    address = AddressBookFactory(user=user, city="Birmingham")
+    detail = reverse("get_and_update_address", args=[address.id])
+    as_json = {"content_type": "application/json"}
+
+    # the ETag's aggregate, the count and the page
+    with query_budget(AUTH_QUERIES + 3):
+        assert (
+            api_client.get(reverse("addresses"), {"city": "B"}).status_code
+            == 200
+        )
+    with query_budget(AUTH_QUERIES + 1):
+        assert api_client.get(detail).status_code == 200
+    with query_budget(AUTH_QUERIES + 4):
+        response = api_client.post(
+            reverse("addresses"), json.dumps(address_payload(2)), **as_json
+        )
+        assert response.status_code == 200
+    with query_budget(AUTH_QUERIES + 5):
+        assert (
+            api_client.put(
+                detail, json.dumps(address_payload(3)), **as_json
+            ).status_code
+            == 200
+        )
+    with query_budget(AUTH_QUERIES + 4):
+        response = api_client.post(
+            reverse("bulk_addresses"),
+            json.dumps([address_payload(4), address_payload(5)]),
+            **as_json,
+        )
+        assert response.status_code == 200
+    # The export queries while it streams, one per chunk
+    with query_budget(AUTH_QUERIES + 1):
+        response = api_client.get(reverse("export_addresses"))
+        b"".join(response.streaming_content)
+    with query_budget(AUTH_QUERIES + 3):
+        response = api_client.delete(
+            reverse("addresses"),
+            json.dumps({"address_ids": [str(address.id)]}),
+            **as_json,
+        )
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_authentication_endpoints_within_budget(query_budget, user):
+    api_client = APIClient()
+    credentials = json.dumps(
+        {"email": "tester@example.com", "password": "password"}
+    )
+
+    # The handler's 10 queries, then the session middleware saves the session
+    # login() created, in a savepoint
+    with query_budget(10 + 3):
+        response = api_client.post(
+            reverse("login_user"), credentials, content_type="application/json"
+        )
+        assert response.status_code == 201
+
+    api_client.credentials(
+        HTTP_AUTHORIZATION="Token " + response.json()["token"]
+    )
+    with query_budget(AUTH_QUERIES + 4):
+        assert api_client.post(reverse("logout_user")).status_code == 200
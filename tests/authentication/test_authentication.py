@@ -1,13 +1,270 @@
-# If I had more time on this tech test I would have added some test coverage for authentication views
-# Testing the following
-
-# - that a user can login with a valid token
-# - that a token expires after a day and that a new one is assigned when the old one expires
-# - that a user can logout and that the token is deleted
-# - that a user can't login with an invalid token
-# - that a user can't login with an expired token
-# - that a user can't login with a token that doesn't exist
-# - that a user can't login with a token that doesn't belong to them
-# - that a user can't login with a token that has been deleted
-
-# this test file would also live within tests/ under authentication/ (following the pattern for the addressbook API)
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from authentication.backends import token_cache
+from tests.factories import AddressBookFactory
+
+
+class TestAuthentication(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="tester", email="tester@example.com", password="password"
+        )
+
+    def setUp(self):
+        self.api_client = APIClient()
+
+    def authenticate(self, token):
+        self.api_client.credentials(HTTP_AUTHORIZATION="Token " + token.key)
+
+    def test_login_returns_token(self):
+        response = self.api_client.post(
+            reverse("login_user"),
+            data=json.dumps(
+                {"email": "tester@example.com", "password": "password"}
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201
+        assert (
+            response.json()["token"] == Token.objects.get(user=self.user).key
+        )
+
+    def test_login_with_invalid_credentials(self):
+        response = self.api_client.post(
+            reverse("login_user"),
+            data=json.dumps(
+                {"email": "tester@example.com", "password": "wrong"}
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 401
+
+    def test_login_rotates_expired_token(self):
+        token = Token.objects.create(user=self.user)
+        Token.objects.filter(pk=token.pk).update(
+            created=timezone.now() - timedelta(days=2)
+        )
+
+        response = self.api_client.post(
+            reverse("login_user"),
+            data=json.dumps(
+                {"email": "tester@example.com", "password": "password"}
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201
+        assert response.json()["token"] != token.key
+        assert not Token.objects.filter(key=token.key).exists()
+
+    def test_invalid_token_is_rejected(self):
+        self.api_client.credentials(
+            HTTP_AUTHORIZATION="Token not-a-real-token"
+        )
+
+        response = self.api_client.get(reverse("addresses"))
+
+        assert response.status_code == 401
+
+    def test_expired_token_is_rejected(self):
+        token = Token.objects.create(user=self.user)
+        Token.objects.filter(pk=token.pk).update(
+            created=timezone.now() - timedelta(days=2)
+        )
+        self.authenticate(token)
+
+        response = self.api_client.get(reverse("addresses"))
+
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token has expired"
+
+    def test_cached_token_does_not_query_the_database(self):
+        AddressBookFactory(user=self.user)
+        token = Token.objects.create(user=self.user)
+        self.authenticate(token)
+        self.api_client.get(reverse("addresses"))
+
+        # the ETag's aggregate, count and page only, the token comes from the
+        # cache (a different URL so the page is not served from the cache)
+        with self.assertNumQueries(3):
+            response = self.api_client.get(
+                reverse("addresses"), data={"page": 1}
+            )
+
+        assert response.status_code == 200
+        assert token_cache.stats()["hits"] == 1
+        assert token_cache.stats()["misses"] == 1
+
+    def test_logout_evicts_cached_token(self):
+        token = Token.objects.create(user=self.user)
+        self.authenticate(token)
+        self.api_client.get(reverse("addresses"))
+
+        response = self.api_client.post(reverse("logout_user"))
+        assert response.status_code == 200
+        assert not Token.objects.filter(key=token.key).exists()
+
+        response = self.api_client.get(reverse("addresses"))
+        assert response.status_code == 401
+
+    def test_cache_hits_get_their_own_user(self):
+        token = Token.objects.create(user=self.user)
+        token_cache.set(token.key, self.user, token, ttl=60)
+
+        first, _ = token_cache.get(token.key)
+        second, second_token = token_cache.get(token.key)
+
+        assert first == second == self.user
+        assert first is not second
+        assert second_token.user is second
+        assert second_token.created == token.created
+
+    def test_deactivating_the_user_evicts_cached_token(self):
+        token = Token.objects.create(user=self.user)
+        self.authenticate(token)
+        self.api_client.get(reverse("addresses"))
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.api_client.get(reverse("addresses"))
+        assert response.status_code == 401
+
+    def test_cached_inactive_user_is_rejected(self):
+        token = Token.objects.create(user=self.user)
+        token_cache.set(
+            token.key, User(id=self.user.id, is_active=False), token, ttl=60
+        )
+        self.authenticate(token)
+
+        response = self.api_client.get(reverse("addresses"))
+
+        assert response.status_code == 401
+        assert token_cache.get(token.key) is None
+
+    @override_settings(TOKEN_CACHE_USE_DJANGO_CACHE=True)
+    def test_token_cache_can_use_django_cache(self):
+        token = Token.objects.create(user=self.user)
+        self.authenticate(token)
+        self.api_client.get(reverse("addresses"))
+
+        cache_key = token_cache.key_prefix + token.key
+        assert cache.get(cache_key) is not None
+
+        token.delete()
+        assert cache.get(cache_key) is None
+
+
+@mock.patch.dict(
+    SimpleRateThrottle.THROTTLE_RATES,
+    {"login_ip": "3/min", "login_email": "2/min"},
+)
+class TestLoginThrottling(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="tester", email="tester@example.com", password="password"
+        )
+
+    def setUp(self):
+        self.api_client = APIClient()
+
+    def login(
+        self, email="tester@example.com", password="wrong", ip="10.0.0.1"
+    ):
+        return self.api_client.post(
+            reverse("login_user"),
+            data=json.dumps({"email": email, "password": password}),
+            content_type="application/json",
+            REMOTE_ADDR=ip,
+        )
+
+    def test_login_is_throttled_per_email(self):
+        assert self.login(ip="10.0.0.1").status_code == 401
+        assert (
+            self.login(email="Tester@Example.com ", ip="10.0.0.2").status_code
+            == 401
+        )
+
+        response = self.login(password="password", ip="10.0.0.3")
+
+        assert response.status_code == 429
+        assert "Retry-After" in response
+
+    def test_login_is_throttled_per_ip(self):
+        for number in range(3):
+            assert (
+                self.login(email=f"user{number}@example.com").status_code
+                == 401
+            )
+
+        assert self.login().status_code == 429
+        assert self.login(ip="10.0.0.2").status_code == 401
+
+    def test_forwarded_for_does_not_reset_the_ip_limit(self):
+        for number in range(4):
+            response = self.api_client.post(
+                reverse("login_user"),
+                data=json.dumps(
+                    {"email": f"user{number}@example.com", "password": "wrong"}
+                ),
+                content_type="application/json",
+                REMOTE_ADDR="10.0.0.1",
+                HTTP_X_FORWARDED_FOR=f"192.0.2.{number}",
+            )
+
+        assert response.status_code == 429
+
+    def test_throttled_login_does_not_hash_the_password(self):
+        self.login()
+        self.login()
+
+        with mock.patch.object(User, "check_password") as check_password:
+            response = self.login(password="password")
+
+        assert response.status_code == 429
+        check_password.assert_not_called()
+
+
+class TestPasswordHashing(TestCase):
+    def test_login_upgrades_the_password_hash(self):
+        # Hashed with the test suite's MD5 hasher
+        user = User.objects.create_user(
+            username="tester", email="tester@example.com", password="password"
+        )
+        hashers = [
+            "authentication.hashers.Argon2PasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ]
+
+        with override_settings(
+            PASSWORD_HASHERS=hashers, PASSWORD_ARGON2_TIME_COST=1
+        ):
+            response = APIClient().post(
+                reverse("login_user"),
+                data=json.dumps(
+                    {"email": "tester@example.com", "password": "password"}
+                ),
+                content_type="application/json",
+            )
+
+            assert response.status_code == 201
+            user.refresh_from_db()
+            assert user.password.startswith(
+                "argon2$argon2id$v=19$m=19456,t=1,p=1$"
+            )
+            assert user.check_password("password")
@@ -0,0 +1,37 @@
+import pytest
+from django.core.cache import cache
+
+from address_book.cache import address_book_cache
+from address_service.query_budget import assert_query_budget
+from authentication.backends import token_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Tokens and responses are cached per process, and user ids are reused
+    # between tests, so start every test cold
+    token_cache.clear()
+    cache.clear()
+    address_book_cache.reset_stats()
+    yield
+    token_cache.clear()
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    # Views going over their declared query budget fail the test
+    settings.QUERY_BUDGET_ENABLED = True
+    settings.QUERY_BUDGET_RAISE = True
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Context manager failing the test if the block makes more queries than
+    allowed, or runs a query twice
+
+        with query_budget(2):
+            api_client.get(reverse("addresses"))
+    """
+    return assert_query_budget
@@ -22,3 +22,14 @@ class AddressBookFactory(factory.django.DjangoModelFactory):
     address_line_one = factory.Faker("address")
     city = factory.Faker("city")
     zip_code = factory.Faker("postcode")
+
+
+def make_address(number):
+    """Request data for a distinct valid address"""
+    return {
+        "country": "GB",
+        "address_line_one": f"{number} Test Street",
+        "address_line_two": None,
+        "city": "Test City",
+        "zip_code": "TE1 1ST",
+    }
@@ -0,0 +1,268 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from jobs.models import Job
+from tests.factories import UserFactory, make_address
+
+
+class TestSubmitJob(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.api_client = APIClient()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.api_client.credentials(HTTP_AUTHORIZATION="Token " + cls.token.key)
+
+    def submit(self, kind, params, **headers):
+        return self.api_client.post(
+            reverse("jobs"),
+            data={"kind": kind, "params": params},
+            format="json",
+            **headers
+        )
+
+    def test_submit_job(self):
+        response = self.submit(
+            "import_addresses", {"addresses": [make_address(1)]}
+        )
+
+        assert response.status_code == 202
+        job = Job.objects.get(id=response.data["id"])
+        assert response["Location"] == reverse(
+            "job", kwargs={"job_id": job.id}
+        )
+        assert response.data["status"] == "queued"
+        assert job.user == self.user
+        assert (
+            job.params["addresses"][0]["address_line_one"] == "1 Test Street"
+        )
+
+    def test_submit_job_validates_params(self):
+        response = self.submit(
+            "import_addresses", {"addresses": [{"country": "GB"}]}
+        )
+
+        assert response.status_code == 400
+        assert "params" in response.data
+        assert not Job.objects.exists()
+
+    def test_submit_job_rejects_unknown_kind(self):
+        response = self.submit("rename_addresses", {})
+
+        assert response.status_code == 400
+        assert "kind" in response.data
+
+    def test_submit_export_job_stores_defaults(self):
+        response = self.submit("export_addresses", {})
+
+        assert response.status_code == 202
+        assert Job.objects.get().params == {"format": "ndjson"}
+
+    def test_idempotency_key_returns_the_same_job(self):
+        params = {"address_ids": ["9d9e3f1c-6a4c-4f0e-8e5e-4f1d0c0a6b1a"]}
+        first = self.submit(
+            "delete_addresses", params, HTTP_IDEMPOTENCY_KEY="delete-1"
+        )
+        second = self.submit(
+            "delete_addresses", params, HTTP_IDEMPOTENCY_KEY="delete-1"
+        )
+
+        assert first.status_code == 202
+        assert second.status_code == 200
+        assert second.data["id"] == first.data["id"]
+        assert Job.objects.count() == 1
+
+    def test_idempotency_key_reused_for_a_different_job(self):
+        self.submit(
+            "export_addresses",
+            {"format": "csv"},
+            HTTP_IDEMPOTENCY_KEY="export",
+        )
+        response = self.submit(
+            "export_addresses",
+            {"format": "ndjson"},
+            HTTP_IDEMPOTENCY_KEY="export",
+        )
+
+        assert response.status_code == 409
+        assert Job.objects.count() == 1
+
+    def test_idempotency_keys_are_per_user(self):
+        Job.objects.create(
+            user=UserFactory(),
+            kind="export_addresses",
+            params={},
+            idempotency_key="export",
+        )
+
+        response = self.submit(
+            "export_addresses", {}, HTTP_IDEMPOTENCY_KEY="export"
+        )
+
+        assert response.status_code == 202
+        assert Job.objects.count() == 2
+
+    def test_list_jobs(self):
+        Job.objects.create(
+            user=UserFactory(), kind="export_addresses", params={}
+        )
+        for _ in range(2):
+            self.submit("export_addresses", {})
+
+        response = self.api_client.get(reverse("jobs"))
+
+        assert response.status_code == 200
+        assert response.data["count"] == 2
+
+    def test_submit_job_requires_authentication(self):
+        response = APIClient().post(
+            reverse("jobs"), data={"kind": "export_addresses"}
+        )
+
+        assert response.status_code == 401
+
+
+class TestJob(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.api_client = APIClient()
+        cls.token = Token.objects.create(user=cls.user)
+        cls.api_client.credentials(HTTP_AUTHORIZATION="Token " + cls.token.key)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        cls.addClassCleanup(settings.disable)
+
+    def make_job(self, **fields):
+        fields.setdefault("params", {})
+        return Job.objects.create(
+            user=self.user, kind="export_addresses", **fields
+        )
+
+    def test_get_job_progress(self):
+        job = self.make_job(
+            status=Job.Status.RUNNING, progress=250, total=1000
+        )
+
+        response = self.api_client.get(
+            reverse("job", kwargs={"job_id": job.id})
+        )
+
+        assert response.status_code == 200
+        assert response.data["status"] == "running"
+        assert (response.data["progress"], response.data["total"]) == (
+            250,
+            1000,
+        )
+        assert response.data["result_url"] is None
+
+    def test_get_another_users_job(self):
+        job = Job.objects.create(
+            user=UserFactory(), kind="export_addresses", params={}
+        )
+
+        response = self.api_client.get(
+            reverse("job", kwargs={"job_id": job.id})
+        )
+
+        assert response.status_code == 404
+
+    def test_cancel_queued_job(self):
+        job = self.make_job()
+
+        response = self.api_client.post(
+            reverse("cancel_job", kwargs={"job_id": job.id})
+        )
+
+        assert response.status_code == 200
+        job.refresh_from_db()
+        assert job.status == Job.Status.CANCELLED
+        assert job.finished_at is not None
+
+    def test_cancel_running_job(self):
+        job = self.make_job(status=Job.Status.RUNNING)
+
+        response = self.api_client.post(
+            reverse("cancel_job", kwargs={"job_id": job.id})
+        )
+
+        # The worker stops it at its next progress report
+        assert response.status_code == 202
+        job.refresh_from_db()
+        assert job.status == Job.Status.RUNNING
+        assert job.cancel_requested
+
+    def test_cancel_finished_job(self):
+        job = self.make_job(status=Job.Status.SUCCEEDED)
+
+        response = self.api_client.post(
+            reverse("cancel_job", kwargs={"job_id": job.id})
+        )
+
+        assert response.status_code == 409
+        job.refresh_from_db()
+        assert not job.cancel_requested
+
+    def test_cancel_another_users_job(self):
+        job = Job.objects.create(
+            user=UserFactory(), kind="export_addresses", params={}
+        )
+
+        response = self.api_client.post(
+            reverse("cancel_job", kwargs={"job_id": job.id})
+        )
+
+        assert response.status_code == 404
+        job.refresh_from_db()
+        assert job.status == Job.Status.QUEUED
+
+    def test_download_result(self):
+        job = self.make_job(
+            status=Job.Status.SUCCEEDED, params={"format": "csv"}
+        )
+        job.result_file.save("addresses.csv", ContentFile(b"id\r\n"))
+
+        job_response = self.api_client.get(
+            reverse("job", kwargs={"job_id": job.id})
+        )
+        response = self.api_client.get(job_response.data["result_url"])
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/csv"
+        assert 'filename="addresses.csv"' in response["Content-Disposition"]
+        assert b"".join(response.streaming_content) == b"id\r\n"
+
+    def test_download_without_result(self):
+        job = self.make_job()
+
+        response = self.api_client.get(
+            reverse("job_result", kwargs={"job_id": job.id})
+        )
+
+        assert response.status_code == 404
+
+    def test_deleting_a_job_deletes_its_result(self):
+        job = self.make_job(
+            status=Job.Status.SUCCEEDED, params={"format": "csv"}
+        )
+        job.result_file.save("addresses.csv", ContentFile(b"id\r\n"))
+        storage, name = job.result_file.storage, job.result_file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.delete()
+            # Kept until the delete commits
+            assert storage.exists(name)
+
+        assert not storage.exists(name)
@@ -0,0 +1,250 @@
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from address_book.models import AddressBook
+from jobs import tasks
+from jobs.models import Job
+from jobs.worker import claim_job, finish_job, requeue_stale_jobs, run_job
+from tests.factories import AddressBookFactory, UserFactory, make_address
+
+
+@override_settings(ADDRESS_BULK_BATCH_SIZE=2, ADDRESS_EXPORT_CHUNK_SIZE=2)
+class TestWorker(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        cls.addClassCleanup(settings.disable)
+        # run_job closes the connection between jobs, which would close the test's
+        # transaction with it
+        patcher = mock.patch("jobs.worker.close_old_connections")
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+
+    def make_job(self, kind, params, **fields):
+        return Job.objects.create(
+            user=self.user, kind=kind, params=params, **fields
+        )
+
+    def run_workers(self):
+        call_command("run_workers", processes=0, burst=True)
+
+    def test_import_job(self):
+        AddressBookFactory(user=self.user, **make_address(2))
+        job = self.make_job(
+            "import_addresses",
+            {"addresses": [make_address(number) for number in range(5)]},
+        )
+
+        self.run_workers()
+
+        job.refresh_from_db()
+        assert job.status == Job.Status.SUCCEEDED
+        assert (job.progress, job.total) == (5, 5)
+        assert job.result == {
+            "created": 4,
+            "duplicates": 1,
+            "duplicate_indexes": [2],
+        }
+        assert job.started_at is not None and job.finished_at is not None
+        assert AddressBook.objects.filter(user=self.user).count() == 5
+
+    def test_delete_job(self):
+        addresses = AddressBookFactory.create_batch(3, user=self.user)
+        other = AddressBookFactory()
+        address_ids = [str(address.id) for address in [*addresses, other]]
+        job = self.make_job("delete_addresses", {"address_ids": address_ids})
+
+        self.run_workers()
+
+        job.refresh_from_db()
+        assert job.status == Job.Status.SUCCEEDED
+        assert job.result == {"deleted": 3}
+        assert not AddressBook.objects.filter(user=self.user).exists()
+        assert AddressBook.objects.filter(id=other.id).exists()
+
+    def test_export_job(self):
+        AddressBookFactory.create_batch(3, user=self.user)
+        AddressBookFactory()
+        job = self.make_job("export_addresses", {"format": "ndjson"})
+
+        self.run_workers()
+
+        job.refresh_from_db()
+        assert job.status == Job.Status.SUCCEEDED
+        assert job.result == {"exported": 3}
+        assert (job.progress, job.total) == (3, 3)
+        with job.result_file.open("rb") as file:
+            rows = [json.loads(line) for line in file.read().splitlines()]
+        assert {row["id"] for row in rows} == {
+            str(id) for id in self.user.addresses.values_list("id", flat=True)
+        }
+
+    def test_jobs_run_oldest_first(self):
+        first = self.make_job("export_addresses", {"format": "csv"})
+        second = self.make_job("export_addresses", {"format": "csv"})
+        Job.objects.filter(id=second.id).update(
+            created_at=first.created_at - timedelta(seconds=1)
+        )
+
+        assert claim_job()[0] == second.id
+        assert claim_job()[0] == first.id
+        assert claim_job() is None
+
+    def test_claim_skips_cancelled_jobs(self):
+        self.make_job(
+            "export_addresses", {"format": "csv"}, status=Job.Status.CANCELLED
+        )
+
+        assert claim_job() is None
+
+    def test_cancel_running_job(self):
+        job = self.make_job(
+            "import_addresses",
+            {"addresses": [make_address(number) for number in range(5)]},
+        )
+        import_addresses = tasks.import_addresses
+
+        def cancel_after_first_batch(*args, **kwargs):
+            results = import_addresses(*args, **kwargs)
+            Job.objects.filter(id=job.id).update(cancel_requested=True)
+            return results
+
+        with mock.patch.object(
+            tasks, "import_addresses", cancel_after_first_batch
+        ):
+            run_job(*claim_job())
+
+        job.refresh_from_db()
+        assert job.status == Job.Status.CANCELLED
+        # The first batch was committed before the job stopped
+        assert (job.progress, job.total) == (2, 5)
+        assert AddressBook.objects.filter(user=self.user).count() == 2
+
+    def test_failed_job(self):
+        job = self.make_job("export_addresses", {"format": "csv"})
+
+        with mock.patch.object(
+            tasks, "encode_export", side_effect=OSError("disk full")
+        ):
+            self.run_workers()
+
+        job.refresh_from_db()
+        assert job.status == Job.Status.FAILED
+        assert job.error == "disk full"
+        assert not job.result_file
+
+    @override_settings(JOBS_STALE_AFTER=60)
+    def test_requeue_stale_jobs(self):
+        stale = self.make_job(
+            "export_addresses",
+            {"format": "csv"},
+            status=Job.Status.RUNNING,
+            progress=10,
+            heartbeat_at=timezone.now() - timedelta(seconds=61),
+        )
+        alive = self.make_job(
+            "export_addresses",
+            {"format": "csv"},
+            status=Job.Status.RUNNING,
+            heartbeat_at=timezone.now(),
+        )
+
+        assert requeue_stale_jobs() == 1
+
+        stale.refresh_from_db()
+        alive.refresh_from_db()
+        # The progress committed stays, the job resumes from it
+        assert (stale.status, stale.progress) == (Job.Status.QUEUED, 10)
+        assert stale.claim is None
+        assert alive.status == Job.Status.RUNNING
+
+    def test_requeued_job_stops_in_its_old_worker(self):
+        job = self.make_job(
+            "import_addresses",
+            {"addresses": [make_address(number) for number in range(5)]},
+        )
+        old_claim = claim_job()
+        # The old worker stopped reporting for long enough to be given up on
+        Job.objects.filter(id=job.id).update(
+            heartbeat_at=timezone.now() - timedelta(days=1)
+        )
+        requeue_stale_jobs()
+        new_claim = claim_job()
+
+        run_job(*old_claim)
+
+        job.refresh_from_db()
+        assert job.status == Job.Status.RUNNING
+        assert job.claim == new_claim[1]
+        assert not AddressBook.objects.filter(user=self.user).exists()
+
+        run_job(*new_claim)
+
+        job.refresh_from_db()
+        assert job.status == Job.Status.SUCCEEDED
+        assert job.result["created"] == 5
+
+    def test_old_worker_cannot_finish_a_requeued_job(self):
+        job = self.make_job("export_addresses", {"format": "csv"})
+        old_claim = claim_job()
+        Job.objects.filter(id=job.id).update(
+            status=Job.Status.QUEUED, claim=None
+        )
+        new_claim = claim_job()
+
+        finish_job(
+            Job(id=job.id, claim=old_claim[1]), Job.Status.FAILED, error="lost"
+        )
+
+        job.refresh_from_db()
+        assert (job.status, job.claim) == (Job.Status.RUNNING, new_claim[1])
+
+    def test_requeued_import_resumes_with_its_counts(self):
+        AddressBookFactory(user=self.user, **make_address(0))
+        job = self.make_job(
+            "import_addresses",
+            {"addresses": [make_address(number) for number in range(5)]},
+        )
+        import_addresses = tasks.import_addresses
+        calls = []
+
+        def lose_worker_after_first_batch(*args, **kwargs):
+            if calls:
+                raise SystemExit
+            calls.append(args)
+            return import_addresses(*args, **kwargs)
+
+        with mock.patch.object(
+            tasks, "import_addresses", lose_worker_after_first_batch
+        ):
+            with self.assertRaises(SystemExit):
+                run_job(*claim_job())
+        # Given up on, the job is queued again
+        Job.objects.filter(id=job.id).update(
+            status=Job.Status.QUEUED, claim=None
+        )
+        self.run_workers()
+
+        job.refresh_from_db()
+        assert job.status == Job.Status.SUCCEEDED
+        assert job.result == {
+            "created": 4,
+            "duplicates": 1,
+            "duplicate_indexes": [0],
+        }
+        assert AddressBook.objects.filter(user=self.user).count() == 5
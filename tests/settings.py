@@ -0,0 +1,23 @@
+"""
+Settings for the test suite.
+"""
+import os
+import tempfile
+
+from address_service.settings import *  # noqa: F401,F403
+
+# The production hasher is deliberately slow, the tests only need passwords to
+# round trip
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# A database file rather than SQLite's shared in-memory database, whose table
+# locks ignore busy_timeout, so tests with concurrent writers see the same
+# locking as a deployment
+if (
+    DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3"
+):  # noqa: F405
+    DATABASES["default"]["TEST"] = {  # noqa: F405
+        "NAME": os.path.join(
+            tempfile.gettempdir(), "address_service_tests.sqlite3"
+        )
+    }